@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+from .model_registry import prewarm_from_settings  # noqa: E402  (needs settings configured)
+from jobs.worker import start_workers_from_settings  # noqa: E402
+
+prewarm_from_settings()
+start_workers_from_settings()
@@ -0,0 +1,169 @@
+"""
+On-disk store of downloaded audio, one artifact per video.
+
+An artifact is ``<video_id>.full.mp3`` or, for a download of only the start
+of a video, ``<video_id>.<seconds>.mp3``; a later longer download replaces
+it. Downloads go into a private temporary directory and are moved into place
+with os.replace(), so readers (also in other processes) never see a partial
+file. Concurrent requests in a process for the same video share one
+download. When the store grows past ``max_bytes`` the least recently used
+artifacts (by mtime, which hits refresh) are deleted.
+"""
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+SUFFIX = ".mp3"
+FULL = "full"
+TEMP_PREFIX = ".tmp-"
+# Temporary directories this old are leftovers of a crashed download.
+STALE_TEMP_SECONDS = 3600
+
+
+def _size(path):
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class AudioStore:
+    def __init__(self, root, max_bytes, fetch):
+        """``fetch(video_id, till_seconds, directory)`` downloads into ``directory`` and returns the file path."""
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def _artifacts(self, video_id):
+        """(covered seconds or None for the whole video, path) of the stored artifacts of ``video_id``."""
+        found = []
+        for path in self.root.glob(f"{video_id}.*{SUFFIX}"):
+            covered = path.name[len(video_id) + 1:-len(SUFFIX)]
+            if covered == FULL:
+                found.append((None, path))
+            elif covered.isdigit():
+                found.append((int(covered), path))
+        return found
+
+    def lookup(self, video_id, till_seconds=None):
+        """Path of a stored artifact covering the first ``till_seconds`` (the whole video if None), or None."""
+        for covered, path in self._artifacts(video_id):
+            if covered is None or (till_seconds is not None and covered >= till_seconds):
+                try:
+                    os.utime(path)
+                except FileNotFoundError:  # evicted or replaced meanwhile
+                    continue
+                return path
+        return None
+
+    def get(self, video_id, till_seconds=None, download=True):
+        """
+        Path of the audio of ``video_id`` (at least its first ``till_seconds``),
+        downloading it if needed; with ``download=False``, None if it isn't stored.
+        """
+        if not VIDEO_ID.match(video_id):
+            raise ValueError(f"Invalid video id: {video_id!r}")
+        while True:
+            path = self.lookup(video_id, till_seconds)
+            if path is not None:
+                with self._lock:
+                    self.hits += 1
+                return path
+            if not download:
+                with self._lock:
+                    self.misses += 1
+                return None
+            with self._lock:
+                event = self._inflight.get(video_id)
+                leader = event is None
+                if leader:
+                    event = self._inflight[video_id] = threading.Event()
+                    self.misses += 1
+                else:
+                    self.shared += 1
+            if not leader:
+                # Another thread is downloading this video; it may not cover
+                # ``till_seconds`` (or may fail), so look again afterwards.
+                event.wait()
+                continue
+            try:
+                return self._download(video_id, till_seconds)
+            finally:
+                with self._lock:
+                    del self._inflight[video_id]
+                event.set()
+
+    def _download(self, video_id, till_seconds):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp = Path(tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=self.root))
+        try:
+            # Whole seconds, rounded up, so the name never claims more than was fetched.
+            till = None if till_seconds is None else int(-(-till_seconds // 1))
+            downloaded = self.fetch(video_id, till, temp)
+            path = self.root / f"{video_id}.{FULL if till is None else till}{SUFFIX}"
+            os.replace(downloaded, path)
+        finally:
+            shutil.rmtree(temp, ignore_errors=True)
+
+        for covered, other in self._artifacts(video_id):
+            if other != path and covered is not None and (till is None or covered < till):
+                other.unlink(missing_ok=True)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Deletes least recently used artifacts until the store fits in ``max_bytes``."""
+        entries = []
+        for path in self.root.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.startswith(TEMP_PREFIX):
+                if stat.st_mtime < time.time() - STALE_TEMP_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif path.name.endswith(SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            # A reader that already opened the file keeps reading it; unlink only drops the name.
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+            logger.info("Evicted %s from the audio store", path.name)
+
+    def stats(self):
+        artifacts = list(self.root.glob(f"*{SUFFIX}")) if self.root.exists() else []
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "artifacts": len(artifacts),
+                "bytes": sum(_size(path) for path in artifacts),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_downloads": self.shared,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "in_flight": len(self._inflight),
+            }
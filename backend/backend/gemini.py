@@ -0,0 +1,374 @@
+"""
+Shared Gemini client layer: one pool per process over all configured API keys.
+
+Each key gets its own API clients (instead of the process-global
+``genai.configure``) and a token bucket refilled at its requests-per-minute
+quota. Every call takes a token from the key with the most left, so load is
+spread across keys from the start rather than only after one fails. When
+every bucket is empty, calls wait in line for the next token (up to
+``queue_timeout``) instead of failing. A key that hits its quota or is
+rejected cools down and the call is retried on another key.
+
+Model handles are cached per key and model settings, and with a memo cache
+(backend.llm_cache) repeated requests are answered without a call; a reply
+is only stored when the call's ``cache_if`` accepts its text. Nothing
+here depends on Django; the web app builds its pool from settings
+(model_registry) and the Streamlit tool (timestamp/) from its config.py.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How long a key is left alone after Gemini rejects it.
+QUOTA_COOLDOWN_SECONDS = 30.0
+INVALID_KEY_COOLDOWN_SECONDS = 600.0
+
+
+class GeminiUnavailable(RuntimeError):
+    """No API key could take the call within the queue timeout."""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """``rate`` tokens per second, holding at most ``capacity`` (starts full)."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until_token(self):
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class GeminiKey:
+    def __init__(self, api_key, requests_per_minute, burst):
+        self.api_key = api_key
+        self.bucket = TokenBucket(requests_per_minute / 60, burst)
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        return f"...{self.api_key[-4:]}"
+
+    def model(self, model_name, options, options_key):
+        """A GenerativeModel for this key, created once per model and settings."""
+        handle = (model_name, options_key)
+        with self._lock:
+            if handle not in self._models:
+                import google.generativeai as genai
+                from google.ai import generativelanguage as glm
+
+                model = genai.GenerativeModel(model_name, **options)
+                # GenerativeModel has no public way to take a client, but uses
+                # these when set instead of the ones genai.configure() made.
+                model._client = glm.GenerativeServiceClient(client_options={"api_key": self.api_key})
+                model._async_client = _LazyAsyncClient(self.api_key)
+                self._models[handle] = model
+            return self._models[handle]
+
+
+class _LazyAsyncClient:
+    """Creates the gRPC asyncio client on first use, which must happen inside the event loop."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self._client = None
+
+    def __getattr__(self, name):
+        if self._client is None:
+            from google.ai import generativelanguage as glm
+
+            self._client = glm.GenerativeServiceAsyncClient(client_options={"api_key": self.api_key})
+        return getattr(self._client, name)
+
+
+def _rejection_cooldown(error):
+    """Seconds to rest a key after ``error``, or None when another key wouldn't do better."""
+    from google.api_core import exceptions
+
+    if not isinstance(error, Exception):
+        return None
+    if isinstance(error, exceptions.TooManyRequests):
+        return QUOTA_COOLDOWN_SECONDS
+    if isinstance(error, (exceptions.Unauthorized, exceptions.Forbidden)):
+        return INVALID_KEY_COOLDOWN_SECONDS
+    if isinstance(error, exceptions.BadRequest) and "API key not valid" in str(error):
+        return INVALID_KEY_COOLDOWN_SECONDS
+    return None
+
+
+class GeminiPool:
+    def __init__(self, api_keys, requests_per_minute=15, burst=None, queue_timeout=60.0, cache=None):
+        """
+        ``requests_per_minute`` is each key's quota; ``burst`` how many calls a
+        key may make at once after being idle (default: a quarter of a minute's
+        quota, at least 1, so a request's few calls don't wait on each other).
+        ``cache`` is an optional backend.llm_cache.LLMCache answering repeated requests.
+        """
+        burst = burst or max(1, requests_per_minute // 4)
+        self.keys = [GeminiKey(key, requests_per_minute, burst) for key in dict.fromkeys(api_keys) if key]
+        self.queue_timeout = queue_timeout
+        self.cache = cache
+        self._models = {}
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+        self.waiting = 0
+        self.queued = 0
+        self.queued_seconds = 0.0
+
+    def model(self, model_name, **options):
+        """A model handle (cached) whose calls are spread over the pool's keys."""
+        options_key = json.dumps(options, sort_keys=True, default=repr)
+        with self._lock:
+            handle = (model_name, options_key)
+            if handle not in self._models:
+                self._models[handle] = PooledModel(self, model_name, options, options_key)
+            return self._models[handle]
+
+    def _try_take(self, exclude):
+        """Takes a token from the key with the most left; else returns the seconds until one has one."""
+        now = time.monotonic()
+        best, wait = None, None
+        for key in self.keys:
+            if key in exclude:
+                continue
+            key.bucket.refill(now)
+            key_wait = max(key.cooldown_until - now, key.bucket.seconds_until_token())
+            if key_wait > 0:
+                wait = key_wait if wait is None else min(wait, key_wait)
+            elif best is None or (key.bucket.tokens, -key.in_flight) > (best.bucket.tokens, -best.in_flight):
+                best = key
+        if best is None:
+            return None, wait
+        best.bucket.tokens -= 1
+        best.in_flight += 1
+        best.requests += 1
+        return best, 0.0
+
+    def _deadline(self, timeout):
+        if not self.keys:
+            raise GeminiUnavailable("No Gemini API keys configured.")
+        return time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+
+    def acquire(self, timeout=None, exclude=()):
+        """A key to make one call with, waiting in line while all are at their quota."""
+        deadline = self._deadline(timeout)
+        started = time.monotonic()
+        with self._lock:
+            key, wait = self._try_take(exclude)
+            if key is not None:
+                return key
+            self.waiting += 1
+            self.queued += 1
+            try:
+                while key is None:
+                    remaining = deadline - time.monotonic()
+                    if wait is None or remaining <= 0:
+                        raise GeminiUnavailable(f"All Gemini API keys are busy (waited {time.monotonic() - started:.1f}s).")
+                    self._freed.wait(min(wait, remaining))
+                    key, wait = self._try_take(exclude)
+                return key
+            finally:
+                self.waiting -= 1
+                self.queued_seconds += time.monotonic() - started
+
+    async def aacquire(self, timeout=None, exclude=()):
+        """Async acquire(): waits with asyncio.sleep() so the event loop keeps running."""
+        deadline = self._deadline(timeout)
+        started = time.monotonic()
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    key, wait = self._try_take(exclude)
+                    if key is not None:
+                        return key
+                    if not queued:
+                        queued = True
+                        self.waiting += 1
+                        self.queued += 1
+                remaining = deadline - time.monotonic()
+                if wait is None or remaining <= 0:
+                    raise GeminiUnavailable(f"All Gemini API keys are busy (waited {time.monotonic() - started:.1f}s).")
+                await asyncio.sleep(min(wait, remaining))
+        finally:
+            if queued:
+                with self._lock:
+                    self.waiting -= 1
+                    self.queued_seconds += time.monotonic() - started
+
+    def release(self, key, error=None):
+        """Ends a call made with ``key``; returns whether ``error`` is worth retrying on another key."""
+        cooldown = _rejection_cooldown(error) if error is not None else None
+        with self._lock:
+            key.in_flight -= 1
+            if cooldown is not None:
+                key.rejected += 1
+                key.cooldown_until = max(key.cooldown_until, time.monotonic() + cooldown)
+                logger.warning("Gemini key %s rejected a call (%s); resting it for %.0fs", key.label, type(error).__name__, cooldown)
+            self._freed.notify_all()
+        return cooldown is not None
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            stats = {
+                "keys": [
+                    {
+                        "key": key.label,
+                        "requests": key.requests,
+                        "rejected": key.rejected,
+                        "in_flight": key.in_flight,
+                        "tokens": round(min(key.bucket.capacity, key.bucket.tokens + (now - key.bucket.updated) * key.bucket.rate), 2),
+                        "cooling_down": key.cooldown_until > now,
+                    }
+                    for key in self.keys
+                ],
+                "waiting": self.waiting,
+                "queued": self.queued,
+                "queued_seconds": round(self.queued_seconds, 3),
+                "models": len(self._models),
+            }
+        # Reads the cache's SQLite file, so not while holding up acquire().
+        stats["cache"] = self.cache.stats() if self.cache is not None else None
+        return stats
+
+
+def _timeout(kwargs):
+    request_options = kwargs.get("request_options")
+    return request_options.get("timeout") if isinstance(request_options, dict) else None
+
+
+class CachedResponse:
+    """What a memo cache hit returns in place of a GenerateContentResponse: just its text."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _response_text(response):
+    try:
+        return response.text
+    except Exception:  # blocked or empty responses have no text
+        return None
+
+
+class PooledModel:
+    """
+    Stands in for a genai.GenerativeModel; each call runs on a key from the
+    pool, or is answered from the pool's memo cache (backend.llm_cache).
+    """
+
+    def __init__(self, pool, model_name, options, options_key):
+        self.pool = pool
+        self.model_name = model_name
+        self.options = options
+        self.options_key = options_key
+
+    def _model(self, key):
+        return key.model(self.model_name, self.options, self.options_key)
+
+    def _cache_key(self, args, kwargs):
+        if self.pool.cache is None:
+            return None
+        from .llm_cache import Uncacheable, request_key
+
+        # Neither the timeout nor streaming changes the answer.
+        call_settings = {name: value for name, value in kwargs.items() if name not in ("request_options", "stream")}
+        contents = args[0] if args else call_settings.pop("contents", None)
+        try:
+            return request_key(self.model_name, self.options, contents, **call_settings)
+        except Uncacheable:
+            return None
+
+    def _store(self, cache_key, text, cache_if):
+        if cache_key is not None and text and cache_if(text):
+            self.pool.cache.set(cache_key, text)
+
+    def _store_when_complete(self, chunks, cache_key, cache_if):
+        # Only a stream read to the end is stored; one the caller stops early may be cut short.
+        texts = []
+        for chunk in chunks:
+            texts.append(_response_text(chunk) or "")
+            yield chunk
+        self._store(cache_key, "".join(texts), cache_if)
+
+    def generate_content(self, *args, cache_if=None, **kwargs):
+        """
+        genai.GenerativeModel.generate_content(); with ``cache_if``, a callable
+        taking the reply text, replies it accepts are stored in the memo cache
+        (calls without one aren't cached).
+        """
+        cache_key = self._cache_key(args, kwargs) if cache_if else None
+        if cache_key is not None:
+            text = self.pool.cache.get(cache_key)
+            if text is not None:
+                response = CachedResponse(text)
+                return iter([response]) if kwargs.get("stream") else response
+
+        response = self._generate(*args, **kwargs)
+        if cache_key is None:
+            return response
+        if kwargs.get("stream"):
+            return self._store_when_complete(response, cache_key, cache_if)
+        self._store(cache_key, _response_text(response), cache_if)
+        return response
+
+    async def generate_content_async(self, *args, cache_if=None, **kwargs):
+        """Async generate_content(); the memo cache is read and written in a worker thread."""
+        cache_key = self._cache_key(args, kwargs) if cache_if and not kwargs.get("stream") else None
+        if cache_key is not None:
+            text = await asyncio.to_thread(self.pool.cache.get, cache_key)
+            if text is not None:
+                return CachedResponse(text)
+
+        response = await self._agenerate(*args, **kwargs)
+        if cache_key is not None:
+            await asyncio.to_thread(self._store, cache_key, _response_text(response), cache_if)
+        return response
+
+    def _generate(self, *args, **kwargs):
+        # A request timeout also bounds the wait for a key.
+        timeout = _timeout(kwargs)
+        tried = set()
+        while True:
+            key = self.pool.acquire(timeout, exclude=tried)
+            try:
+                response = self._model(key).generate_content(*args, **kwargs)
+            except BaseException as e:  # also cancellation, so the key is released
+                retry = self.pool.release(key, e)
+                tried.add(key)
+                if not retry or len(tried) == len(self.pool.keys):
+                    raise
+                continue
+            self.pool.release(key)
+            return response
+
+    async def _agenerate(self, *args, **kwargs):
+        timeout = _timeout(kwargs)
+        tried = set()
+        while True:
+            key = await self.pool.aacquire(timeout, exclude=tried)
+            try:
+                response = await self._model(key).generate_content_async(*args, **kwargs)
+            except BaseException as e:  # also cancellation, so the key is released
+                retry = self.pool.release(key, e)
+                tried.add(key)
+                if not retry or len(tried) == len(self.pool.keys):
+                    raise
+                continue
+            self.pool.release(key)
+            return response
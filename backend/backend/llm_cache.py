@@ -0,0 +1,173 @@
+"""
+On-disk memo cache of LLM responses, keyed by a hash of the whole request.
+
+The key covers the model name, its settings (generation config, safety
+settings) and every prompt part, with images and other bytes included by
+their SHA-256, so identical requests from any module, process or app (the
+Django backend and the Streamlit tool can point at the same file) reuse one
+answer. Only the response text is stored. Entries expire after ``ttl``
+seconds, and the least recently used ones are deleted once the stored text
+passes ``max_bytes`` (checked after every EVICT_FRACTION of it stored by a
+process, so the file can overshoot by about that much per process).
+
+SQLite in WAL mode keeps it safe for concurrent processes; each thread uses
+its own connection. A lookup or store that would wait on another writer for
+more than BUSY_TIMEOUT seconds is skipped instead. No Django imports.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT = 0.5  # seconds
+EVICT_FRACTION = 1 / 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+class Uncacheable(TypeError):
+    """A prompt part the key can't be computed for (the call just isn't cached)."""
+
+
+def _canonical(part):
+    """A JSON-able stand-in for a prompt part, with bytes replaced by their hash."""
+    if part is None or isinstance(part, (str, int, float, bool)):
+        return part
+    if isinstance(part, (bytes, bytearray, memoryview)):
+        return {"sha256": hashlib.sha256(part).hexdigest()}
+    if isinstance(part, dict):
+        return {str(key): _canonical(value) for key, value in sorted(part.items())}
+    if isinstance(part, (list, tuple)):
+        return [_canonical(value) for value in part]
+    if hasattr(part, "tobytes") and hasattr(part, "size"):  # PIL image
+        return {"image": _canonical(part.tobytes()), "size": list(part.size), "mode": getattr(part, "mode", None)}
+    raise Uncacheable(f"Can't cache a prompt containing {type(part).__name__}")
+
+
+def request_key(model_name, settings, contents, **call_settings):
+    """Hex SHA-256 of a generate_content() request."""
+    payload = json.dumps(
+        [model_name, _canonical(settings), _canonical(call_settings), _canonical(contents)],
+        sort_keys=True, separators=(",", ":"), default=repr,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path, max_bytes, ttl):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._unchecked_bytes = 0
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._local.db = db
+        return db
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key):
+        """The cached text for ``key``, or None."""
+        try:
+            db = self._db()
+            now = time.time()
+            row = db.execute("SELECT text, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] + self.ttl > now:
+                db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self._count("hits")
+                return row[0]
+            if row is not None:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            # A cache problem must never fail the call itself.
+            logger.warning("LLM cache lookup failed: %s", e)
+        self._count("misses")
+        return None
+
+    def set(self, key, text):
+        try:
+            db = self._db()
+            now = time.time()
+            size = len(text.encode())
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, text, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now),
+            )
+            with self._lock:
+                self.stores += 1
+                self._unchecked_bytes += size
+                evict = self._unchecked_bytes >= self.max_bytes * EVICT_FRACTION
+                if evict:
+                    self._unchecked_bytes = 0
+            if evict:
+                self._evict(db, now)
+        except sqlite3.Error as e:
+            logger.warning("LLM cache store failed: %s", e)
+
+    def _evict(self, db, now):
+        evicted = db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,)).rowcount
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            # Oldest first, until what's left fits.
+            evicted += db.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS kept FROM responses
+                    ) WHERE kept > ?
+                )
+                """,
+                (self.max_bytes,),
+            ).rowcount
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self):
+        self._db().execute("DELETE FROM responses")
+
+    def stats(self):
+        try:
+            entries, size = self._db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        except sqlite3.Error:
+            entries = size = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
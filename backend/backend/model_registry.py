@@ -0,0 +1,140 @@
+"""
+Process-wide registry of heavy models and clients (Whisper, KeyBERT, Gemini,
+and the process pool of Whisper workers).
+
+Nothing is imported or loaded until the first ``registry.get(name)``, so
+``manage.py migrate``, test runs and workers that never touch a model don't
+pay for them. Each model is loaded once per process even under concurrent
+first use. Servers can load some of them ahead of time in a background
+thread (MODEL_PREWARM) so the first request doesn't wait.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders = {}
+        self._instances = {}
+        self._locks = {}
+        self._load_seconds = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Registers ``loader()`` as the way to build model ``name``; it runs on first get()."""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        """The shared instance of ``name``, loading it first if needed."""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        if name not in self._loaders:
+            raise LookupError(f"No model registered as '{name}'.")
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                try:
+                    instance = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = repr(e)
+                    raise
+                self._load_seconds[name] = time.perf_counter() - started
+                self._errors.pop(name, None)
+                self._instances[name] = instance
+                logger.info("Loaded model %s in %.2fs", name, self._load_seconds[name])
+        return self._instances[name]
+
+    def is_loaded(self, name):
+        return name in self._instances
+
+    def prewarm(self, names):
+        """Loads ``names`` one after another in a daemon thread; failures are logged, not raised."""
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    logger.exception("Prewarming model %s failed", name)
+
+        thread = threading.Thread(target=load_all, name="model-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """Per model: whether it is loaded, how long loading took, and the last load error."""
+        return {
+            name: {
+                "loaded": name in self._instances,
+                "load_seconds": round(self._load_seconds[name], 3) if name in self._load_seconds else None,
+                "error": self._errors.get(name),
+            }
+            for name in self._loaders
+        }
+
+
+def _load_gemini():
+    from .gemini import GeminiPool
+    from .llm_cache import LLMCache
+
+    cache = None
+    if settings.LLM_CACHE_PATH:
+        cache = LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL)
+    return GeminiPool(
+        settings.GEMINI_API_KEYS,
+        requests_per_minute=settings.GEMINI_RPM_PER_KEY,
+        queue_timeout=settings.GEMINI_QUEUE_TIMEOUT,
+        cache=cache,
+    )
+
+
+def _load_whisper():
+    import whisper
+
+    return whisper.load_model(settings.WHISPER_MODEL)
+
+
+def _load_keybert():
+    from keybert import KeyBERT
+
+    return KeyBERT()
+
+
+def _load_whisper_pool():
+    from .transcription import ShardedTranscriber, load_whisper_model
+
+    return ShardedTranscriber(
+        workers=settings.WHISPER_WORKERS,
+        shard_seconds=settings.WHISPER_SHARD_SECONDS,
+        loader=load_whisper_model,
+        loader_args=(settings.WHISPER_MODEL,),
+    )
+
+
+registry = ModelRegistry()
+registry.register("gemini", _load_gemini)
+registry.register("whisper", _load_whisper)
+registry.register("keybert", _load_keybert)
+registry.register("whisper_pool", _load_whisper_pool)
+
+
+def gemini():
+    """The process's GeminiPool over GEMINI_API_KEYS (see backend.gemini), created on first use."""
+    return registry.get("gemini")
+
+
+def prewarm_from_settings():
+    """Starts prewarming the models listed in MODEL_PREWARM (called by the WSGI/ASGI entry points)."""
+    names = [name for name in settings.MODEL_PREWARM if name]
+    if names:
+        return registry.prewarm(names)
+    return None
@@ -10,16 +10,113 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path 
 
-from decouple import config
+from decouple import config, Csv
 
 # OPENAI_API_KEY = config("OPENAI_API_KEY")
 GOOGLE_GEMINI_API_KEY = config("GEMINI_API_KEY")
+# All keys Gemini calls are spread over (backend.gemini), each with its own
+# requests-per-minute quota; calls queue for up to GEMINI_QUEUE_TIMEOUT seconds
+# when every key is at its quota.
+GEMINI_API_KEYS = config("GEMINI_API_KEYS", default=GOOGLE_GEMINI_API_KEY, cast=Csv())
+GEMINI_RPM_PER_KEY = config("GEMINI_RPM_PER_KEY", default=15, cast=int)
+GEMINI_QUEUE_TIMEOUT = config("GEMINI_QUEUE_TIMEOUT", default=60.0, cast=float)
+
+# Transcript cache (timestampQues.transcript_cache)
+TRANSCRIPT_CACHE_TTL = config("TRANSCRIPT_CACHE_TTL", default=7 * 24 * 3600, cast=int)  # seconds
+TRANSCRIPT_CACHE_NEGATIVE_TTL = config("TRANSCRIPT_CACHE_NEGATIVE_TTL", default=6 * 3600, cast=int)  # seconds
+TRANSCRIPT_CACHE_MAX_ENTRIES = config("TRANSCRIPT_CACHE_MAX_ENTRIES", default=5000, cast=int)
+
+# Videos without captions are transcribed with Whisper, only up to the requested
+# timestamp (+ margin); the transcribed prefix is kept and extended later.
+WHISPER_FALLBACK = config("WHISPER_FALLBACK", default=True, cast=bool)
+AUDIO_TRANSCRIBE_MARGIN = config("AUDIO_TRANSCRIBE_MARGIN", default=5.0, cast=float)  # seconds past the timestamp
+
+# Keyword/practice question cache for /api/process/ (timestampQues.result_cache)
+RESULT_CACHE_BUCKET_SECONDS = config("RESULT_CACHE_BUCKET_SECONDS", default=30, cast=int)
+RESULT_CACHE_MAX_ENTRIES = config("RESULT_CACHE_MAX_ENTRIES", default=2000, cast=int)
+RESULT_CACHE_TTL = config("RESULT_CACHE_TTL", default=24 * 3600, cast=int)  # seconds
+# Gemini practice questions reused for near-identical keyword lists
+# (timestampQues.question_cache): Jaccard similarity of the normalized keyword
+# words of at least QUESTION_CACHE_MIN_SIMILARITY. Entries expire with RESULT_CACHE_TTL.
+QUESTION_CACHE_MAX_ENTRIES = config("QUESTION_CACHE_MAX_ENTRIES", default=5000, cast=int)
+QUESTION_CACHE_MIN_SIMILARITY = config("QUESTION_CACHE_MIN_SIMILARITY", default=0.6, cast=float)
+
+# Background jobs (jobs app). Web processes start JOBS_WORKERS threads when the
+# WSGI/ASGI app loads; set it to 0 and run `manage.py run_jobs` to use separate workers.
+JOBS_WORKERS = config("JOBS_WORKERS", default=2, cast=int)
+JOBS_POLL_INTERVAL = config("JOBS_POLL_INTERVAL", default=2.0, cast=float)  # seconds
+JOBS_LEASE_SECONDS = config("JOBS_LEASE_SECONDS", default=600, cast=int)
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", default=3, cast=int)
+JOBS_RETRY_BACKOFF = config("JOBS_RETRY_BACKOFF", default=10, cast=int)  # seconds, doubled per attempt
+
+# Question paper OCR (questionPapers.utils)
+OCR_MAX_IN_FLIGHT = config("OCR_MAX_IN_FLIGHT", default=4, cast=int)  # concurrent Gemini calls per upload
+OCR_PAGE_ATTEMPTS = config("OCR_PAGE_ATTEMPTS", default=3, cast=int)
+OCR_RETRY_BACKOFF = config("OCR_RETRY_BACKOFF", default=2.0, cast=float)  # seconds, doubled per attempt
+OCR_TEXT_LAYER_MIN_CHARS = config("OCR_TEXT_LAYER_MIN_CHARS", default=200, cast=int)  # below this a page is OCR'd
+
+# Heavy models (backend.model_registry) load on first use. Servers can load
+# some of them in the background right after startup, e.g. MODEL_PREWARM=gemini,whisper.
+MODEL_PREWARM = config("MODEL_PREWARM", default="", cast=Csv())
+WHISPER_MODEL = config("WHISPER_MODEL", default="base")
+# Audio longer than two shards is split at silences and transcribed by this
+# many worker processes (each loads its own model); 0 or 1 transcribes in-process.
+WHISPER_WORKERS = config("WHISPER_WORKERS", default=min(4, os.cpu_count() or 1), cast=int)
+WHISPER_SHARD_SECONDS = config("WHISPER_SHARD_SECONDS", default=120.0, cast=float)
+
+# Cache used for authenticated users (base.authentication). LocMem is per
+# process; point CACHE_BACKEND/CACHE_LOCATION at e.g. Redis to share it.
+CACHES = {
+    'default': {
+        'BACKEND': config("CACHE_BACKEND", default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config("CACHE_LOCATION", default=''),
+    }
+}
+AUTH_USER_CACHE_ALIAS = config("AUTH_USER_CACHE_ALIAS", default='default')
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=60, cast=int)  # seconds, 0 disables
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Keyword extraction for /api/process/ (timestampQues.utils.extract_keywords):
+# "gemini", "local" (timestampQues.keywords) or "auto" (Gemini, falling back to
+# local after KEYWORDS_GEMINI_TIMEOUT seconds or on error). Requests can override
+# it with "keyword_engine". The local engine's document frequencies come from
+# `manage.py build_keyword_df`.
+KEYWORDS_ENGINE = config("KEYWORDS_ENGINE", default="auto")
+KEYWORDS_GEMINI_TIMEOUT = config("KEYWORDS_GEMINI_TIMEOUT", default=10.0, cast=float)
+KEYWORDS_DF_PATH = config("KEYWORDS_DF_PATH", default=str(BASE_DIR / "keywords_df.npz"))
+
+# Practice questions for /api/process/: "gemini", "catalog" (BM25 search of the
+# local problem catalog, JSON or CSV) or "auto" (the catalog, asking Gemini when
+# fewer than PRACTICE_CATALOG_MIN_RECALL of the keywords match a catalog problem).
+# Requests can override it with "question_source"; deployments with a catalog
+# opt in to "catalog" or "auto" here.
+PRACTICE_QUESTION_SOURCE = config("PRACTICE_QUESTION_SOURCE", default="gemini")
+PRACTICE_CATALOG_PATH = config("PRACTICE_CATALOG_PATH", default=str(BASE_DIR / "timestampQues" / "data" / "practice_problems.json"))
+PRACTICE_CATALOG_MIN_RECALL = config("PRACTICE_CATALOG_MIN_RECALL", default=0.5, cast=float)
+
+# Downloaded audio (backend.utils.audio_store, used by timestampQues.audio), least
+# recently used files deleted beyond AUDIO_STORE_MAX_BYTES.
+AUDIO_STORE_DIR = config("AUDIO_STORE_DIR", default=str(BASE_DIR / "audio_store"))
+AUDIO_STORE_MAX_BYTES = config("AUDIO_STORE_MAX_BYTES", default=2 * 1024 ** 3, cast=int)
+
+# Concurrent /api/process/ requests for the same video and bucket share one run
+# (timestampQues.coalesce): across processes through lock files in this directory
+# ("" keeps it within each process), whose results are reused for COALESCE_SPOOL_TTL.
+COALESCE_LOCK_DIR = config("COALESCE_LOCK_DIR", default=str(BASE_DIR / ".coalesce"))
+COALESCE_SPOOL_TTL = config("COALESCE_SPOOL_TTL", default=30, cast=int)  # seconds
+
+# Gemini replies memoized by request (backend.llm_cache; only calls passing a
+# cache_if validator are stored), shared by every process pointed at the same
+# file (also the Streamlit tool's); "" disables it.
+LLM_CACHE_PATH = config("LLM_CACHE_PATH", default=str(BASE_DIR / "llm_cache.sqlite3"))
+LLM_CACHE_MAX_BYTES = config("LLM_CACHE_MAX_BYTES", default=256 * 1024 ** 2, cast=int)
+LLM_CACHE_TTL = config("LLM_CACHE_TTL", default=7 * 24 * 3600, cast=int)  # seconds
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -48,6 +145,7 @@ INSTALLED_APPS = [
     'base',
     'timestampQues',
     'questionPapers',
+    'jobs',
 ]
 
 MIDDLEWARE = [
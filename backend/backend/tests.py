@@ -0,0 +1,223 @@
+import asyncio
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+from google.api_core import exceptions
+
+from .gemini import GeminiKey, GeminiPool, GeminiUnavailable
+from .llm_cache import LLMCache, Uncacheable, request_key
+
+# Loaded on first use only (backend.model_registry and the lazy imports in the
+# apps); startup must not pay for any of them.
+HEAVY_MODULES = ["google.generativeai", "whisper", "torch", "keybert", "pdf2image"]
+
+# django.setup() plus loading every URLconf (and so every view module).
+PROBE = """
+import json, sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps([name for name in %r if name in sys.modules]))
+""" % (HEAVY_MODULES,)
+
+
+class StartupTests(SimpleTestCase):
+    def test_setup_loads_no_heavy_modules(self):
+        # A fresh interpreter: this one has long since imported everything.
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=Path(__file__).resolve().parent.parent,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings")},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        self.assertEqual(json.loads(output.strip().splitlines()[-1]), [])
+
+
+class FakeModel:
+    """A GenerativeModel whose calls with ``failing_keys`` raise ``error``."""
+
+    def __init__(self, api_key, calls, failing_keys, error):
+        self.api_key = api_key
+        self.calls = calls
+        self.failing_keys = failing_keys
+        self.error = error
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls.append(self.api_key)
+        if self.api_key in self.failing_keys:
+            raise self.error
+        return mock.Mock(text=f"{prompt} from {self.api_key}")
+
+    async def generate_content_async(self, prompt, **kwargs):
+        return self.generate_content(prompt, **kwargs)
+
+
+class GeminiPoolTests(SimpleTestCase):
+    def pool(self, keys=("key-a", "key-b"), failing_keys=(), error=None, **options):
+        self.calls = []
+        patcher = mock.patch.object(
+            GeminiKey, "model",
+            lambda key, name, settings, settings_key: FakeModel(key.api_key, self.calls, failing_keys, error),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return GeminiPool(list(keys), **options)
+
+    def cached_pool(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return self.pool(cache=LLMCache(Path(directory.name) / "llm.sqlite3", 10 ** 6, 60), **options)
+
+    def test_calls_are_spread_across_keys(self):
+        pool = self.pool(keys=("key-a", "key-b", "key-c"), requests_per_minute=60, burst=2)
+        keys = [pool.acquire() for _ in range(3)]
+        self.assertEqual({key.api_key for key in keys}, {"key-a", "key-b", "key-c"})
+        for key in keys:
+            pool.release(key)
+
+    def test_calls_wait_for_a_token_up_to_the_timeout(self):
+        # One token every 0.1s.
+        pool = self.pool(keys=("key-a",), requests_per_minute=600, burst=1)
+        pool.release(pool.acquire())
+        pool.release(pool.acquire(timeout=1))
+        self.assertEqual(pool.stats()["queued"], 1)
+        pool.acquire()
+        with self.assertRaises(GeminiUnavailable):
+            pool.acquire(timeout=0.01)
+
+    def test_no_keys_is_unavailable(self):
+        with self.assertRaises(GeminiUnavailable):
+            self.pool(keys=()).model("gemini-test").generate_content("hi")
+
+    def test_rate_limited_call_is_retried_on_another_key(self):
+        pool = self.pool(failing_keys={"key-a"}, error=exceptions.TooManyRequests("quota"))
+        model = pool.model("gemini-test")
+        self.assertEqual(model.generate_content("hi").text, "hi from key-b")
+        self.assertEqual(self.calls, ["key-a", "key-b"])
+        key_a = pool.stats()["keys"][0]
+        self.assertEqual((key_a["rejected"], key_a["cooling_down"], key_a["in_flight"]), (1, True, 0))
+
+        # key-a rests; the next call goes straight to key-b.
+        model.generate_content("again")
+        self.assertEqual(self.calls[-1], "key-b")
+
+    def test_async_call_is_retried_on_another_key(self):
+        pool = self.pool(failing_keys={"key-a"}, error=exceptions.TooManyRequests("quota"))
+        response = asyncio.run(pool.model("gemini-test").generate_content_async("hi"))
+        self.assertEqual(response.text, "hi from key-b")
+
+    def test_other_errors_are_not_retried(self):
+        pool = self.pool(failing_keys={"key-a", "key-b"}, error=ValueError("bad prompt"))
+        with self.assertRaises(ValueError):
+            pool.model("gemini-test").generate_content("hi")
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([key["in_flight"] for key in pool.stats()["keys"]], [0, 0])
+
+    def test_stats_read_the_cache_without_holding_the_pool_lock(self):
+        pool = self.cached_pool()
+
+        def cache_stats():
+            self.assertTrue(pool._lock.acquire(blocking=False))
+            pool._lock.release()
+            return {"entries": 0}
+
+        with mock.patch.object(pool.cache, "stats", cache_stats):
+            self.assertEqual(pool.stats()["cache"], {"entries": 0})
+
+    def test_only_accepted_replies_are_cached(self):
+        model = self.cached_pool().model("gemini-test")
+        model.generate_content("hi", cache_if=lambda text: False)
+        model.generate_content("hi")
+        reply = model.generate_content("hi", cache_if=lambda text: True).text
+        self.assertEqual(model.generate_content("hi", cache_if=lambda text: True).text, reply)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_async_calls_use_the_cache(self):
+        model = self.cached_pool().model("gemini-test")
+
+        async def ask():
+            return (await model.generate_content_async("hi", cache_if=bool)).text
+
+        self.assertEqual(asyncio.run(ask()), "hi from key-a")
+        self.assertEqual(asyncio.run(ask()), "hi from key-a")
+        self.assertEqual(len(self.calls), 1)
+
+
+class LLMCacheTests(SimpleTestCase):
+    def cache(self, max_bytes=10 ** 6, ttl=60):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return LLMCache(Path(directory.name) / "llm.sqlite3", max_bytes, ttl)
+
+    def test_key_covers_the_whole_request_but_not_its_spelling(self):
+        settings = {"generation_config": {"temperature": 0.4, "top_p": 1}}
+        key = request_key("gemini-test", settings, ["hi", b"png"])
+        self.assertEqual(key, request_key("gemini-test", {"generation_config": {"top_p": 1, "temperature": 0.4}}, ("hi", b"png")))
+        self.assertEqual(key, request_key("gemini-test", settings, ["hi", bytearray(b"png")]))
+        for other in (
+            request_key("gemini-other", settings, ["hi", b"png"]),
+            request_key("gemini-test", {"generation_config": {"temperature": 0.5, "top_p": 1}}, ["hi", b"png"]),
+            request_key("gemini-test", settings, ["hi", b"jpg"]),
+            request_key("gemini-test", settings, ["hi", b"png"], tools=["search"]),
+        ):
+            self.assertNotEqual(key, other)
+
+    def test_images_are_keyed_by_their_pixels(self):
+        image = mock.Mock(size=(2, 1), mode="L", **{"tobytes.return_value": b"\x00\xff"})
+        same = mock.Mock(size=(2, 1), mode="L", **{"tobytes.return_value": b"\x00\xff"})
+        self.assertEqual(request_key("gemini-test", {}, [image]), request_key("gemini-test", {}, [same]))
+        with self.assertRaises(Uncacheable):
+            request_key("gemini-test", {}, [object()])
+
+    def test_entries_expire(self):
+        cache = self.cache(ttl=60)
+        with mock.patch("backend.llm_cache.time.time", return_value=1000.0):
+            cache.set("key", "reply")
+        with mock.patch("backend.llm_cache.time.time", return_value=1059.0):
+            self.assertEqual(cache.get("key"), "reply")
+        with mock.patch("backend.llm_cache.time.time", return_value=1060.0):
+            self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_least_recently_used_are_evicted(self):
+        cache = self.cache(max_bytes=20)
+        for now, key in enumerate(("a", "b")):
+            with mock.patch("backend.llm_cache.time.time", return_value=1000.0 + now):
+                cache.set(key, "x" * 8)
+        with mock.patch("backend.llm_cache.time.time", return_value=1002.0):
+            cache.get("a")
+        with mock.patch("backend.llm_cache.time.time", return_value=1003.0):
+            cache.set("c", "x" * 8)
+            self.assertIsNone(cache.get("b"))
+            self.assertIsNotNone(cache.get("a"))
+            self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_eviction_waits_for_a_share_of_max_bytes(self):
+        # Checked after every 100 bytes stored.
+        cache = self.cache(max_bytes=1600)
+        with mock.patch.object(cache, "_evict") as evict:
+            for n in range(25):
+                cache.set(str(n), "x" * 10)
+        self.assertEqual(evict.call_count, 2)
+
+    def test_locked_database_is_skipped_quickly(self):
+        cache = self.cache()
+        cache.set("key", "reply")
+        blocker = sqlite3.connect(cache.path, isolation_level=None)
+        self.addCleanup(blocker.close)
+        blocker.execute("BEGIN EXCLUSIVE")
+        started = time.monotonic()
+        with self.assertLogs("backend.llm_cache", "WARNING"):
+            cache.set("other", "reply")
+        self.assertLess(time.monotonic() - started, 5)
+        blocker.execute("ROLLBACK")
@@ -0,0 +1,118 @@
+"""
+Sharded Whisper transcription for long audio.
+
+The audio is cut into shards of about ``shard_seconds``, each cut placed at
+the quietest point near the target so no word is split, and the shards are
+transcribed in parallel by a pool of processes that each hold their own
+loaded model. Segment times are shifted back to positions in the full audio.
+
+No Django imports here: worker processes are spawned fresh and only import
+this module and the model loader.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000  # what Whisper expects
+
+
+def split_at_silence(audio, shard_seconds, search_seconds=10.0, frame_seconds=0.02):
+    """
+    (start, end) sample ranges covering ``audio``, each about ``shard_seconds``
+    long, cut at the lowest-energy point within ``search_seconds`` of the target.
+    """
+    frame = int(frame_seconds * SAMPLE_RATE)
+    target = int(shard_seconds / frame_seconds)
+    frames = len(audio) // frame
+    if frames <= target * 1.5:
+        return [(0, len(audio))]
+
+    energy = np.sqrt(np.mean(np.square(audio[:frames * frame].reshape(frames, frame)), axis=1))
+    # Smooth over ~0.3 s so a cut lands in a pause, not in the gap between two syllables.
+    width = max(1, int(0.3 / frame_seconds))
+    energy = np.convolve(energy, np.ones(width) / width, mode="same")
+
+    search = int(search_seconds / frame_seconds)
+    cuts = [0]
+    while frames - cuts[-1] > target * 1.5:
+        low = cuts[-1] + max(target - search, 1)
+        high = min(cuts[-1] + target + search, frames)
+        cuts.append(low + int(np.argmin(energy[low:high])))
+
+    bounds = [cut * frame for cut in cuts] + [len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def load_whisper_model(name):
+    import whisper
+
+    return whisper.load_model(name)
+
+
+# The model of this worker process, set up by _init_worker().
+_worker_model = None
+
+
+def _init_worker(loader, loader_args, threads):
+    global _worker_model
+    try:
+        import torch
+
+        # Workers share the machine; don't let each one spawn a thread per core.
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = loader(*loader_args)
+
+
+def _transcribe_shard(audio, offset):
+    result = _worker_model.transcribe(audio)
+    return [
+        {
+            "text": segment["text"].strip(),
+            "start": offset + segment["start"],
+            "duration": segment["end"] - segment["start"],
+        }
+        for segment in result["segments"]
+        if segment["text"].strip()
+    ]
+
+
+class ShardedTranscriber:
+    """
+    A pool of ``workers`` processes, each with a model from
+    ``loader(*loader_args)`` (any object with a Whisper-style transcribe()),
+    loaded once when the process starts.
+    """
+
+    def __init__(self, workers, shard_seconds=120.0, loader=load_whisper_model, loader_args=("base",)):
+        self.workers = workers
+        self.shard_seconds = shard_seconds
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # Forking a web server with live threads and DB connections isn't safe.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(loader, loader_args, threads),
+        )
+
+    def transcribe(self, audio, offset=0.0):
+        """Segments (text/start/duration dicts, start-ordered) of ``audio``, which starts at ``offset`` seconds."""
+        shards = split_at_silence(audio, self.shard_seconds)
+        futures = [
+            self.pool.submit(_transcribe_shard, audio[start:end], offset + start / SAMPLE_RATE)
+            for start, end in shards
+        ]
+        logger.info("Transcribing %.0fs of audio as %d shard(s) on %d worker(s)", len(audio) / SAMPLE_RATE, len(shards), self.workers)
+        segments = [segment for future in futures for segment in future.result()]
+        segments.sort(key=lambda segment: segment["start"])
+        return segments
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
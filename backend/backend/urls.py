@@ -21,5 +21,6 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/',include('base.urls')),
     path('api/',include('timestampQues.urls')),
-    path('api/',include('questionPapers.urls'))
+    path('api/',include('questionPapers.urls')),
+    path('api/',include('jobs.urls'))
 ]
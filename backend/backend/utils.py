@@ -1,44 +1,111 @@
-import yt_dlp
-import whisper
-from keybert import KeyBERT
-import google.generativeai as genai
-import os
+import subprocess
 
-# Load models
-model = whisper.load_model("base")
-kw_model = KeyBERT()
+import numpy as np
+from django.conf import settings
 
-# Configure Gemini
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# Whisper, KeyBERT and Gemini load on first use (see model_registry)
+from .audio_store import AudioStore
+from .model_registry import registry, gemini
+from .transcription import SAMPLE_RATE
+
+
+def video_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def _fetch_audio(video_id, till_seconds, directory):
+    """Downloads the audio of a video as mp3 into ``directory``, only the first ``till_seconds`` if given."""
+    import yt_dlp
 
-def download_audio(url):
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': 'downloaded_audio.%(ext)s',
+        'outtmpl': str(directory / 'audio.%(ext)s'),
+        'quiet': True,
+        'noplaylist': True,
         'postprocessors': [{
             'key': 'FFmpegExtractAudio',
             'preferredcodec': 'mp3',
         }],
     }
+    if till_seconds:
+        ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(None, [(0, till_seconds)])
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    return "downloaded_audio.mp3"
+        ydl.download([video_url(video_id)])
+    return directory / 'audio.mp3'
+
+
+audio_store = AudioStore(settings.AUDIO_STORE_DIR, settings.AUDIO_STORE_MAX_BYTES, _fetch_audio)
+
+
+def audio_source(url):
+    """
+    Direct URL of the best audio stream of a video (plus the HTTP headers it
+    needs and the duration in seconds), so ffmpeg can read just a span of it.
+    """
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL({'format': 'bestaudio/best', 'quiet': True, 'noplaylist': True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return info['url'], info.get('http_headers') or {}, info.get('duration')
+
+
+def decode_audio(source, start=0.0, end=None, headers=None):
+    """
+    Decodes ``source`` (a file path or stream URL) from ``start`` to ``end``
+    seconds into 16 kHz mono float32 samples, as whisper.load_audio() does.
+    ffmpeg seeks before reading, so for a URL only that span is fetched.
+    """
+    cmd = ['ffmpeg', '-nostdin', '-loglevel', 'error', '-ss', f'{start:.3f}']
+    if end is not None:
+        cmd += ['-t', f'{max(end - start, 0):.3f}']
+    if headers:
+        cmd += ['-headers', ''.join(f'{key}: {value}\r\n' for key, value in headers.items())]
+    cmd += ['-i', source, '-f', 's16le', '-ac', '1', '-ar', str(SAMPLE_RATE), '-']
+    output = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(output, np.int16).astype(np.float32) / 32768.0
+
+
+def transcribe_segments(audio, offset=0.0, prompt=None):
+    """
+    Whisper segments of ``audio`` as dicts with text/start/duration, with
+    times shifted by ``offset`` seconds (where the audio starts in the video).
+    ``prompt`` (the text just before) keeps a continued transcription consistent.
+    Long audio is split at silences and transcribed on the WHISPER_WORKERS
+    process pool instead (without the prompt).
+    """
+    if not len(audio):
+        return []
+    if settings.WHISPER_WORKERS > 1 and len(audio) > 2 * settings.WHISPER_SHARD_SECONDS * SAMPLE_RATE:
+        return registry.get("whisper_pool").transcribe(audio, offset)
+    result = registry.get("whisper").transcribe(audio, initial_prompt=prompt)
+    return [
+        {
+            'text': segment['text'].strip(),
+            'start': offset + segment['start'],
+            'duration': segment['end'] - segment['start'],
+        }
+        for segment in result['segments']
+        if segment['text'].strip()
+    ]
+
 
 def transcribe_audio(audio_path, till_seconds):
-    result = model.transcribe(audio_path)
-    text = result["text"]
-    return text[:int(till_seconds)]  # Approximate cut
+    """Transcribes only the first ``till_seconds`` of the audio and cuts the text by time."""
+    segments = transcribe_segments(decode_audio(audio_path, 0, till_seconds))
+    return " ".join(segment['text'] for segment in segments if segment['start'] < till_seconds)
+
 
 def extract_keywords(text):
-    keywords = kw_model.extract_keywords(text, keyphrase_ngram_range=(1, 2), stop_words='english', top_n=5)
+    keywords = registry.get("keybert").extract_keywords(text, keyphrase_ngram_range=(1, 2), stop_words='english', top_n=5)
     return [kw[0] for kw in keywords]
 
+
 def get_practice_questions_from_gemini(keywords):
     prompt = f"""
     I have the following programming keywords: {", ".join(keywords)}.
     Suggest some specific problem-solving or coding practice questions (with platform links if possible) related to these topics.
     Prioritize DSA, LeetCode, GeeksforGeeks, and HackerRank links.
     """
-    model = genai.GenerativeModel('gemini-pro')
+    model = gemini().model('gemini-pro')
     response = model.generate_content(prompt)
     return response.text
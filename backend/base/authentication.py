@@ -1,4 +1,21 @@
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Drops a user from the authentication cache (logout, password change, deactivation)."""
+    caches[settings.AUTH_USER_CACHE_ALIAS].delete(_user_cache_key(user_id))
+
 
 class CookiesJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
@@ -6,12 +23,56 @@ class CookiesJWTAuthentication(JWTAuthentication):
 
         if not access_token:
             return None
-        
+
         validated_token = self.get_validated_token(access_token)
 
         try:
-            user = self.get_user(validated_token)
+            user = self.get_cached_user(validated_token)
         except:
             return None
-        
-        return (user, validated_token)
\ No newline at end of file
+
+        return (user, validated_token)
+
+    def get_cached_user(self, validated_token):
+        """
+        get_user() without the query on every request: the user is kept in
+        the AUTH_USER_CACHE_ALIAS cache for AUTH_USER_CACHE_TTL seconds, and
+        dropped from it whenever the user is saved or deleted.
+        """
+        ttl = settings.AUTH_USER_CACHE_TTL
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if ttl <= 0 or user_id is None:
+            return self.get_user(validated_token)
+
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = _user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = self.get_user(validated_token)
+            cache.set(key, user, ttl)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            # A token from before a password change; let get_user() reject it.
+            return self.get_user(validated_token)
+        return user
+
+
+class CookiesJWTStatelessAuthentication(JWTStatelessUserAuthentication, CookiesJWTAuthentication):
+    """
+    Cookie JWT auth that builds a TokenUser from the token's claims with no
+    database or cache lookup. Only for endpoints that need nothing beyond
+    "a valid token for user id N": deactivation or deletion is not seen
+    until the token expires.
+    """
+
+    def get_cached_user(self, validated_token):
+        return self.get_user(validated_token)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def _invalidate_user(sender, instance, **kwargs):
+    # Covers password changes and is_active flips. With a per-process cache
+    # other processes keep the old copy for up to AUTH_USER_CACHE_TTL.
+    invalidate_cached_user(instance.pk)
@@ -1,3 +1,44 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from .authentication import CookiesJWTAuthentication
+
+
+class CookiesJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("student", password="pw")
+
+    def setUp(self):
+        caches[settings.AUTH_USER_CACHE_ALIAS].clear()
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self, token=None):
+        request = RequestFactory().get("/api/notes/")
+        if token:
+            request.COOKIES["access_token"] = token
+        return CookiesJWTAuthentication().authenticate(request)
+
+    def test_user_is_loaded_once_per_ttl(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(self.token)[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(self.token)[0], self.user)
+
+    def test_saving_the_user_drops_the_cached_copy(self):
+        self.authenticate(self.token)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.authenticate(self.token))
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_ttl_zero_disables_the_cache(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.authenticate(self.token)
+
+    def test_requests_without_the_cookie_are_anonymous(self):
+        self.assertIsNone(self.authenticate())
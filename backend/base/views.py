@@ -2,8 +2,9 @@ from django.shortcuts import render
 from django.contrib.auth.models import User
 from .models import Note
 from .serializer import NoteSerializer, UserRegistrationSerializer
+from .authentication import CookiesJWTStatelessAuthentication, invalidate_cached_user
 
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
@@ -82,6 +83,7 @@ class CustomRefreshTokenView(TokenRefreshView):
 @api_view(['POST'])
 def logout(request):
     try:
+        invalidate_cached_user(request.user.pk)
         res = Response()
         res.data = {'success':True}
         res.delete_cookie('access_token', path='/', samesite='None')
@@ -92,6 +94,7 @@ def logout(request):
 
 
 @api_view(['POST'])
+@authentication_classes([CookiesJWTStatelessAuthentication])
 @permission_classes([IsAuthenticated])
 def is_authenticated(request):
     return Response({'authenticated':True})
@@ -0,0 +1,86 @@
+"""
+Throughput of the shared Gemini pool (backend.gemini) against per-key quotas,
+with a stand-in model instead of the API: N threads make calls for a fixed
+time and the sustained calls per minute are compared with keys x quota. One
+key can be made to answer 429 to show calls moving to the others.
+
+    python benchmarks/gemini_pool.py --keys 1 3 --rpm 60 --seconds 20 --threads 16
+    python benchmarks/gemini_pool.py --keys 3 --rpm 60 --exhausted 1
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.gemini import GeminiPool, GeminiUnavailable  # noqa: E402
+
+
+class FakeModel:
+    def __init__(self, latency, exhausted):
+        self.latency = latency
+        self.exhausted = exhausted
+
+    def generate_content(self, *args, **kwargs):
+        if self.exhausted:
+            from google.api_core.exceptions import ResourceExhausted
+
+            raise ResourceExhausted("quota exceeded")
+        time.sleep(self.latency)
+        return "ok"
+
+
+def run(keys, rpm, seconds, threads, latency, exhausted):
+    pool = GeminiPool([f"key-{i:04d}" for i in range(keys)], requests_per_minute=rpm, queue_timeout=seconds)
+    for i, key in enumerate(pool.keys):
+        fake = FakeModel(latency, i < exhausted)
+        key.model = lambda *args, fake=fake: fake
+    model = pool.model("gemini-1.5-flash")
+
+    done = []
+    failed = []
+    stop = time.monotonic() + seconds
+
+    def worker():
+        while time.monotonic() < stop:
+            try:
+                model.generate_content("prompt", request_options={"timeout": max(0.0, stop - time.monotonic())})
+                done.append(time.monotonic())
+            except GeminiUnavailable:
+                break
+            except Exception:
+                failed.append(1)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.monotonic()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    quota = (keys - exhausted) * rpm
+    stats = pool.stats()
+    per_key = ", ".join(f"{key['key']}: {key['requests']}" for key in stats["keys"])
+    print(f"{keys} key(s) x {rpm} rpm ({exhausted} exhausted): {len(done) / elapsed * 60:7.1f} calls/min "
+          f"(usable quota {quota}/min + burst), {len(failed)} failed, queued {stats['queued']}x; {per_key}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--rpm", type=int, default=60, help="quota per key")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake call")
+    parser.add_argument("--exhausted", type=int, default=0, help="keys that answer every call with 429")
+    args = parser.parse_args()
+
+    for keys in args.keys:
+        run(keys, args.rpm, args.seconds, args.threads, args.latency, args.exhausted)
+
+
+if __name__ == "__main__":
+    main()
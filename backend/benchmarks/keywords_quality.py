@@ -0,0 +1,128 @@
+"""
+Compares the local keyword extractor with Gemini: latency of each, and how
+many of the local keywords match Gemini's (exactly, or sharing a content
+word). Transcripts come from the TranscriptCache table of the configured
+database, or from text files; Gemini is skipped without an API key or with
+--no-gemini.
+
+    python benchmarks/keywords_quality.py [--files a.txt b.txt] [--limit 20] [--no-gemini]
+    python benchmarks/keywords_quality.py --synthetic-minutes 60   # latency only
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+WORDS_PER_MINUTE = 150
+
+
+def load_texts(args):
+    if args.files:
+        return [(path, Path(path).read_text()) for path in args.files]
+    if args.synthetic_minutes:
+        return [("synthetic", synthetic_transcript(args.synthetic_minutes))]
+
+    from timestampQues.models import TranscriptCache
+    from timestampQues.transcript import Transcript
+
+    rows = TranscriptCache.objects.filter(available=True).values_list("video_id", "payload")[:args.limit]
+    return [(video_id, Transcript.from_bytes(bytes(payload)).text) for video_id, payload in rows]
+
+
+def synthetic_transcript(minutes):
+    """Lecture-like filler with a handful of recurring topic phrases and a long tail of rare words."""
+    rng = random.Random(0)
+    filler = "so um basically what we are going to do is you know look at this and then see how it works right okay".split()
+    topics = ["gradient descent", "neural network", "loss function", "learning rate", "backpropagation"]
+    rare = [f"term{i}" for i in range(5000)]
+    words = []
+    while len(words) < minutes * WORDS_PER_MINUTE:
+        roll = rng.random()
+        if roll < 0.05:
+            words += rng.choice(topics).split()
+        elif roll < 0.6:
+            words.append(rng.choice(filler))
+        else:
+            words.append(rare[min(int(rng.paretovariate(1.1)) - 1, len(rare) - 1)])
+    return " ".join(words)
+
+
+def content_words(keyword):
+    from timestampQues.keywords import STOPWORDS, tokenize
+
+    # Crude plural folding so "neural networks" matches "neural network".
+    return {word.rstrip("s") for word in tokenize(keyword) if word not in STOPWORDS}
+
+
+def matches(keyword, others, soft):
+    if not soft:
+        return keyword.lower() in {other.lower() for other in others}
+    words = content_words(keyword)
+    return any(words & content_words(other) for other in others)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", nargs="*")
+    parser.add_argument("--limit", type=int, default=20, help="cached transcripts to compare")
+    parser.add_argument("--synthetic-minutes", type=int, help="time a synthetic transcript of this length instead")
+    parser.add_argument("--keywords", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20, help="local runs per transcript (median is reported)")
+    parser.add_argument("--no-gemini", action="store_true")
+    args = parser.parse_args()
+
+    import django
+
+    django.setup()
+    from django.conf import settings
+
+    from timestampQues.keywords import document_frequencies, extract_keywords_local
+    from timestampQues.utils import extract_keywords_gemini
+
+    use_gemini = bool(settings.GOOGLE_GEMINI_API_KEY) and not args.no_gemini
+    table = document_frequencies()
+    print(f"DF table: {len(table.counts)} phrases over {table.documents} transcripts; Gemini: {'on' if use_gemini else 'off'}")
+
+    rows = []
+    for name, text in load_texts(args):
+        words = len(text.split())
+        extract_keywords_local(text, args.keywords)  # warm-up
+        local, local_ms = timed(lambda: extract_keywords_local(text, args.keywords), args.repeat)
+        print(f"\n{name}: {words} words ({words / WORDS_PER_MINUTE:.0f} min)")
+        print(f"  local  {local_ms:8.1f} ms  {local}")
+        if not use_gemini:
+            continue
+        gemini, gemini_ms = timed(lambda: extract_keywords_gemini(text, args.keywords), 1)
+        print(f"  gemini {gemini_ms:8.1f} ms  {gemini}")
+        if gemini:
+            rows.append({
+                "exact": sum(matches(k, gemini, False) for k in local) / max(len(local), 1),
+                "precision": sum(matches(k, gemini, True) for k in local) / max(len(local), 1),
+                "recall": sum(matches(k, local, True) for k in gemini) / len(gemini),
+                "local_ms": local_ms,
+                "gemini_ms": gemini_ms,
+            })
+
+    if rows:
+        print(f"\nOver {len(rows)} transcript(s), local vs Gemini:")
+        for key in ("exact", "precision", "recall", "local_ms", "gemini_ms"):
+            print(f"  {key:>10}: {statistics.mean(row[key] for row in rows):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Peak RSS of question paper OCR for scanned PDFs of increasing page count,
+with the Gemini call stubbed out. With page-at-a-time rendering the peak
+should stay flat as pages are added. Needs poppler (as pdf2image does).
+
+Each PDF is written to disk first and measured in a fresh interpreter, since
+ru_maxrss is a high-water mark: building the pages in the measuring process
+would set a peak of its own that grows with the page count.
+
+    python benchmarks/ocr_memory.py [--pages 5 15 30]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+
+def make_scanned_pdf(path, pages):
+    """
+    An image-only PDF (no text layer) of A4 pages at 150 dpi: mostly white with
+    a few dark strokes, so the file stays small while every rendered page is a
+    full-size bitmap. Pages are generated one at a time.
+    """
+    from PIL import Image, ImageDraw
+
+    def page_images():
+        for page in range(pages):
+            image = Image.new("RGB", (1240, 1754), "white")
+            draw = ImageDraw.Draw(image)
+            for line in range(40):
+                y = 100 + line * 40
+                draw.line((100, y, 100 + (page * 97 + line * 53) % 1000, y), fill="black", width=3)
+            yield image
+
+    images = page_images()
+    next(images).save(path, save_all=True, append_images=images)
+
+
+def measure(pdf_path):
+    """Runs in a fresh interpreter so ru_maxrss only covers OCR of this one PDF."""
+    from unittest import mock
+
+    import django
+
+    django.setup()
+    from questionPapers import utils
+
+    pdf_bytes = Path(pdf_path).read_bytes()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    with mock.patch.object(utils, "ocr_page", lambda model, png: time.sleep(0.05) or f"{len(png)} bytes"):
+        results = utils.ocr_pdf_pages(pdf_bytes)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "pages": len(results),
+        "seconds": round(time.perf_counter() - started, 2),
+        "pdf_mb": round(len(pdf_bytes) / 1024 ** 2, 2),
+        "baseline_mb": round(baseline / 1024, 1),
+        "peak_mb": round(peak / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 15, 30])
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure)
+        return
+
+    print(f"{'pages':>6} {'PDF MB':>7} {'seconds':>8} {'baseline MB':>12} {'peak MB':>8} {'growth MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            pdf_path = Path(tmp) / f"scan-{pages}.pdf"
+            make_scanned_pdf(pdf_path, pages)
+            output = subprocess.run(
+                [sys.executable, __file__, "--measure", str(pdf_path)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            row = json.loads(output.strip().splitlines()[-1])
+            print(f"{row['pages']:>6} {row['pdf_mb']:>7} {row['seconds']:>8} {row['baseline_mb']:>12} "
+                  f"{row['peak_mb']:>8} {row['peak_mb'] - row['baseline_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Compares how many /api/process/ requests are in flight at once on the sync
+(WSGI) view versus the async (ASGI) view, with YouTube and Gemini replaced by
+stubs that just wait.
+
+    python benchmarks/process_concurrency.py [--requests 200] [--wsgi-threads 8]
+
+The async view still runs the YouTube fetch (no async client) on the event
+loop's default executor; --fetch-threads sizes that pool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from timestampQues import utils, views
+from timestampQues.transcript import Transcript
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+def make_transcript():
+    return Transcript.from_segments(
+        {"text": f"binary search tree lecture part {i}", "start": i * 5.0, "duration": 5.0}
+        for i in range(2000)
+    )
+
+
+def stubs(args, in_flight):
+    transcript = make_transcript()
+
+    def fetch_transcript(video_id):
+        time.sleep(args.transcript_latency)
+        return transcript
+
+    def extract_keywords(text, num_keywords=7, timeout=None):
+        with in_flight:
+            time.sleep(args.gemini_latency)
+        return ["binary search tree"]
+
+    def get_questions(keywords):
+        with in_flight:
+            time.sleep(args.gemini_latency)
+        return [{"title": "Validate BST", "link": "https://leetcode.com/problems/validate-binary-search-tree/"}]
+
+    async def aextract_keywords(text, num_keywords=7, timeout=None):
+        with in_flight:
+            await asyncio.sleep(args.gemini_latency)
+        return ["binary search tree"]
+
+    async def aget_questions(keywords):
+        with in_flight:
+            await asyncio.sleep(args.gemini_latency)
+        return [{"title": "Validate BST", "link": "https://leetcode.com/problems/validate-binary-search-tree/"}]
+
+    return [
+        mock.patch.object(utils, "fetch_transcript", fetch_transcript),
+        mock.patch.object(utils, "extract_keywords_gemini", extract_keywords),
+        mock.patch.object(utils, "get_practice_questions_from_gemini", get_questions),
+        mock.patch.object(utils, "aextract_keywords_gemini", aextract_keywords),
+        mock.patch.object(utils, "aget_practice_questions_from_gemini", aget_questions),
+    ]
+
+
+def body(i):
+    # A distinct video per request so the result cache doesn't short-circuit the
+    # pipeline, and Gemini for both steps so the stubs above are what runs.
+    return json.dumps({
+        "url": f"https://www.youtube.com/watch?v=bench{i:06d}",
+        "timestamp": 600,
+        "keyword_engine": "gemini",
+        "question_source": "gemini",
+    })
+
+
+def run_wsgi(args, token):
+    factory = RequestFactory()
+
+    def one(i):
+        request = factory.post("/api/process/", data=body(i), content_type="application/json")
+        request.COOKIES["access_token"] = token
+        return views.generate_practice_questions(request).status_code
+
+    with ThreadPoolExecutor(max_workers=args.wsgi_threads) as pool:
+        return list(pool.map(one, range(args.requests)))
+
+
+async def run_asgi(args, token):
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=args.fetch_threads))
+    factory = AsyncRequestFactory()
+
+    async def one(i):
+        request = factory.post("/api/process/async/", data=body(args.requests + i), content_type="application/json")
+        request.COOKIES["access_token"] = token
+        return (await views.generate_practice_questions_async(request)).status_code
+
+    return await asyncio.gather(*(one(i) for i in range(args.requests)))
+
+
+def report(name, statuses, elapsed, in_flight):
+    ok = sum(1 for status in statuses if status == 200)
+    print(f"{name:<6} {ok}/{len(statuses)} ok  {elapsed:7.2f} s  "
+          f"{len(statuses) / elapsed:7.1f} req/s  peak in flight: {in_flight.peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--wsgi-threads", type=int, default=8, help="worker threads serving the sync view")
+    parser.add_argument("--fetch-threads", type=int, default=32, help="executor threads for the async transcript fetch")
+    parser.add_argument("--transcript-latency", type=float, default=0.2)
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # A throwaway file database: concurrent writers on an in-memory one hit table
+    # locks, and deferred transactions fail instead of waiting for the write lock.
+    settings.DATABASES["default"]["NAME"] = Path(tempfile.mkdtemp()) / "bench.sqlite3"
+    settings.DATABASES["default"]["OPTIONS"] = {"timeout": 60, "transaction_mode": "IMMEDIATE"}
+    call_command("migrate", verbosity=0)
+    user = User.objects.create_user("bench", password="bench")
+    token = str(AccessToken.for_user(user))
+
+    wsgi_in_flight, asgi_in_flight = InFlight(), InFlight()
+    # Every request gets the same keywords, which the question cache would answer.
+    with mock.patch.object(views.result_cache, "max_entries", 0), mock.patch.object(utils.question_cache, "max_entries", 0):
+        patches = stubs(args, wsgi_in_flight)
+        for patch in patches:
+            patch.start()
+        start = time.perf_counter()
+        statuses = run_wsgi(args, token)
+        report("WSGI", statuses, time.perf_counter() - start, wsgi_in_flight)
+        for patch in patches:
+            patch.stop()
+
+        patches = stubs(args, asgi_in_flight)
+        for patch in patches:
+            patch.start()
+        start = time.perf_counter()
+        statuses = asyncio.run(run_asgi(args, token))
+        report("ASGI", statuses, time.perf_counter() - start, asgi_in_flight)
+        for patch in patches:
+            patch.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Latency of question paper full-text search over a synthetic corpus, compared
+with the icontains scan the list endpoint does. Uses a throwaway SQLite
+database so the project's own db.sqlite3 is left alone.
+
+    python benchmarks/search_fts.py [--papers 100000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+# A Zipf-distributed synthetic vocabulary, so that like real exam text a few
+# words are everywhere and most are rare (queries pair up rarer words).
+VOCABULARY = [f"{a}{b}{c}" for a in "bcdfgklmnprstvz" for b in ("a", "e", "i", "o", "u", "ai", "ou") for c in (
+    "n", "r", "s", "t", "l", "x", "nd", "rt", "st", "mp", "ck", "ng", "sh", "th", "ph", "lm",
+)]
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def fake_text(rng, words):
+    return " ".join(rng.choices(VOCABULARY, WEIGHTS, k=words))
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def timed(func, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=300, help="words of parsed text per paper")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    import django
+    from django.conf import settings
+
+    db_dir = tempfile.mkdtemp()
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = os.path.join(db_dir, "bench.sqlite3")
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command("migrate", verbosity=0)
+
+    from questionPapers.models import Course, QuestionPaper, University
+    from questionPapers.search import rebuild_index, search_papers
+
+    rng = random.Random(0)
+    universities = [University.objects.create(name=f"University {i}") for i in range(20)]
+    courses = [Course.objects.create(university=u, name=f"Course {i}") for u in universities for i in range(5)]
+
+    started = time.perf_counter()
+    batch = []
+    for i in range(args.papers):
+        course = rng.choice(courses)
+        batch.append(QuestionPaper(
+            university_id=course.university_id,
+            course=course,
+            semester=rng.randint(1, 8),
+            year=rng.randint(2010, 2024),
+            subject=f"{fake_text(rng, 3)} {i}",
+            pdf_file=f"question_papers/{i:064x}.pdf",
+            content_hash=f"{i:064x}",
+            parsed_text=fake_text(rng, args.words),
+            status=QuestionPaper.DONE,
+        ))
+        if len(batch) == 5000:
+            QuestionPaper.objects.bulk_create(batch)
+            batch = []
+    QuestionPaper.objects.bulk_create(batch)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rebuild_index()
+    index_seconds = time.perf_counter() - started
+    print(f"{args.papers} papers loaded in {load_seconds:.1f}s, indexed in {index_seconds:.1f}s")
+
+    rare = VOCABULARY[len(VOCABULARY) // 2:]
+    queries = [" ".join(rng.sample(rare, 2)) for _ in range(args.queries)]
+
+    def icontains(query):
+        qs = QuestionPaper.objects.defer("parsed_text")
+        for term in query.split():
+            qs = qs.filter(parsed_text__icontains=term)
+        return list(qs[:20])
+
+    fts = timed(lambda query: search_papers(query, 20), queries)
+    # The scan is far slower; a handful of queries is enough to see it.
+    scan = timed(icontains, queries[:10])
+
+    print(f"{'method':>10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for name, samples in (("fts5", fts), ("icontains", scan)):
+        print(f"{name:>10} {percentile(samples, 50):>8.2f} {percentile(samples, 95):>8.2f} {statistics.mean(samples):>8.2f}")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
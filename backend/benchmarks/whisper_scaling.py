@@ -0,0 +1,119 @@
+"""
+Sharded transcription scaling: transcribes synthetic lecture audio (bursts
+of tone standing in for speech, separated by short pauses) with 1, 2, 4...
+worker processes and reports wall time, speedup, and whether the stitched
+segment times line up with the bursts.
+
+    python benchmarks/whisper_scaling.py --minutes 20 --workers 1 2 4 --engine fake
+    python benchmarks/whisper_scaling.py --minutes 10 --engine whisper --model base
+
+The fake engine burns CPU in proportion to the audio length and reports one
+segment per burst, so it measures the sharding and pool overhead without
+Whisper installed. Whisper itself can't recognise tones; with it only the
+timings are meaningful. Speedup is bounded by the cores of the machine.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.transcription import SAMPLE_RATE, ShardedTranscriber, load_whisper_model, split_at_silence  # noqa: E402
+
+BURST_SECONDS = (2.0, 8.0)
+PAUSE_SECONDS = (0.4, 1.5)
+
+
+def synthetic_lecture(minutes, seed=0):
+    """Audio and the (start, end) second ranges of its bursts."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    audio = rng.normal(0, 0.002, total).astype(np.float32)  # room noise
+    bursts = []
+    position = 0.5
+    while True:
+        length = rng.uniform(*BURST_SECONDS)
+        if (position + length) * SAMPLE_RATE >= total:
+            break
+        start, end = int(position * SAMPLE_RATE), int((position + length) * SAMPLE_RATE)
+        t = np.arange(end - start) / SAMPLE_RATE
+        audio[start:end] += 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * t).astype(np.float32)
+        bursts.append((position, position + length))
+        position += length + rng.uniform(*PAUSE_SECONDS)
+    return audio, bursts
+
+
+class FakeWhisper:
+    """Whisper-shaped model: ~``cost`` seconds of CPU per minute of audio, one segment per burst."""
+
+    def __init__(self, cost):
+        self.cost = cost
+
+    def transcribe(self, audio, **kwargs):
+        deadline = time.process_time() + self.cost * len(audio) / SAMPLE_RATE / 60
+        while time.process_time() < deadline:
+            pass
+        frame = SAMPLE_RATE // 50
+        loud = np.abs(audio[:len(audio) // frame * frame]).reshape(-1, frame).max(axis=1) > 0.1
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], loud.astype(np.int8), [0]])))
+        return {
+            "segments": [
+                {"text": f"burst {i}", "start": start / 50, "end": end / 50}
+                for i, (start, end) in enumerate(zip(edges[::2], edges[1::2]))
+            ]
+        }
+
+
+def load_fake(cost):
+    return FakeWhisper(cost)
+
+
+def check_alignment(segments, bursts, tolerance=0.1):
+    """Count of bursts matched by a segment starting within ``tolerance`` seconds, and of segments matching none."""
+    starts = np.array([segment["start"] for segment in segments])
+    matched = sum(bool(len(starts)) and np.min(np.abs(starts - start)) <= tolerance for start, _ in bursts)
+    return matched, len(segments) - matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shard-seconds", type=float, default=120)
+    parser.add_argument("--engine", choices=["fake", "whisper"], default="fake")
+    parser.add_argument("--model", default="base", help="Whisper model name")
+    parser.add_argument("--cost", type=float, default=1.0, help="fake engine CPU seconds per audio minute")
+    args = parser.parse_args()
+
+    audio, bursts = synthetic_lecture(args.minutes)
+    shards = split_at_silence(audio, args.shard_seconds)
+    cut_in_burst = sum(
+        any(start < cut / SAMPLE_RATE < end for start, end in bursts) for cut, _ in shards[1:]
+    )
+    print(f"{args.minutes:.0f} min of audio, {len(bursts)} bursts, {len(shards)} shards "
+          f"({cut_in_burst} cut inside a burst); {os.cpu_count()} CPU(s)")
+
+    loader, loader_args = (load_fake, (args.cost,)) if args.engine == "fake" else (load_whisper_model, (args.model,))
+    baseline = None
+    for workers in args.workers:
+        transcriber = ShardedTranscriber(workers, args.shard_seconds, loader, loader_args)
+        # Start every worker and load its model before timing.
+        list(transcriber.pool.map(time.sleep, [0.1] * workers))
+        started = time.perf_counter()
+        segments = transcriber.transcribe(audio)
+        elapsed = time.perf_counter() - started
+        transcriber.shutdown()
+        baseline = baseline or elapsed
+        line = f"  {workers} worker(s): {elapsed:7.2f} s  speedup {baseline / elapsed:4.2f}x  {len(segments)} segments"
+        if args.engine == "fake":
+            matched, extra = check_alignment(segments, bursts)
+            line += f"  aligned {matched}/{len(bursts)}, {extra} stray"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.worker import WorkerPool
+
+
+class Command(BaseCommand):
+    help = "Runs background job workers in the foreground until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Number of worker threads.")
+
+    def handle(self, *args, **options):
+        size = options['workers'] or max(1, settings.JOBS_WORKERS)
+        pool = WorkerPool(size=size, poll_interval=settings.JOBS_POLL_INTERVAL)
+        pool.start()
+        self.stdout.write(f"Running {size} job worker(s). Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers...")
+            pool.stop()
@@ -0,0 +1,172 @@
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """Raise from a handler to fail the job right away instead of retrying."""
+
+
+# kind -> handler(job); handlers register themselves with @job_handler.
+_handlers = {}
+
+
+def job_handler(kind):
+    """
+    Registers ``func(job)`` as the handler for jobs of ``kind``. Whatever it
+    returns (JSON-serializable) becomes ``job.result``; raising makes the job
+    retry with backoff until ``max_attempts`` is reached.
+    """
+    def register(func):
+        _handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, owner=None, max_attempts=None):
+    """Creates a queued job and wakes up this process's workers."""
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        owner=owner,
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    from .worker import wake_workers
+    wake_workers()
+    return job
+
+
+def _lease_until():
+    return timezone.now() + timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+
+
+def _held(job):
+    """The job, if ``job``'s worker still holds its lease (nobody re-claimed it)."""
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by)
+
+
+def set_progress(job, done, total):
+    """Records progress and extends the job's lease while it is still running."""
+    job.progress_done = done
+    job.progress_total = total
+    _held(job).update(progress_done=done, progress_total=total, locked_until=_lease_until())
+
+
+def heartbeat(job):
+    """Extends the job's lease; returns False if another worker has taken the job over."""
+    return bool(_held(job).update(locked_until=_lease_until()))
+
+
+class LeaseKeeper:
+    """
+    Renews a running job's lease every third of JOBS_LEASE_SECONDS from a
+    background thread, so a job that runs longer than one lease without
+    reporting progress isn't reclaimed (and run twice) by another worker.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.interval = settings.JOBS_LEASE_SECONDS / 3
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"job-{job.pk}-lease", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                if not heartbeat(self.job):
+                    logger.warning("Job %s was taken over by another worker", self.job.pk)
+                    return
+        except Exception:
+            logger.exception("Could not renew the lease of job %s", self.job.pk)
+        finally:
+            connection.close()
+
+
+def _expired(now):
+    # Running jobs whose lease ran out belong to a worker that died (or hung).
+    return Q(status=Job.RUNNING, locked_until__lt=now)
+
+
+def _claimable(now):
+    return Q(status=Job.QUEUED, run_after__lte=now) | (_expired(now) & Q(attempts__lt=F('max_attempts')))
+
+
+def _fail_exhausted(now):
+    """Fails expired jobs that have no attempts left, instead of running them again (e.g. a handler that kills its worker)."""
+    failed = Job.objects.filter(_expired(now), attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        error="The worker running the last attempt stopped without finishing it.",
+        finished_at=now,
+        locked_until=None,
+    )
+    if failed:
+        logger.warning("Failed %s job(s) whose last attempt's worker went away", failed)
+
+
+def claim(worker_id):
+    """Atomically takes the next runnable job for ``worker_id``, or returns None."""
+    now = timezone.now()
+    _fail_exhausted(now)
+    candidates = list(
+        Job.objects.filter(_claimable(now)).order_by('run_after', 'pk').values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(_claimable(now), pk=pk).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+            attempts=F('attempts') + 1,
+            started_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _finish(job, **fields):
+    """Saves the outcome of ``job``'s run unless its lease was lost meanwhile."""
+    if not _held(job).update(**fields):
+        logger.warning("Job %s (%s) was taken over by another worker; discarding this run's outcome", job.pk, job.kind)
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return True
+
+
+def run(job):
+    """Runs a claimed job and records success, a scheduled retry, or failure."""
+    handler = _handlers.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'.")
+        with LeaseKeeper(job):
+            result = handler(job)
+    except Exception as e:
+        logger.warning("Job %s (%s) attempt %s failed: %s", job.pk, job.kind, job.attempts, e)
+        error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        if job.is_last_attempt or handler is None or isinstance(e, JobFailed):
+            _finish(job, status=Job.FAILED, error=error, finished_at=timezone.now(), locked_until=None)
+        else:
+            backoff = settings.JOBS_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            _finish(job, status=Job.QUEUED, error=error, run_after=timezone.now() + timedelta(seconds=backoff), locked_until=None)
+        return
+
+    _finish(job, status=Job.DONE, result=result, error="", finished_at=timezone.now(), locked_until=None)
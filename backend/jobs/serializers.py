@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from .models import Job
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'progress_done', 'progress_total', 'attempts', 'max_attempts',
+                  'result', 'error', 'created_at', 'started_at', 'finished_at']
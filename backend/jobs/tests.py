@@ -0,0 +1,167 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import queue, worker
+from .models import Job
+from .queue import JobFailed, claim, enqueue, heartbeat, job_handler, run
+
+
+@job_handler('tests.echo')
+def echo_job(job):
+    return job.payload
+
+
+@job_handler('tests.flaky')
+def flaky_job(job):
+    raise RuntimeError("try again")
+
+
+@job_handler('tests.fatal')
+def fatal_job(job):
+    raise JobFailed("no point retrying")
+
+
+@override_settings(JOBS_WORKERS=0, JOBS_LEASE_SECONDS=600, JOBS_RETRY_BACKOFF=10, JOBS_MAX_ATTEMPTS=2)
+class QueueTests(TestCase):
+    def expire_lease(self, job):
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+    def test_claim_takes_each_job_once(self):
+        job = enqueue('tests.echo', {'n': 1})
+        claimed = claim('worker-a')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), (Job.RUNNING, 'worker-a', 1))
+        self.assertIsNone(claim('worker-b'))
+
+    def test_claim_skips_jobs_scheduled_for_later(self):
+        Job.objects.create(kind='tests.echo', run_after=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(claim('worker-a'))
+
+    def test_expired_lease_is_reclaimed(self):
+        enqueue('tests.echo')
+        job = claim('worker-a')
+        self.expire_lease(job)
+        reclaimed = claim('worker-b')
+        self.assertEqual((reclaimed.pk, reclaimed.locked_by, reclaimed.attempts), (job.pk, 'worker-b', 2))
+
+    def test_expired_last_attempt_fails_instead_of_running_again(self):
+        enqueue('tests.echo', max_attempts=1)
+        job = claim('worker-a')
+        self.expire_lease(job)
+        self.assertIsNone(claim('worker-b'))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_until), (Job.FAILED, 1, None))
+        self.assertIn("stopped without finishing", job.error)
+
+    def test_success_stores_result(self):
+        enqueue('tests.echo', {'n': 1})
+        run(claim('worker-a'))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result, job.locked_until), (Job.DONE, {'n': 1}, None))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_is_retried_with_backoff_then_fails(self):
+        enqueue('tests.flaky')
+        before = timezone.now()
+        run(claim('worker-a'))
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("RuntimeError: try again", job.error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=10))
+
+        Job.objects.update(run_after=timezone.now())
+        run(claim('worker-a'))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_job_failed_is_not_retried(self):
+        enqueue('tests.fatal')
+        run(claim('worker-a'))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+
+    def test_outcome_of_a_taken_over_run_is_discarded(self):
+        enqueue('tests.echo', {'n': 1})
+        stale = claim('worker-a')
+        self.expire_lease(stale)
+        current = claim('worker-b')
+
+        run(stale)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.locked_by, job.result), (Job.RUNNING, 'worker-b', None))
+        self.assertFalse(heartbeat(stale))
+
+        run(current)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_heartbeat_and_progress_extend_the_lease(self):
+        enqueue('tests.echo')
+        job = claim('worker-a')
+        self.expire_lease(job)
+        self.assertTrue(heartbeat(job))
+        self.assertGreater(Job.objects.get().locked_until, timezone.now() + timedelta(seconds=590))
+
+        self.expire_lease(job)
+        queue.set_progress(job, 3, 10)
+        job = Job.objects.get()
+        self.assertEqual((job.progress_done, job.progress_total), (3, 10))
+        self.assertGreater(job.locked_until, timezone.now() + timedelta(seconds=590))
+
+
+class WorkerStartupTests(TestCase):
+    def test_entry_points_start_configured_workers(self):
+        with mock.patch.object(worker, "start_workers") as start:
+            with override_settings(JOBS_WORKERS=0):
+                self.assertIsNone(worker.start_workers_from_settings())
+            with override_settings(JOBS_WORKERS=2):
+                worker.start_workers_from_settings()
+        start.assert_called_once_with()
+
+
+@override_settings(JOBS_WORKERS=0, JOBS_LEASE_SECONDS=0.6)
+class LeaseKeeperTests(TransactionTestCase):
+    def test_long_running_job_keeps_its_lease(self):
+        started = threading.Event()
+
+        @job_handler('tests.slow')
+        def slow_job(job):
+            started.set()
+            # Twice the lease, without reporting progress.
+            time.sleep(1.2)
+            return claim('worker-b') is None
+
+        enqueue('tests.slow')
+        run(claim('worker-a'))
+        job = Job.objects.get()
+        self.assertTrue(started.is_set())
+        self.assertEqual((job.status, job.result, job.attempts), (Job.DONE, True, 1))
+
+
+@override_settings(JOBS_WORKERS=0)
+class JobDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", password="pw")
+        cls.other = User.objects.create_user("other", password="pw", is_staff=True)
+        cls.job = Job.objects.create(kind='tests.echo', owner=cls.owner)
+        cls.ownerless = Job.objects.create(kind='tests.echo')
+
+    def get(self, user, job):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f"/api/jobs/{job.pk}/")
+
+    def test_owner_sees_job(self):
+        response = self.get(self.owner, self.job)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], Job.QUEUED)
+
+    def test_other_users_get_404(self):
+        self.assertEqual(self.get(self.other, self.job).status_code, 404)
+        self.assertEqual(self.get(self.owner, self.ownerless).status_code, 404)
@@ -0,0 +1,16 @@
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from .models import Job
+from .serializers import JobSerializer
+
+
+@api_view(['GET'])
+def job_detail(request, pk):
+    # Only the user who started a job can see it (404, not 403, for anyone else's).
+    try:
+        job = Job.objects.get(pk=pk, owner=request.user)
+    except Job.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    return Response(JobSerializer(job).data)
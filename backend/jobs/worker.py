@@ -0,0 +1,87 @@
+import logging
+import os
+import threading
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Threads in this process that poll the Job table and run what they claim."""
+
+    def __init__(self, size, poll_interval):
+        self.size = size
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for i in range(self.size):
+            worker_id = f"{os.getpid()}-{i}-{uuid.uuid4().hex[:6]}"
+            thread = threading.Thread(target=self._loop, args=(worker_id,), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join()
+
+    def _loop(self, worker_id):
+        while not self.stopping.is_set():
+            job = None
+            try:
+                close_old_connections()
+                job = queue.claim(worker_id)
+                if job is not None:
+                    queue.run(job)
+            except Exception:
+                logger.exception("Job worker %s crashed while polling", worker_id)
+            finally:
+                close_old_connections()
+            if job is None:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def start_workers(size=None):
+    """Starts this process's worker pool once; later calls return the same pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(
+                size=settings.JOBS_WORKERS if size is None else size,
+                poll_interval=settings.JOBS_POLL_INTERVAL,
+            )
+            _pool.start()
+        return _pool
+
+
+def start_workers_from_settings():
+    """
+    Starts JOBS_WORKERS in-process workers (called by the WSGI/ASGI entry
+    points), so jobs left queued, retrying or with an expired lease by a
+    previous process are picked up without waiting for a new enqueue.
+    """
+    if settings.JOBS_WORKERS > 0:
+        return start_workers()
+    return None
+
+
+def wake_workers():
+    """Nudges idle workers after an enqueue, starting them if configured to run in-process."""
+    if _pool is None and settings.JOBS_WORKERS > 0:
+        start_workers()
+    if _pool is not None:
+        _pool.wakeup.set()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class QuestionpapersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'questionPapers'
+
+    def ready(self):
+        from . import tasks  # noqa: F401  (registers job handlers)
+        from . import search  # noqa: F401  (keeps the full-text index in sync)
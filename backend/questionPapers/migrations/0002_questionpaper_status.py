@@ -0,0 +1,26 @@
+# Generated by Django 5.1.5 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+
+def mark_existing_papers(apps, schema_editor):
+    # Papers uploaded before background parsing were OCR'd inline.
+    QuestionPaper = apps.get_model('questionPapers', 'QuestionPaper')
+    QuestionPaper.objects.exclude(parsed_text__isnull=True).exclude(parsed_text='').update(status='done')
+    QuestionPaper.objects.filter(status='pending').update(status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionpaper',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('parsing', 'Parsing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_papers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.5 on 2026-10-17 21:30
+
+import hashlib
+
+import questionPapers.storage
+from django.db import migrations, models
+
+
+def hash_existing_papers(apps, schema_editor):
+    QuestionPaper = apps.get_model('questionPapers', 'QuestionPaper')
+    for paper in QuestionPaper.objects.filter(content_hash=''):
+        try:
+            with paper.pdf_file.open('rb') as f:
+                digest = hashlib.sha256()
+                for chunk in f.chunks():
+                    digest.update(chunk)
+        except (FileNotFoundError, ValueError):
+            continue
+        paper.content_hash = digest.hexdigest()
+        paper.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0002_questionpaper_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionpaper',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the PDF', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='questionpaper',
+            name='pdf_file',
+            field=models.FileField(storage=questionPapers.storage.ContentAddressedStorage(), upload_to=questionPapers.storage.question_paper_upload_to),
+        ),
+        migrations.RunPython(hash_existing_papers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.5 on 2026-10-17 21:50
+
+from django.db import migrations
+
+FTS_TABLE = "questionPapers_questionpaper_fts"
+PG_INDEX = "questionPapers_questionpaper_fts_gin"
+PG_DOCUMENT = "to_tsvector('english', coalesce(subject, '') || ' ' || coalesce(parsed_text, ''))"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE "{FTS_TABLE}" USING fts5('
+            "subject, university, course, parsed_text, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO "{FTS_TABLE}" (rowid, subject, university, course, parsed_text) '
+            "SELECT p.id, p.subject, u.name, c.name, coalesce(p.parsed_text, '') "
+            'FROM "questionPapers_questionpaper" p '
+            'JOIN "questionPapers_university" u ON u.id = p.university_id '
+            'JOIN "questionPapers_course" c ON c.id = p.course_id'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX "{PG_INDEX}" ON "questionPapers_questionpaper" USING gin ({PG_DOCUMENT})'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{PG_INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0003_questionpaper_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0004_questionpaper_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='qp_uploaded_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+def _normalize(value):
+    # Same as questionPapers.models.normalize, frozen here for the migration.
+    return " ".join((value or "").casefold().split())
+
+
+def fill_normalized_columns(apps, schema_editor):
+    for model_name, source, target in (
+        ('University', 'name', 'name_normalized'),
+        ('Course', 'name', 'name_normalized'),
+        ('QuestionPaper', 'subject', 'subject_normalized'),
+    ):
+        Model = apps.get_model('questionPapers', model_name)
+        rows = list(Model.objects.only('pk', source))
+        for row in rows:
+            setattr(row, target, _normalize(getattr(row, source)))
+        Model.objects.bulk_update(rows, [target], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0005_questionpaper_uploaded_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='name_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='questionpaper',
+            name='subject_normalized',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='university',
+            name='name_normalized',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_normalized_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['course', 'semester', 'subject_normalized'], name='qp_course_sem_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['semester', 'subject_normalized'], name='qp_sem_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['subject_normalized'], name='qp_subject_idx'),
+        ),
+    ]
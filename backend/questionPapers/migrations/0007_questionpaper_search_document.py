@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:12
+
+from django.db import migrations
+
+OLD_PG_INDEX = "questionPapers_questionpaper_fts_gin"
+OLD_PG_DOCUMENT = "to_tsvector('english', coalesce(subject, '') || ' ' || coalesce(parsed_text, ''))"
+PG_INDEX = "questionPapers_questionpaper_search_gin"
+# Same as questionPapers.search.PG_UPDATE_SQL, frozen here for the migration.
+PG_UPDATE_SQL = (
+    'UPDATE "questionPapers_questionpaper" p SET "search_document" = '
+    "setweight(to_tsvector('english', coalesce(p.subject, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(u.name, '') || ' ' || coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(p.parsed_text, '')), 'D') "
+    'FROM "questionPapers_university" u, "questionPapers_course" c '
+    "WHERE u.id = p.university_id AND c.id = p.course_id"
+)
+
+
+def add_search_document(apps, schema_editor):
+    # PostgreSQL only: the tsvector now also covers university and course
+    # names (which an expression index on the paper table can't), like SQLite's FTS5 table.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE "questionPapers_questionpaper" ADD COLUMN "search_document" tsvector')
+    schema_editor.execute(PG_UPDATE_SQL)
+    schema_editor.execute(f'CREATE INDEX "{PG_INDEX}" ON "questionPapers_questionpaper" USING gin ("search_document")')
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{OLD_PG_INDEX}"')
+
+
+def drop_search_document(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX "{OLD_PG_INDEX}" ON "questionPapers_questionpaper" USING gin ({OLD_PG_DOCUMENT})'
+    )
+    schema_editor.execute('ALTER TABLE "questionPapers_questionpaper" DROP COLUMN "search_document"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questionPapers', '0006_normalized_lookup_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_document, drop_search_document),
+    ]
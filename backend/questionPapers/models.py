@@ -1,7 +1,36 @@
 from django.db import models
+from .storage import content_addressed_storage, question_paper_upload_to
+
+
+def normalize(value):
+    """Case-folded, whitespace-collapsed form used by the *_normalized lookup columns."""
+    return " ".join((value or "").casefold().split())
+
+
+def _with_normalized(kwargs, source, target):
+    """save() kwargs that also write ``target`` when update_fields includes ``source``."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and source in update_fields:
+        kwargs['update_fields'] = {*update_fields, target}
+    return kwargs
+
+
+def prefix_filter(field, prefix):
+    """
+    Q for "``field`` starts with ``prefix``" as a plain range, which any B-tree
+    index can serve (LIKE 'x%' can't on SQLite's default collation, nor on
+    PostgreSQL without pattern ops).
+    """
+    return models.Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + "\U0010ffff"})
+
 
 class University(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    name_normalized = models.CharField(max_length=255, db_index=True, editable=False, default="")
+
+    def save(self, *args, **kwargs):
+        self.name_normalized = normalize(self.name)
+        super().save(*args, **_with_normalized(kwargs, 'name', 'name_normalized'))
 
     def __str__(self):
         return self.name
@@ -9,6 +38,11 @@ class University(models.Model):
 class Course(models.Model):
     university = models.ForeignKey(University, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    name_normalized = models.CharField(max_length=255, db_index=True, editable=False, default="")
+
+    def save(self, *args, **kwargs):
+        self.name_normalized = normalize(self.name)
+        super().save(*args, **_with_normalized(kwargs, 'name', 'name_normalized'))
 
     def __str__(self):
         return f"{self.university.name} - {self.name}"
@@ -16,20 +50,46 @@ class Course(models.Model):
 class QuestionPaper(models.Model):
     SEMESTER_CHOICES = [(i, f"Semester {i}") for i in range(1, 9)]
 
+    PENDING = 'pending'
+    PARSING = 'parsing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PARSING, 'Parsing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
     university = models.ForeignKey(University, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     semester = models.IntegerField(choices=SEMESTER_CHOICES)
 
     year = models.PositiveIntegerField()
     subject = models.CharField(max_length=255)
+    subject_normalized = models.CharField(max_length=255, editable=False, default="")
 
-    pdf_file = models.FileField(upload_to='question_papers/')
+    pdf_file = models.FileField(upload_to=question_paper_upload_to, storage=content_addressed_storage)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the PDF")
     parsed_text = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
 
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('university', 'course', 'semester', 'year', 'subject')
+        indexes = [
+            # Keyset pagination of the list endpoint walks this order.
+            models.Index(fields=['-uploaded_at', '-id'], name='qp_uploaded_at_id_idx'),
+            # The list endpoint's filter combinations (university is covered by unique_together).
+            models.Index(fields=['course', 'semester', 'subject_normalized'], name='qp_course_sem_subject_idx'),
+            models.Index(fields=['semester', 'subject_normalized'], name='qp_sem_subject_idx'),
+            models.Index(fields=['subject_normalized'], name='qp_subject_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.subject_normalized = normalize(self.subject)
+        super().save(*args, **_with_normalized(kwargs, 'subject', 'subject_normalized'))
 
     def __str__(self):
         return f"{self.university.name} - {self.course.name} - Sem {self.semester} - {self.year} - {self.subject}"
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class QuestionPaperCursorPagination(CursorPagination):
+    """
+    Keyset pagination, newest first. The cursor encodes the last row's
+    (uploaded_at, id), so every page is one indexed range query no matter how
+    deep it is, and there is no COUNT(*).
+    """
+    ordering = ('-uploaded_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
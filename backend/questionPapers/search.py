@@ -0,0 +1,189 @@
+"""
+Full-text search over question papers: subject, university and course
+names, and parsed text.
+
+SQLite keeps a separate FTS5 table (rowid = paper id), created by migration
+0004. PostgreSQL keeps a weighted tsvector in a GIN-indexed
+"search_document" column of the paper table (migration 0007). Both are
+updated from model signals. Other databases fall back to icontains filters.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Course, QuestionPaper, University
+
+FTS_TABLE = "questionPapers_questionpaper_fts"
+
+# Weighted like the FTS5 ranking below: subject A, university and course B, text D.
+PG_UPDATE_SQL = (
+    'UPDATE "questionPapers_questionpaper" p SET "search_document" = '
+    "setweight(to_tsvector('english', coalesce(p.subject, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(u.name, '') || ' ' || coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(p.parsed_text, '')), 'D') "
+    'FROM "questionPapers_university" u, "questionPapers_course" c '
+    "WHERE u.id = p.university_id AND c.id = p.course_id"
+)
+# ts_rank weights for {D, C, B, A}: the same 1:2:4 ratios as the FTS5 bm25() weights.
+PG_RANK_WEIGHTS = "{0.1, 0.2, 0.2, 0.4}"
+
+# Snippets are marked up with these private-use characters, escaped, and only
+# then given their <b> tags, so document text can't inject markup.
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_row(paper):
+    return (paper.pk, paper.subject, paper.university.name, paper.course.name, paper.parsed_text or "")
+
+
+def index_papers(papers):
+    """Adds or replaces the search index entries of the given papers."""
+    if connection.vendor == "postgresql":
+        ids = [paper.pk for paper in papers]
+        if ids:
+            with connection.cursor() as cursor:
+                cursor.execute(PG_UPDATE_SQL + " AND p.id = ANY(%s)", [ids])
+        return
+    if connection.vendor != "sqlite":
+        return
+    rows = [_fts_row(paper) for paper in papers]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM "{FTS_TABLE}" WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO "{FTS_TABLE}" (rowid, subject, university, course, parsed_text) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+REBUILD_SQL = (
+    f'INSERT INTO "{FTS_TABLE}" (rowid, subject, university, course, parsed_text) '
+    "SELECT p.id, p.subject, u.name, c.name, coalesce(p.parsed_text, '') "
+    'FROM "questionPapers_questionpaper" p '
+    'JOIN "questionPapers_university" u ON u.id = p.university_id '
+    'JOIN "questionPapers_course" c ON c.id = p.course_id'
+)
+
+
+def rebuild_index():
+    """Reindexes every paper, e.g. after bulk_create() or a raw import that bypassed signals."""
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(PG_UPDATE_SQL)
+        return
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM "{FTS_TABLE}"')
+        cursor.execute(REBUILD_SQL)
+
+
+def _fts5_query(query):
+    # Quote every term so user input can't use (or break on) FTS5 syntax; the
+    # last term is a prefix match so results show up while typing.
+    terms = _TOKEN.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _markup(snippet):
+    """HTML for a snippet: its text escaped, highlights as <b>."""
+    return html.escape(snippet or "").replace(HIGHLIGHT_START, "<b>").replace(HIGHLIGHT_END, "</b>")
+
+
+def _excerpt(text, terms, words=16):
+    """A ``words``-word stretch of ``text`` around the first match of ``terms``, matches highlighted."""
+    tokens = (text or "").split()
+    lowered = [token.casefold() for token in tokens]
+    first = next((i for i, token in enumerate(lowered) if any(term in token for term in terms)), 0)
+    start = max(0, first - words // 4)
+    shown = [
+        f"{HIGHLIGHT_START}{token}{HIGHLIGHT_END}" if any(term in low for term in terms) else token
+        for token, low in zip(tokens[start:start + words], lowered[start:start + words])
+    ]
+    return ("…" if start else "") + " ".join(shown) + ("…" if start + words < len(tokens) else "")
+
+
+def _search_icontains(query, limit):
+    # Every term must appear in one of the fields; unranked, newest first.
+    terms = [term.casefold() for term in _TOKEN.findall(query)]
+    if not terms:
+        return []
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(subject__icontains=term) | Q(university__name__icontains=term)
+            | Q(course__name__icontains=term) | Q(parsed_text__icontains=term)
+        )
+    papers = QuestionPaper.objects.filter(condition).order_by('-uploaded_at', '-id').only('pk', 'parsed_text')[:limit]
+    return [{"id": paper.pk, "rank": 0.0, "snippet": _markup(_excerpt(paper.parsed_text, terms))} for paper in papers]
+
+
+def search_papers(query, limit=20):
+    """
+    Ranked full-text search over paper text, subject, university and course.
+    Returns [{'id', 'rank', 'snippet'}], best match first; snippets are HTML
+    with the matches in <b>.
+    """
+    if connection.vendor == "sqlite":
+        match = _fts5_query(query)
+        if match is None:
+            return []
+        sql = (
+            f'SELECT rowid, bm25("{FTS_TABLE}", 4.0, 2.0, 2.0, 1.0) AS rank, '
+            f"snippet(\"{FTS_TABLE}\", 3, %s, %s, '…', 16) "
+            f'FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s ORDER BY rank LIMIT %s'
+        )
+        params = [HIGHLIGHT_START, HIGHLIGHT_END, match, limit]
+    elif connection.vendor == "postgresql":
+        sql = (
+            'SELECT id, ts_rank(%s::real[], "search_document", q) AS rank, '
+            "ts_headline('english', coalesce(parsed_text, ''), q, %s) "
+            'FROM "questionPapers_questionpaper", websearch_to_tsquery(\'english\', %s) q '
+            'WHERE "search_document" @@ q ORDER BY rank DESC LIMIT %s'
+        )
+        headline_options = f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", MaxFragments=1, MaxWords=16, MinWords=6'
+        params = [PG_RANK_WEIGHTS, headline_options, query, limit]
+    else:
+        return _search_icontains(query, limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [{"id": row[0], "rank": row[1], "snippet": _markup(row[2])} for row in cursor.fetchall()]
+
+
+INDEXED_FIELDS = {"subject", "parsed_text", "university", "course"}
+
+
+@receiver(post_save, sender=QuestionPaper)
+def _index_saved_paper(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields and not INDEXED_FIELDS & set(update_fields)):
+        return
+    index_papers([instance])
+
+
+@receiver(post_delete, sender=QuestionPaper)
+def _unindex_deleted_paper(sender, instance, **kwargs):
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{FTS_TABLE}" WHERE rowid = %s', [instance.pk])
+
+
+@receiver(post_save, sender=University)
+@receiver(post_save, sender=Course)
+def _reindex_renamed(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    lookup = "university" if sender is University else "course"
+    index_papers(QuestionPaper.objects.filter(**{lookup: instance}).select_related("university", "course"))
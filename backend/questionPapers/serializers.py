@@ -15,3 +15,17 @@ class QuestionPaperSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuestionPaper
         fields = '__all__'
+        read_only_fields = ['status', 'content_hash']
+
+class QuestionPaperListSerializer(serializers.ModelSerializer):
+    """Compact listing row: names instead of nested objects and no parsed_text (served by the detail endpoint)."""
+    university_name = serializers.CharField(source='university.name', read_only=True)
+    course_name = serializers.CharField(source='course.name', read_only=True)
+
+    class Meta:
+        model = QuestionPaper
+        fields = [
+            'id', 'university', 'university_name', 'course', 'course_name',
+            'semester', 'year', 'subject', 'pdf_file', 'status', 'uploaded_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,36 @@
+import hashlib
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def sha256_of(file) -> str:
+    """Hex SHA-256 of an uploaded (or any Django) file, read in chunks."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def question_paper_upload_to(instance, filename):
+    # Named after the content hash, so identical uploads map to the same file.
+    if instance.content_hash:
+        return f"question_papers/{instance.content_hash}.pdf"
+    return f"question_papers/{filename}"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage where a name that already exists holds the same bytes, so it's reused instead of rewritten."""
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+content_addressed_storage = ContentAddressedStorage()
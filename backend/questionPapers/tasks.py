@@ -0,0 +1,44 @@
+from jobs.queue import job_handler, set_progress
+from .models import QuestionPaper
+from .utils import ocr_pdf_pages
+
+
+@job_handler('questionPapers.parse_pdf')
+def parse_question_paper(job):
+    paper = QuestionPaper.objects.get(pk=job.payload['paper_id'])
+
+    # An identical upload may have finished parsing while this one was queued.
+    parsed = (
+        QuestionPaper.objects.filter(content_hash=paper.content_hash, status=QuestionPaper.DONE)
+        .exclude(pk=paper.pk)
+        .first()
+    ) if paper.content_hash else None
+    if parsed is not None:
+        paper.parsed_text = parsed.parsed_text
+        paper.status = QuestionPaper.DONE
+        paper.save(update_fields=['parsed_text', 'status'])
+        return {'paper_id': paper.pk, 'characters': len(paper.parsed_text or ''), 'reused_from': parsed.pk}
+
+    paper.status = QuestionPaper.PARSING
+    paper.save(update_fields=['status'])
+
+    try:
+        with paper.pdf_file.open('rb') as f:
+            pdf_bytes = f.read()
+        pages = ocr_pdf_pages(pdf_bytes, progress=lambda done, total: set_progress(job, done, total))
+    except Exception:
+        paper.status = QuestionPaper.FAILED if job.is_last_attempt else QuestionPaper.PENDING
+        paper.save(update_fields=['status'])
+        raise
+
+    paper.parsed_text = "\n".join(page.text for page in pages).strip()
+    paper.status = QuestionPaper.DONE
+    paper.save(update_fields=['parsed_text', 'status'])
+    return {
+        'paper_id': paper.pk,
+        'characters': len(paper.parsed_text),
+        'pages': [
+            {'page': page.page, 'method': page.method, 'seconds': round(page.seconds, 3), 'attempts': page.attempts}
+            for page in pages
+        ],
+    }
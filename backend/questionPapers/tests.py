@@ -1,3 +1,358 @@
-from django.test import TestCase
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from . import search, tasks, utils
+from .models import Course, QuestionPaper, University
+from .storage import ContentAddressedStorage
+from .pagination import QuestionPaperCursorPagination
+from .views import filter_question_papers
+
+# A "SCAN <table>" line without "USING ... INDEX" is a full table scan.
+FULL_SCAN = re.compile(r"\bSCAN (\S+)$", re.MULTILINE)
+
+
+def make_text_pdf(page_texts):
+    """A minimal PDF with one page of Helvetica text (a text layer) per string."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        lines = [text[i:i + 80] for i in range(0, len(text), 80)]
+        stream = "BT /F1 10 Tf 40 800 Td 12 TL " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return pdf
+
+
+def assert_uses_indexes(test, queryset):
+    plan = queryset.explain()
+    test.assertIsNone(FULL_SCAN.search(plan), f"Full table scan in:\n{plan}")
+
+
+@skipUnless(connection.vendor == 'sqlite', "Checks SQLite's EXPLAIN QUERY PLAN output")
+class QuestionPaperListIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        university = University.objects.create(name="Delhi University")
+        course = Course.objects.create(university=university, name="B.Tech CSE")
+        QuestionPaper.objects.create(
+            university=university, course=course, semester=3, year=2023,
+            subject="Operating Systems", pdf_file="question_papers/os.pdf",
+        )
+
+    def page_query(self, **params):
+        ordering = QuestionPaperCursorPagination.ordering
+        return filter_question_papers(params).order_by(*ordering)[:QuestionPaperCursorPagination.page_size + 1]
+
+    def test_filters_use_normalized_columns(self):
+        self.assertEqual(self.page_query(university="  delhi ").count(), 1)
+        self.assertEqual(self.page_query(course="b.tech").count(), 1)
+        self.assertEqual(self.page_query(subject="OPERATING sys").count(), 1)
+        self.assertEqual(self.page_query(subject="systems").count(), 0)
+
+    def test_hot_queries_use_indexes(self):
+        for params in (
+            {},
+            {'university': 'delhi'},
+            {'course': 'b.tech'},
+            {'semester': '3'},
+            {'subject': 'operating'},
+            {'semester': '3', 'subject': 'operating'},
+            {'university': 'delhi', 'semester': '3'},
+            {'course': 'b.tech', 'semester': '3', 'subject': 'operating'},
+        ):
+            with self.subTest(**params):
+                assert_uses_indexes(self, self.page_query(**params))
+
+
+class NormalizedColumnTests(TestCase):
+    def test_partial_saves_keep_normalized_columns_in_sync(self):
+        university = University.objects.create(name="Delhi University")
+        course = Course.objects.create(university=university, name="B.Tech CSE")
+        paper = QuestionPaper.objects.create(
+            university=university, course=course, semester=3, year=2023,
+            subject="Operating Systems", pdf_file="question_papers/os.pdf",
+        )
+        for instance, field, value in (
+            (university, "name", "  Jamia  Millia "),
+            (course, "name", "BCA"),
+            (paper, "subject", "Computer NETWORKS"),
+        ):
+            setattr(instance, field, value)
+            instance.save(update_fields=[field])
+            instance.refresh_from_db()
+            normalized = "subject_normalized" if field == "subject" else "name_normalized"
+            self.assertEqual(getattr(instance, normalized), " ".join(value.casefold().split()))
+
+
+@skipUnless(utils.PdfReader is not None, "Reading text layers needs pypdf")
+class TextLayerTests(SimpleTestCase):
+    PAGES = [
+        "Operating Systems mid term examination. Answer all questions. " * 5,
+        "Explain paging and segmentation with a neat diagram of address translation. " * 4,
+        "Compare the FCFS, SJF and round robin scheduling algorithms with examples. " * 4,
+    ]
+
+    def test_pages_with_text_skip_ocr(self):
+        with mock.patch.object(utils, "ocr_page", side_effect=AssertionError("OCR called")):
+            pages = utils.ocr_pdf_pages(make_text_pdf(self.PAGES))
+        self.assertEqual([page.method for page in pages], [utils.TEXT_LAYER] * 3)
+        self.assertEqual([page.page for page in pages], [1, 2, 3])
+        self.assertIn("paging and segmentation", pages[1].text)
+
+    def test_page_seconds_are_per_page(self):
+        # Every clock reading one second after the last: each page's own
+        # extraction took 1s, while elapsed-since-start would grow per page.
+        clock = itertools.count()
+        with mock.patch.object(utils.time, "perf_counter", side_effect=lambda: float(next(clock))):
+            pages = utils.ocr_pdf_pages(make_text_pdf(self.PAGES))
+        self.assertEqual([page.seconds for page in pages], [1.0, 1.0, 1.0])
+
+
+def make_scanned_pdf(path, pages):
+    """An image-only A4 PDF at 150 dpi: a few strokes per page, so the file stays small."""
+    from PIL import Image, ImageDraw
+
+    def page_images():
+        for page in range(pages):
+            image = Image.new("RGB", (1240, 1754), "white")
+            draw = ImageDraw.Draw(image)
+            for line in range(40):
+                y = 100 + line * 40
+                draw.line((100, y, 100 + (page * 97 + line * 53) % 1000, y), fill="black", width=3)
+            yield image
+
+    images = page_images()
+    next(images).save(path, save_all=True, append_images=images)
+
+
+# Peak RSS growth of ocr_pdf_pages() (Gemini stubbed out) over the state just
+# before it, in a fresh interpreter: ru_maxrss is a high-water mark, so it only
+# means something in a process that did nothing bigger beforehand.
+MEMORY_PROBE = """
+import json, resource, sys
+from pathlib import Path
+from unittest import mock
+import django
+django.setup()
+from questionPapers import utils
+pdf_bytes = Path(sys.argv[1]).read_bytes()
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with mock.patch.object(utils, "ocr_page", lambda model, png: "text"):
+    pages = utils.ocr_pdf_pages(pdf_bytes)
+print(json.dumps({
+    "pages": len(pages),
+    "growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline,
+}))
+"""
+
+# One A4 page rendered at render_pages()' 200 dpi, as RGB.
+RENDERED_PAGE_KB = 1654 * 2339 * 3 // 1024
+
+
+@skipUnless(shutil.which("pdftoppm") and shutil.which("pdfinfo"), "Rendering pages needs poppler")
+class RenderMemoryTests(SimpleTestCase):
+    def peak_growth_kb(self, pages):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = Path(tmp) / "scan.pdf"
+            make_scanned_pdf(pdf_path, pages)
+            output = subprocess.run(
+                [sys.executable, "-c", MEMORY_PROBE, str(pdf_path)],
+                cwd=Path(__file__).resolve().parent.parent,
+                env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings")},
+                check=True, capture_output=True, text=True,
+            ).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        self.assertEqual(row["pages"], pages)
+        return row["growth_kb"]
+
+    def test_peak_memory_does_not_grow_with_page_count(self):
+        few, many = self.peak_growth_kb(4), self.peak_growth_kb(16)
+        # Holding every page at once would add about 12 rendered pages.
+        self.assertLess(many - few, 2 * RENDERED_PAGE_KB)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        delhi = University.objects.create(name="Delhi University")
+        mumbai = University.objects.create(name="Mumbai University")
+        cls.os_paper = QuestionPaper.objects.create(
+            university=delhi, course=Course.objects.create(university=delhi, name="B.Tech CSE"),
+            semester=3, year=2023, subject="Operating Systems", pdf_file="question_papers/os.pdf",
+            parsed_text="Q1. Explain <script>alert(1)</script> paging & segmentation in detail.",
+        )
+        cls.dbms_paper = QuestionPaper.objects.create(
+            university=mumbai, course=Course.objects.create(university=mumbai, name="BCA"),
+            semester=4, year=2022, subject="Database Systems", pdf_file="question_papers/dbms.pdf",
+            parsed_text="Q1. Normalize the relation to BCNF. Q2. Explain paging in buffer management.",
+        )
+
+    def ids(self, query):
+        return [hit["id"] for hit in search.search_papers(query)]
+
+    def check_matching(self):
+        self.assertEqual(self.ids("segmentation"), [self.os_paper.pk])
+        self.assertEqual(set(self.ids("paging")), {self.os_paper.pk, self.dbms_paper.pk})
+        # University and course names are searched too, combined with the text.
+        self.assertEqual(self.ids("mumbai paging"), [self.dbms_paper.pk])
+        self.assertEqual(self.ids("bca"), [self.dbms_paper.pk])
+        self.assertEqual(self.ids("nonexistentword"), [])
+
+    @skipUnless(connection.vendor == 'sqlite', "Uses the SQLite FTS5 index")
+    def test_fts_matches_text_and_names(self):
+        self.check_matching()
+        self.assertEqual(self.ids("operating")[0], self.os_paper.pk)
+
+    @skipUnless(connection.vendor == 'sqlite', "Uses the SQLite FTS5 index")
+    def test_renamed_university_is_reindexed(self):
+        university = self.os_paper.university
+        university.name = "Jamia University"
+        university.save()
+        self.assertEqual(self.ids("jamia"), [self.os_paper.pk])
+        self.assertEqual(self.ids("delhi"), [])
+
+    def test_snippet_escapes_document_text(self):
+        for vendor in (connection.vendor, "other"):
+            with self.subTest(vendor=vendor), mock.patch.object(connection, "vendor", vendor):
+                snippet = search.search_papers("segmentation")[0]["snippet"]
+                self.assertNotIn("<script>", snippet)
+                self.assertIn("&lt;script&gt;", snippet)
+                self.assertIn("<b>segmentation</b>", snippet)
+                self.assertIn("&amp;", snippet)
+
+    def test_other_databases_fall_back_to_icontains(self):
+        with mock.patch.object(connection, "vendor", "other"):
+            self.check_matching()
+
+
+class MediaRootMixin:
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = Path(media.name)
+        settings = override_settings(MEDIA_ROOT=media.name, JOBS_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class DuplicateUploadTests(MediaRootMixin, TestCase):
+    PDF = make_text_pdf(["Q1. Explain paging."])
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("student", password="pw")
+        cls.university = University.objects.create(name="Delhi University")
+        cls.course = Course.objects.create(university=cls.university, name="B.Tech CSE")
+
+    def upload(self, subject):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.post("/api/question-papers/", {
+            "university": self.university.pk, "course": self.course.pk, "semester": 3, "year": 2023,
+            "subject": subject, "pdf_file": SimpleUploadedFile("paper.pdf", self.PDF, content_type="application/pdf"),
+        }, format="multipart")
+
+    def test_same_bytes_reuse_the_file_and_text_without_a_job(self):
+        first = self.upload("Operating Systems")
+        self.assertEqual(first.status_code, 202)
+        QuestionPaper.objects.filter(pk=first.data["id"]).update(status=QuestionPaper.DONE, parsed_text="Q1. Explain paging.")
+
+        second = self.upload("Operating Systems (reappear)")
+        self.assertEqual(second.status_code, 201)
+        self.assertNotIn("job_id", second.data)
+        self.assertEqual((second.data["status"], second.data["parsed_text"]), (QuestionPaper.DONE, "Q1. Explain paging."))
+        self.assertEqual(second.data["pdf_file"], first.data["pdf_file"])
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(len(list((self.media_root / "question_papers").iterdir())), 1)
+
+    def test_duplicate_queued_before_the_first_finished_reuses_its_text(self):
+        first = self.upload("Operating Systems")
+        second = self.upload("Operating Systems (reappear)")
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        QuestionPaper.objects.filter(pk=first.data["id"]).update(status=QuestionPaper.DONE, parsed_text="Q1. Explain paging.")
+
+        with mock.patch.object(tasks, "ocr_pdf_pages", side_effect=AssertionError("OCR'd again")):
+            result = tasks.parse_question_paper(Job.objects.get(pk=second.data["job_id"]))
+        self.assertEqual(result["reused_from"], first.data["id"])
+        paper = QuestionPaper.objects.get(pk=second.data["id"])
+        self.assertEqual((paper.status, paper.parsed_text), (QuestionPaper.DONE, "Q1. Explain paging."))
+
+
+class ContentAddressedStorageTests(SimpleTestCase):
+    def test_existing_name_is_not_rewritten(self):
+        with tempfile.TemporaryDirectory() as directory:
+            storage = ContentAddressedStorage(location=directory)
+            self.assertEqual(storage.save("question_papers/abc.pdf", ContentFile(b"first")), "question_papers/abc.pdf")
+            self.assertEqual(storage.save("question_papers/abc.pdf", ContentFile(b"second")), "question_papers/abc.pdf")
+            with storage.open("question_papers/abc.pdf") as f:
+                self.assertEqual(f.read(), b"first")
+            self.assertEqual(os.listdir(Path(directory) / "question_papers"), ["abc.pdf"])
+
+
+class QuestionPaperListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("student", password="pw")
+        university = University.objects.create(name="Delhi University")
+        course = Course.objects.create(university=university, name="B.Tech CSE")
+        for i in range(7):
+            QuestionPaper.objects.create(
+                university=university, course=course, semester=3, year=2023, subject=f"Subject {i}",
+                pdf_file=f"question_papers/{i}.pdf", parsed_text="Q1. " * 1000,
+            )
+        # Runs of equal uploaded_at, so page boundaries fall inside them.
+        for ids, second in ((range(0, 4), 1), (range(4, 7), 2)):
+            QuestionPaper.objects.filter(subject__in=[f"Subject {i}" for i in ids]).update(
+                uploaded_at=datetime(2024, 1, 1, 0, 0, second, tzinfo=timezone.utc),
+            )
+
+    def test_pages_cover_every_paper_once_in_constant_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url, seen = "/api/question-papers/?page_size=3", []
+        while url:
+            with self.assertNumQueries(1), CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            self.assertNotIn("parsed_text", queries[0]["sql"])
+            for item in response.data["results"]:
+                self.assertNotIn("parsed_text", item)
+                seen.append(item["id"])
+            url = response.data["next"]
+
+        expected = list(QuestionPaper.objects.order_by("-uploaded_at", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
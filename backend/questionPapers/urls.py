@@ -3,5 +3,6 @@ from . import views
 
 urlpatterns = [
     path('question-papers/', views.question_paper_list_create, name='question-paper-list-create'),
+    path('question-papers/search/', views.question_paper_search, name='question-paper-search'),
     path('question-papers/<int:pk>/', views.question_paper_detail, name='question-paper-detail'),
 ]
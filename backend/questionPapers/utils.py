@@ -0,0 +1,198 @@
+from PIL import Image
+import io
+import logging
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+from django.conf import settings
+from backend.model_registry import gemini
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional: without it every page goes through OCR
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+
+TEXT_LAYER = "text_layer"
+OCR = "ocr"
+
+
+class PageResult(NamedTuple):
+    page: int          # 1-based page number
+    text: str
+    seconds: float     # wall time for this page, retries included
+    attempts: int
+    method: str        # TEXT_LAYER or OCR
+
+
+def image_to_png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_pages(pdf_path, page_numbers, dpi=200):
+    """
+    Yields (page number, PNG bytes) for each requested page, rasterizing one
+    page at a time so only a single full-resolution image is alive at once.
+    """
+    from pdf2image import convert_from_path  # only needed once a page must be OCR'd
+
+    for page_number in page_numbers:
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+        try:
+            png = image_to_png_bytes(images[0])
+        finally:
+            for image in images:
+                image.close()
+            del images
+        yield page_number, png
+
+
+def ocr_page(model, png: bytes) -> str:
+    response = model.generate_content([
+        {
+            "type": "text",
+            "text": "Extract all text from this image. Return only the text.",
+        },
+        {
+            "type": "image",
+            "image": {
+                "data": png,
+                "mime_type": "image/png"
+            }
+        }
+    ], cache_if=lambda text: bool(text.strip()))
+    return response.text.strip()
+
+
+def _ocr_page_with_retries(model, png: bytes, page: int) -> PageResult:
+    started = time.perf_counter()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            text = ocr_page(model, png)
+            return PageResult(page, text, time.perf_counter() - started, attempts, OCR)
+        except Exception as e:
+            if attempts >= settings.OCR_PAGE_ATTEMPTS:
+                raise RuntimeError(f"OCR failed for page {page} after {attempts} attempts: {e}") from e
+            delay = settings.OCR_RETRY_BACKOFF * 2 ** (attempts - 1)
+            logger.warning("OCR of page %s failed (attempt %s), retrying in %ss: %s", page, attempts, delay, e)
+            time.sleep(delay)
+
+
+def usable_text_layer(text: str | None) -> bool:
+    """
+    Whether text extracted from a page's text layer can stand in for OCR: enough
+    of it, and mostly real words rather than the glyph soup (or "(cid:NN)"
+    placeholders) that fonts without a Unicode mapping produce.
+    """
+    if not text:
+        return False
+    stripped = text.strip()
+    if len(stripped) < settings.OCR_TEXT_LAYER_MIN_CHARS or "(cid:" in stripped:
+        return False
+    printable = sum(1 for char in stripped if char.isprintable() or char.isspace())
+    if printable / len(stripped) < 0.95:
+        return False
+    words = stripped.split()
+    wordlike = sum(1 for word in words if sum(char.isalpha() for char in word) >= len(word) / 2)
+    return wordlike / len(words) >= 0.6
+
+
+def read_text_layers(pdf_bytes) -> list[tuple[str | None, float]] | None:
+    """
+    (embedded text, seconds it took to extract) of each page, the text None
+    for pages that need OCR. Returns None when the PDF can't be read (or pypdf
+    isn't installed) so the caller OCRs everything.
+    """
+    if PdfReader is None:
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        pages = []
+        for page in reader.pages:
+            started = time.perf_counter()
+            text = page.extract_text()
+            pages.append((text.strip() if usable_text_layer(text) else None, time.perf_counter() - started))
+        return pages
+    except Exception as e:
+        logger.warning("Could not read the PDF text layer, falling back to OCR: %s", e)
+        return None
+
+
+def ocr_pdf_pages(pdf_bytes, progress=None) -> list[PageResult]:
+    """
+    Extracts the text of every page of a PDF. Pages with a usable embedded text
+    layer are read directly; the rest are rendered one at a time and OCR'd with
+    at most OCR_MAX_IN_FLIGHT Gemini calls at once, each page retried on its own.
+    A page is only rendered once a slot is free, so memory stays bounded by the
+    in-flight limit rather than the page count. Results are in page order;
+    ``progress(done, total)`` is called as pages finish.
+    """
+    text_layers = read_text_layers(pdf_bytes)
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+        pdf_file.write(pdf_bytes)
+        pdf_file.flush()
+
+        if text_layers is None:
+            from pdf2image import pdfinfo_from_path
+
+            text_layers = [(None, 0.0)] * pdfinfo_from_path(pdf_file.name)["Pages"]
+        total = len(text_layers)
+
+        results = [None] * total
+        done = 0
+        for page_number, (text, seconds) in enumerate(text_layers, start=1):
+            if text is not None:
+                results[page_number - 1] = PageResult(page_number, text, seconds, 1, TEXT_LAYER)
+                done += 1
+        if done:
+            logger.info("Read %s/%s page(s) from the PDF text layer without OCR", done, total)
+            if progress:
+                progress(done, total)
+
+        to_ocr = [page_number for page_number in range(1, total + 1) if results[page_number - 1] is None]
+        if not to_ocr:
+            return results
+
+        model = gemini().model("gemini-1.5-pro")
+        max_in_flight = max(1, settings.OCR_MAX_IN_FLIGHT)
+        pages = render_pages(pdf_file.name, to_ocr)
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+            try:
+                while True:
+                    for page_number, png in pages:
+                        in_flight.add(pool.submit(_ocr_page_with_retries, model, png, page_number))
+                        del png
+                        if len(in_flight) >= max_in_flight:
+                            break
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        result = future.result()
+                        results[result.page - 1] = result
+                        done += 1
+                        logger.info("OCR page %s/%s took %.2fs (%s attempt(s))", result.page, total, result.seconds, result.attempts)
+                        if progress:
+                            progress(done, total)
+            except Exception:
+                # Don't wait on the rest of an upload that is going to fail anyway.
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+    return results
+
+
+# Extract text from PDF using Gemini
+def extract_text_with_gemini_from_pdf(pdf_bytes, progress=None):
+    """OCRs every page; ``progress(done, total)`` is called as pages finish if given."""
+    return "\n".join(page.text for page in ocr_pdf_pages(pdf_bytes, progress)).strip()
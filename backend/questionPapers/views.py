@@ -1,90 +1,71 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .models import University, Course, QuestionPaper
-from .serializers import UniversitySerializer, CourseSerializer, QuestionPaperSerializer
-
-from pdf2image import convert_from_bytes
-from PIL import Image
-import base64
-import io
-import google.generativeai as genai
-from django.conf import settings
-
-# Configure Gemini
-genai.configure(api_key=settings.GOOGLE_GEMINI_API_KEY)
-
-# Convert image to base64
-def image_to_base64(image: Image.Image) -> str:
-    buffer = io.BytesIO()
-    image.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode()
-
-# Extract text from PDF using Gemini
-def extract_text_with_gemini_from_pdf(pdf_bytes):
-    images = convert_from_bytes(pdf_bytes, dpi=200)
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    extracted_text = ""
-
-    for img in images:
-        base64_img = image_to_base64(img)
-        response = model.generate_content([
-            {
-                "type": "text",
-                "text": "Extract all text from this image. Return only the text.",
-            },
-            {
-                "type": "image",
-                "image": {
-                    "data": base64.b64decode(base64_img),
-                    "mime_type": "image/png"
-                }
-            }
-        ])
-        extracted_text += response.text.strip() + "\n"
-
-    return extracted_text.strip()
+from .models import University, Course, QuestionPaper, normalize, prefix_filter
+from .serializers import UniversitySerializer, CourseSerializer, QuestionPaperSerializer, QuestionPaperListSerializer
+from .pagination import QuestionPaperCursorPagination
+from .storage import sha256_of
+from .search import search_papers
+from jobs.queue import enqueue
+
+
+def filter_question_papers(params):
+    """The list endpoint's queryset for the ?university=&course=&semester=&subject= filters."""
+    university = params.get('university')
+    course = params.get('course')
+    semester = params.get('semester')
+    subject = params.get('subject')
+
+    # parsed_text can be huge; the list only needs metadata (full text is on the detail endpoint).
+    qps = QuestionPaper.objects.select_related('university', 'course').defer('parsed_text')
+
+    # Case-insensitive prefix matches on the indexed *_normalized columns;
+    # /api/question-papers/search/ covers matching anywhere in the text.
+    if university:
+        qps = qps.filter(prefix_filter('university__name_normalized', normalize(university)))
+    if course:
+        qps = qps.filter(prefix_filter('course__name_normalized', normalize(course)))
+    if semester:
+        qps = qps.filter(semester=semester)
+    if subject:
+        qps = qps.filter(prefix_filter('subject_normalized', normalize(subject)))
+    return qps
+
 
 # --- Upload & List Question Papers ---
 @api_view(['GET', 'POST'])
 def question_paper_list_create(request):
     if request.method == 'GET':
-        university = request.GET.get('university')
-        course = request.GET.get('course')
-        semester = request.GET.get('semester')
-        subject = request.GET.get('subject')
-
-        qps = QuestionPaper.objects.all()
+        qps = filter_question_papers(request.GET)
 
-        if university:
-            qps = qps.filter(university__name__icontains=university)
-        if course:
-            qps = qps.filter(course__name__icontains=course)
-        if semester:
-            qps = qps.filter(semester=semester)
-        if subject:
-            qps = qps.filter(subject__icontains=subject)
-
-        serializer = QuestionPaperSerializer(qps, many=True)
-        return Response(serializer.data)
+        paginator = QuestionPaperCursorPagination()
+        page = paginator.paginate_queryset(qps, request)
+        serializer = QuestionPaperListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     if request.method == 'POST':
         serializer = QuestionPaperSerializer(data=request.data)
         if serializer.is_valid():
-            qp_instance = serializer.save()
+            content_hash = sha256_of(serializer.validated_data['pdf_file'])
+
+            # Same bytes uploaded before: reuse that paper's text instead of OCR'ing again.
+            parsed = QuestionPaper.objects.filter(content_hash=content_hash, status=QuestionPaper.DONE).first()
+            if parsed is not None:
+                qp_instance = serializer.save(
+                    content_hash=content_hash,
+                    parsed_text=parsed.parsed_text,
+                    status=QuestionPaper.DONE,
+                )
+                return Response(QuestionPaperSerializer(qp_instance).data, status=status.HTTP_201_CREATED)
 
-            # Extract text from uploaded PDF using Gemini OCR
-            try:
-                with qp_instance.pdf_file.open('rb') as f:
-                    pdf_bytes = f.read()
-                    text = extract_text_with_gemini_from_pdf(pdf_bytes)
+            qp_instance = serializer.save(content_hash=content_hash, status=QuestionPaper.PENDING)
 
-                qp_instance.parsed_text = text.strip()
-                qp_instance.save()
-            except Exception as e:
-                return Response({"error": "PDF parsing failed", "details": str(e)}, status=500)
+            # OCR runs in a background job; poll /api/jobs/<job_id>/ or the paper's status.
+            job = enqueue('questionPapers.parse_pdf', {'paper_id': qp_instance.pk}, owner=request.user)
 
-            return Response(QuestionPaperSerializer(qp_instance).data, status=status.HTTP_201_CREATED)
+            data = QuestionPaperSerializer(qp_instance).data
+            data['job_id'] = job.pk
+            return Response(data, status=status.HTTP_202_ACCEPTED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -98,3 +79,40 @@ def question_paper_detail(request, pk):
 
     serializer = QuestionPaperSerializer(qp)
     return Response(serializer.data)
+
+
+# --- Full-text Search ---
+@api_view(['GET'])
+def question_paper_search(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({"error": "Missing search query 'q'."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        return Response({"error": "Invalid limit."}, status=status.HTTP_400_BAD_REQUEST)
+
+    hits = search_papers(query, limit)
+    papers = (
+        QuestionPaper.objects.select_related('university', 'course')
+        .defer('parsed_text')
+        .in_bulk([hit['id'] for hit in hits])
+    )
+
+    results = []
+    for hit in hits:
+        qp = papers.get(hit['id'])
+        if qp is None:
+            continue
+        results.append({
+            'id': qp.pk,
+            'university': qp.university.name,
+            'course': qp.course.name,
+            'semester': qp.semester,
+            'year': qp.year,
+            'subject': qp.subject,
+            'status': qp.status,
+            'rank': hit['rank'],
+            'snippet': hit['snippet'],
+        })
+    return Response(results)
@@ -1,4 +1,6 @@
 from django.contrib import admin
-from .models import VideoInput
+from .models import VideoInput, TranscriptCache, AudioTranscript
 
 admin.site.register(VideoInput)
+admin.site.register(TranscriptCache)
+admin.site.register(AudioTranscript)
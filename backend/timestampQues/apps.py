@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TimestampquesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'timestampQues'
+
+    def ready(self):
+        from . import tasks  # noqa: F401  (registers job handlers)
@@ -0,0 +1,85 @@
+"""
+Whisper fallback for videos without captions.
+
+Only the audio up to the requested timestamp is fetched and transcribed, and
+the transcribed prefix is stored (AudioTranscript) so a later timestamp only
+transcribes the part after it. Audio is decoded from the audio store
+(backend.audio_store) when it has the span; a first span, which starts at 0,
+is downloaded into the store (shared by concurrent requests for the video),
+and later spans are streamed.
+"""
+import logging
+import time
+
+from django.conf import settings
+
+from backend.utils import audio_source, audio_store, decode_audio, transcribe_segments, video_url
+from .models import AudioTranscript
+from .transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# Whisper can cut off the last words of a clip. Segments ending this close to
+# the end of a span are returned but not stored, so the next span redoes them.
+TAIL_GUARD = 1.0
+PROMPT_CHARS = 200
+
+
+def _save_prefix(video_id, segments, covered_until, duration):
+    """Stores the prefix unless a concurrent request already stored a longer one."""
+    payload = Transcript.from_segments(segments).to_bytes()
+    fields = {"payload": payload, "covered_until": covered_until, "duration": duration}
+    updated = AudioTranscript.objects.filter(video_id=video_id, covered_until__lt=covered_until).update(**fields)
+    if not updated:
+        AudioTranscript.objects.get_or_create(video_id=video_id, defaults=fields)
+
+
+def decode_span(video_id, start, end, url, headers):
+    """
+    16 kHz samples of ``start`` to ``end`` seconds of the video: from the audio
+    store when it covers them, downloaded into it when the span starts at 0
+    (the download is then just the span), otherwise streamed from ``url``.
+    """
+    path = audio_store.get(video_id, end, download=start == 0)
+    if path is not None:
+        return decode_audio(str(path), start, end)
+    return decode_audio(url, start, end, headers)
+
+
+def transcript_until(video_id: str, timestamp: float) -> Transcript:
+    """
+    Transcript of the video's audio covering at least the first ``timestamp``
+    seconds, transcribing only what the stored prefix doesn't cover yet.
+    """
+    entry = AudioTranscript.objects.filter(video_id=video_id).first()
+    segments = list(Transcript.from_bytes(entry.payload)) if entry else []
+    covered = entry.covered_until if entry else 0.0
+    if entry and (covered >= timestamp or (entry.duration is not None and covered >= entry.duration)):
+        return Transcript.from_segments(segments)
+
+    url, headers, duration = audio_source(video_url(video_id))
+    end = timestamp + settings.AUDIO_TRANSCRIBE_MARGIN
+    complete = duration is not None and end >= duration
+    if complete:
+        end = duration
+
+    prompt = " ".join(segment.text for segment in segments[-5:])[-PROMPT_CHARS:] or None
+    started = time.perf_counter()
+    audio = decode_span(video_id, covered, end, url, headers)
+    new = transcribe_segments(audio, offset=covered, prompt=prompt)
+    logger.info(
+        "Transcribed %s from %.0fs to %.0fs (%.0fs of audio) in %.1fs",
+        video_id, covered, end, end - covered, time.perf_counter() - started,
+    )
+
+    keep = new
+    covered_until = end
+    if not complete:
+        keep = [segment for segment in new if segment["start"] + segment["duration"] <= end - TAIL_GUARD]
+        dropped = [segment["start"] for segment in new if segment["start"] + segment["duration"] > end - TAIL_GUARD]
+        if dropped:
+            covered_until = min(dropped)
+    if covered_until > covered:
+        _save_prefix(video_id, [*segments, *keep], covered_until, duration)
+
+    return Transcript.from_segments([*segments, *new])
@@ -0,0 +1,139 @@
+"""
+Local catalog of practice problems, searched with BM25.
+
+Problems (title, url, platform, tags) come from a JSON or CSV file
+(settings.PRACTICE_CATALOG_PATH). Titles and tags are tokenized like the
+keyword extractor's text, tags counting twice, into an inverted index kept as
+NumPy arrays: postings sorted by term, each with its precomputed BM25 term
+weight, so a query is a few slice-adds into one score vector.
+"""
+import csv
+import json
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .keywords import STOPWORDS, _fold, tokenize
+
+logger = logging.getLogger(__name__)
+
+K1 = 1.2
+B = 0.75
+TAG_WEIGHT = 2
+
+
+def terms(text):
+    """Index terms of ``text``: content words, plural-folded."""
+    return [_fold(token) for token in tokenize(text) if token[0].isalnum() and token not in STOPWORDS]
+
+
+def load_problems(path):
+    """Problems from a JSON list or a CSV file with title, url, platform and tags (";"-separated) columns."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row["tags"] = [tag.strip() for tag in (row.get("tags") or "").split(";") if tag.strip()]
+    else:
+        rows = json.loads(path.read_text(encoding="utf-8"))
+    problems = []
+    for row in rows:
+        url = row.get("url") or row.get("link")
+        if not row.get("title") or not url:
+            continue
+        problems.append({
+            "title": row["title"],
+            "url": url,
+            "platform": row.get("platform") or "",
+            "tags": list(row.get("tags") or []),
+        })
+    return problems
+
+
+class ProblemCatalog:
+    def __init__(self, problems):
+        self.problems = problems
+        documents = [
+            terms(problem["title"]) + terms(" ; ".join(problem["tags"])) * TAG_WEIGHT
+            for problem in problems
+        ]
+        self.doc_terms = [set(document) for document in documents]
+        self.vocab = {}
+        term_ids = np.fromiter(
+            (self.vocab.setdefault(term, len(self.vocab)) for document in documents for term in document),
+            dtype=np.int64,
+        )
+        doc_ids = np.repeat(np.arange(len(documents)), [len(document) for document in documents])
+
+        count = max(len(documents), 1)
+        # One posting per (term, document), sorted by term, with its term frequency.
+        postings, tf = np.unique(term_ids * count + doc_ids, return_counts=True)
+        self.posting_docs = postings % count
+        df = np.bincount(postings // count, minlength=len(self.vocab))
+        self.offsets = np.concatenate([[0], np.cumsum(df)])
+        self.idf = np.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+
+        lengths = np.bincount(doc_ids, minlength=len(documents)).astype(np.float64)
+        norm = 1 - B + B * lengths / max(lengths.mean(), 1) if len(documents) else lengths
+        self.weights = tf * (K1 + 1) / (tf + K1 * norm[self.posting_docs])
+
+    def __len__(self):
+        return len(self.problems)
+
+    def scores(self, query_terms):
+        """BM25 score of every problem for ``query_terms``."""
+        scores = np.zeros(len(self.problems))
+        for term in set(query_terms):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.posting_docs[start:end]] += self.idf[term_id] * self.weights[start:end]
+        return scores
+
+    def search(self, keywords, limit=7):
+        """
+        (problems, recall): the best ``limit`` problems for ``keywords``, and
+        the fraction of keywords sharing a term with at least one of them.
+        """
+        keyword_terms = [set(terms(keyword)) for keyword in keywords]
+        keyword_terms = [found for found in keyword_terms if found]
+        if not keyword_terms or not self.problems:
+            return [], 0.0
+        scores = self.scores([term for found in keyword_terms for term in found])
+        matched = np.flatnonzero(scores > 0)
+        top = matched[np.argsort(-scores[matched], kind="stable")[:limit]]
+        covered = set().union(*(self.doc_terms[i] for i in top)) if len(top) else set()
+        recall = sum(bool(found & covered) for found in keyword_terms) / len(keyword_terms)
+        return [self.problems[i] for i in top], recall
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def practice_catalog():
+    """The catalog at settings.PRACTICE_CATALOG_PATH, loaded once per process (empty if missing)."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                try:
+                    _catalog = ProblemCatalog(load_problems(settings.PRACTICE_CATALOG_PATH))
+                except FileNotFoundError:
+                    logger.info("No practice problem catalog at %s", settings.PRACTICE_CATALOG_PATH)
+                    _catalog = ProblemCatalog([])
+    return _catalog
+
+
+def catalog_questions(keywords, limit=7):
+    """
+    Same shape as get_practice_questions_from_gemini() ({"title", "link"},
+    plus "platform"), and the catalog's recall for ``keywords``.
+    """
+    problems, recall = practice_catalog().search(keywords, limit)
+    return [{"title": p["title"], "link": p["url"], "platform": p["platform"]} for p in problems], recall
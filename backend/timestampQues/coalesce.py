@@ -0,0 +1,245 @@
+"""
+Single-flight coalescing of identical in-flight computations.
+
+Concurrent calls with the same key share one computation: within a process
+the first caller computes and the others wait for its result (threads on a
+Future, coroutines on a shared Task). Across processes on one host, the
+computing caller holds an flock() on ``<lock_dir>/<key hash>.lock`` and
+writes its result to ``<key hash>.json`` before releasing it; a process that
+was blocked on the lock reads that result instead of computing again.
+
+Results must be JSON-serializable to be shared across processes. Exceptions
+are only shared within a process; another process that was waiting simply
+computes itself once the lock is free.
+
+stream() is do() for a computation that yields events as it goes (the SSE
+view); it coalesces within the process only. If its consumer goes away
+midway, the callers waiting on it compute for themselves.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Lock and result files not touched for this long are deleted.
+STALE_FILE_SECONDS = 3600
+CLEANUP_EVERY = 100  # computations
+
+
+class _Abandoned(Exception):
+    """Set on a streamed computation whose consumer stopped reading it."""
+
+
+class SingleFlight:
+    def __init__(self, lock_dir, spool_ttl):
+        """``lock_dir`` empty disables the cross-process part; results are reused for ``spool_ttl`` seconds."""
+        self.lock_dir = Path(lock_dir) if lock_dir and fcntl else None
+        self.spool_ttl = spool_ttl
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.computations = 0
+        self.thread_shared = 0
+        self.process_shared = 0
+
+    # Cross-process part
+
+    def _paths(self, key):
+        name = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.lock_dir / f"{name}.lock", self.lock_dir / f"{name}.json"
+
+    def _acquire(self, key):
+        """Takes the key's lock file (waiting for another process to finish); returns (handle, its result or None)."""
+        if self.lock_dir is None:
+            return None, None
+        lock_path, spool_path = self._paths(key)
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        handle = open(lock_path, "a")
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        os.utime(lock_path)
+        try:
+            if time.time() - spool_path.stat().st_mtime <= self.spool_ttl:
+                return handle, json.loads(spool_path.read_text())
+        except (FileNotFoundError, ValueError):
+            pass
+        return handle, None
+
+    def _publish(self, key, result):
+        if self.lock_dir is None:
+            return
+        _, spool_path = self._paths(key)
+        temp = spool_path.with_name(f"{spool_path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            temp.write_text(json.dumps(result))
+            os.replace(temp, spool_path)
+        except TypeError:
+            temp.unlink(missing_ok=True)
+            logger.warning("Result for %s isn't JSON-serializable; not shared with other processes", key)
+
+    def _release(self, handle):
+        if handle is not None:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            handle.close()
+
+    def _cleanup(self):
+        cutoff = time.time() - max(STALE_FILE_SECONDS, self.spool_ttl)
+        for path in self.lock_dir.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _counted_computation(self):
+        with self._lock:
+            self.computations += 1
+            cleanup = self.lock_dir is not None and self.computations % CLEANUP_EVERY == 0
+        if cleanup:
+            self._cleanup()
+
+    def _compute_across_processes(self, key, compute):
+        handle, result = self._acquire(key)
+        try:
+            if result is not None:
+                with self._lock:
+                    self.process_shared += 1
+                return result
+            self._counted_computation()
+            result = compute()
+            self._publish(key, result)
+            return result
+        finally:
+            self._release(handle)
+
+    # In-process part
+
+    def _join(self, key):
+        """(the Future of ``key``'s computation, whether this caller must compute it)."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.thread_shared += 1
+            return future, leader
+
+    def _settle(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def do(self, key, compute):
+        """``compute()``'s result, computed once for all concurrent callers with ``key``."""
+        with self._lock:
+            self.requests += 1
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                result = self._compute_across_processes(key, compute)
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+    def stream(self, key, events, replay):
+        """
+        Streaming do(), a generator: yields from ``events`` (a generator whose
+        return value is the result) when this caller computes, or from
+        ``replay(result)`` once another caller's computation finishes; returns
+        the result.
+        """
+        with self._lock:
+            self.requests += 1
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                result = future.result()
+            except _Abandoned:
+                continue
+            yield from replay(result)
+            return result
+
+        self._counted_computation()
+        try:
+            result = yield from events
+        except GeneratorExit:
+            self._settle(key, future, error=_Abandoned())
+            raise
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key, acompute):
+        """Async do(): ``await acompute()`` once for all concurrent coroutines of this event loop with ``key``."""
+        task_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            self.requests += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = self._tasks[task_key] = asyncio.ensure_future(self._arun(key, acompute))
+                task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            else:
+                self.thread_shared += 1
+        # A disconnecting client cancels its own wait, not the shared computation.
+        return await asyncio.shield(task)
+
+    async def _arun(self, key, acompute):
+        handle, result = await sync_to_async(self._acquire, thread_sensitive=False)(key)
+        try:
+            if result is not None:
+                with self._lock:
+                    self.process_shared += 1
+                return result
+            self._counted_computation()
+            result = await acompute()
+            self._publish(key, result)
+            return result
+        finally:
+            self._release(handle)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "computations": self.computations,
+                "thread_shared": self.thread_shared,
+                "process_shared": self.process_shared,
+                # Requests answered per computation; 1.0 means nothing was coalesced.
+                "coalescing_ratio": round(self.requests / self.computations, 3) if self.computations else None,
+                "coalesced_rate": round((self.thread_shared + self.process_shared) / self.requests, 3) if self.requests else None,
+                "in_flight": len(self._calls) + len(self._tasks),
+                "cross_process": self.lock_dir is not None,
+            }
+
+
+process_flight = SingleFlight(settings.COALESCE_LOCK_DIR, settings.COALESCE_SPOOL_TTL)
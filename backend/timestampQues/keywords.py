@@ -0,0 +1,268 @@
+"""
+Local keyword extraction, a drop-in for extract_keywords_gemini().
+
+Candidates are the transcript's 1-3 word phrases that neither start nor end
+with a stopword. Each is scored from its frequency in the transcript, how
+widely it is spread over it, and its inverse document frequency in our own
+transcript corpus (the table ``manage.py build_keyword_df`` writes), all
+computed with NumPy over integer token ids. Without a table every phrase
+gets the same IDF and the ranking falls back to frequency and spread.
+"""
+import logging
+import re
+import threading
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[a-z][a-z0-9+#'-]*[a-z0-9+#]|[a-z]|[.!?;:,()\n]")
+# Punctuation (when captions have any) ends a phrase; it becomes this token.
+BREAK = "|"
+
+# English function words plus the filler of spoken lectures, which dominates
+# raw counts in transcripts and is never a topic.
+STOPWORDS = frozenset("""
+a about above actually after again against ah all alright also am an and any anyone anything are aren't around as
+at back basically be because been before being below between both but by can can't come could couldn't did didn't
+do does doesn't doing don't done down during each either else even ever every everyone everything example few first
+for from further get gets getting give go goes going gonna good got gotta guys had hadn't has hasn't have haven't
+having he he'd he'll he's her here here's hers herself hey hi him himself his how how's however i i'd i'll i'm i've
+if in into is isn't it it's its itself just kind know lot lots let let's like little look looking made make makes
+many may maybe me mean might more most much must my myself need new next no nor not now number of off oh ok okay on
+once one only or other others our ours ourselves out over own part pretty put quite rather really right said same
+say says second see seen shall she she'd she'll she's should shouldn't show so some something sometimes sort start
+still such sure take talk talking tell than thank thanks that that's the their theirs them themselves then there
+there's these they they'd they'll they're they've thing things think this those though through time to today too
+two um uh under until up us use used using very video want wanna was wasn't way we we'd we'll we're we've well went
+were weren't what what's whatever when when's where where's whether which while who who's whom why why's will with
+won't work would wouldn't yeah yes yet you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+# Stopwords allowed inside a phrase: "theory of computation", "supply and demand".
+CONNECTORS = frozenset({"of", "and"})
+
+MAX_NGRAM = 3
+# Longer phrases are rarer by nature; without a boost they could never outrank single words.
+NGRAM_BOOST = {1: 1.0, 2: 1.6, 3: 1.9}
+
+
+def npz_path(path):
+    """``path`` as np.savez_compressed() writes it: with ".npz" appended unless it ends so already."""
+    path = str(path)
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+class DocumentFrequencies:
+    """Phrase -> number of corpus transcripts containing it, plus the corpus size."""
+
+    def __init__(self, counts=None, documents=0):
+        self.counts = counts or {}
+        self.documents = documents
+
+    @classmethod
+    def load(cls, path):
+        with np.load(npz_path(path), allow_pickle=False) as data:
+            return cls(dict(zip(data["terms"].tolist(), data["counts"].tolist())), int(data["documents"]))
+
+    def save(self, path):
+        """Writes the table to ``path`` (".npz" appended if missing); returns the path written."""
+        path = npz_path(path)
+        terms = list(self.counts)
+        np.savez_compressed(
+            path,
+            terms=np.array(terms, dtype=str),
+            counts=np.array([self.counts[term] for term in terms], dtype=np.int32),
+            documents=np.int64(self.documents),
+        )
+        return path
+
+    def _idf(self, df):
+        return np.log((self.documents + 1) / (df + 1)) + 1.0
+
+    def idf(self, phrases):
+        """
+        IDF per phrase. A multi-word phrase missing from the table (most are,
+        the table only keeps those seen in ``min_df`` transcripts) gets the
+        mean IDF of its words instead, so a chance pairing of common words
+        doesn't look as rare as a real new term.
+        """
+        if not self.documents:
+            return np.ones(len(phrases))
+        counts = self.counts
+        df = np.fromiter((counts.get(phrase, -1) for phrase in phrases), dtype=np.float64, count=len(phrases))
+        idf = self._idf(np.maximum(df, 0))
+        for i in np.flatnonzero(df < 0):
+            words = phrases[i].split()
+            if len(words) > 1:
+                idf[i] = self._idf(np.array([counts.get(word, 0) for word in words], dtype=np.float64)).mean()
+        return idf
+
+
+_df_table = None
+_df_lock = threading.Lock()
+
+
+def document_frequencies():
+    """The DF table at settings.KEYWORDS_DF_PATH, loaded once per process (empty if missing)."""
+    global _df_table
+    if _df_table is None:
+        with _df_lock:
+            if _df_table is None:
+                try:
+                    _df_table = DocumentFrequencies.load(settings.KEYWORDS_DF_PATH)
+                except FileNotFoundError:
+                    logger.info("No keyword DF table at %s; ranking by frequency only", settings.KEYWORDS_DF_PATH)
+                    _df_table = DocumentFrequencies()
+    return _df_table
+
+
+def tokenize(text):
+    """Lowercased words, with BREAK wherever the text has phrase-ending punctuation."""
+    return [token if token[0].isalpha() else BREAK for token in TOKEN.findall(text.lower())]
+
+
+def _encode(tokens):
+    """
+    Token ids (in first-seen order), the vocabulary, and two per-token masks:
+    words a phrase can't start or end with, and words it can't contain at all.
+    """
+    vocab = {}
+    ids = np.fromiter((vocab.setdefault(token, len(vocab)) for token in tokens), dtype=np.int64, count=len(tokens))
+    words = list(vocab)
+    stop = np.fromiter(
+        (word in STOPWORDS or len(word) < 3 or word == BREAK for word in words), dtype=bool, count=len(words)
+    )
+    inner_stop = stop & ~np.fromiter((word in CONNECTORS for word in words), dtype=bool, count=len(words))
+    if not len(ids):
+        return ids, words, np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+    return ids, words, stop[ids], inner_stop[ids]
+
+
+def _ngram_keys(ids, is_stop, is_inner_stop, n, size):
+    """
+    One int64 key per n-gram position (ids packed base ``size``) and the
+    position it starts at, keeping only n-grams that start and end on a
+    content word, contain no other stopwords than CONNECTORS, and don't
+    repeat a word back to back.
+    """
+    count = len(ids) - n + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keep = ~is_stop[:count] & ~is_stop[n - 1:n - 1 + count]
+    keys = np.zeros(count, dtype=np.int64)
+    for offset in range(n):
+        keys = keys * size + ids[offset:offset + count]
+        if 0 < offset < n - 1:
+            keep &= ~is_inner_stop[offset:offset + count]
+        if offset:
+            # "very very", "the the": a repeated word is a stutter, not a phrase.
+            keep &= ids[offset:offset + count] != ids[offset - 1:offset - 1 + count]
+    return keys[keep], np.flatnonzero(keep)
+
+
+def _decode(key, n, size, words):
+    parts = []
+    for _ in range(n):
+        key, word = divmod(key, size)
+        parts.append(words[word])
+    return " ".join(reversed(parts))
+
+
+def candidate_phrases(text, min_count=None):
+    """
+    Yields (n, phrases, counts, first, last) per n-gram length, with
+    positions as fractions of the text. Multi-word phrases seen fewer than
+    ``min_count`` times are dropped (default: twice for transcripts of more
+    than ~300 words, else once).
+    """
+    tokens = tokenize(text)
+    ids, words, is_stop, is_inner_stop = _encode(tokens)
+    size = max(len(words), 1)
+    total = max(len(tokens), 1)
+    if min_count is None:
+        min_count = 2 if len(tokens) > 300 else 1
+
+    for n in range(1, MAX_NGRAM + 1):
+        keys, positions = _ngram_keys(ids, is_stop, is_inner_stop, n, size)
+        if not len(keys):
+            continue
+        unique, first_index, counts = np.unique(keys, return_index=True, return_counts=True)
+        # np.unique on the reversed keys gives each phrase's last occurrence.
+        _, last_from_end = np.unique(keys[::-1], return_index=True)
+        last_index = len(keys) - 1 - last_from_end
+        if n > 1:
+            frequent = counts >= min_count
+            unique, first_index, last_index, counts = unique[frequent], first_index[frequent], last_index[frequent], counts[frequent]
+        phrases = [_decode(int(key), n, size, words) for key in unique]
+        yield n, phrases, counts, positions[first_index] / total, positions[last_index] / total
+
+
+def score_phrases(text, df=None):
+    """All candidate phrases of ``text`` with their scores, best first."""
+    df = df if df is not None else document_frequencies()
+    all_phrases, all_scores = [], []
+    for n, phrases, counts, first, last in candidate_phrases(text):
+        tf = 1.0 + np.log(counts)
+        # Topics recur through a lecture; asides are mentioned in one spot.
+        spread = 0.5 + 0.5 * (last - first)
+        all_scores.append(tf * spread * df.idf(phrases) * NGRAM_BOOST[n])
+        all_phrases.extend(phrases)
+    if not all_phrases:
+        return [], np.zeros(0)
+    scores = np.concatenate(all_scores)
+    order = np.argsort(-scores, kind="stable")
+    return [all_phrases[i] for i in order], scores[order]
+
+
+def _fold(word):
+    # Enough stemming to treat "tree"/"trees" as one word when comparing phrases.
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def _redundant(phrase, chosen_words):
+    """Whether most of ``phrase``'s words are already covered by chosen keywords."""
+    words = [_fold(word) for word in phrase.split()]
+    return sum(word in chosen_words for word in words) * 2 > len(words)
+
+
+def extract_keywords_local(transcript_chunk: str, num_keywords: int = 7) -> list[str]:
+    """
+    Same contract as extract_keywords_gemini(): up to ``num_keywords``
+    keywords, most relevant first, or an empty list. Phrases whose words are
+    mostly in better-ranked keywords already are skipped.
+    """
+    if not transcript_chunk or num_keywords <= 0:
+        return []
+    phrases, _ = score_phrases(transcript_chunk)
+    keywords = []
+    chosen_words = set()
+    for phrase in phrases:
+        if not _redundant(phrase, chosen_words):
+            keywords.append(phrase)
+            chosen_words.update(_fold(word) for word in phrase.split())
+            if len(keywords) == num_keywords:
+                break
+    return keywords
+
+
+def count_document_phrases(text):
+    """The distinct candidate phrases of one document, for building a DF table."""
+    phrases = set()
+    for _, found, _, _, _ in candidate_phrases(text, min_count=1):
+        phrases.update(found)
+    return phrases
+
+
+def build_document_frequencies(texts, min_df=2):
+    """A DocumentFrequencies table over ``texts``, keeping phrases seen in at least ``min_df`` of them."""
+    counts = {}
+    documents = 0
+    for text in texts:
+        documents += 1
+        for phrase in count_document_phrases(text):
+            counts[phrase] = counts.get(phrase, 0) + 1
+    counts = {phrase: count for phrase, count in counts.items() if count >= min_df}
+    return DocumentFrequencies(counts, documents)
+
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from timestampQues.keywords import build_document_frequencies
+from timestampQues.models import TranscriptCache
+from timestampQues.transcript import Transcript
+
+
+class Command(BaseCommand):
+    help = "Builds the local keyword extractor's document-frequency table from cached transcripts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-df', type=int, default=2, help="Drop phrases found in fewer transcripts.")
+        parser.add_argument('--output', default=None, help="Defaults to settings.KEYWORDS_DF_PATH.")
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.KEYWORDS_DF_PATH
+
+        def texts():
+            rows = TranscriptCache.objects.filter(available=True).values_list('payload', flat=True)
+            for payload in rows.iterator(chunk_size=50):
+                try:
+                    yield Transcript.from_bytes(bytes(payload)).text
+                except (ValueError, TypeError):
+                    continue
+
+        table = build_document_frequencies(texts(), min_df=options['min_df'])
+        output = table.save(output)
+        self.stdout.write(
+            f"Wrote {len(table.counts)} phrases from {table.documents} transcript(s) to {output}. "
+            "Restart the server to load it."
+        )
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timestampQues', '0002_videoinput_owner_videoinput_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32, unique=True)),
+                ('available', models.BooleanField(default=True)),
+                ('payload', models.BinaryField(blank=True, null=True)),
+                ('fetched_at', models.DateTimeField()),
+                ('last_accessed', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.5 on 2026-10-17 20:59
+
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _extract_video_id(url):
+    # Same as timestampQues.utils.extract_video_id at the time, frozen here for the migration.
+    if not url:
+        return None
+    try:
+        parsed_url = urlparse(url)
+        if "youtube.com" in parsed_url.netloc:
+            if parsed_url.path == "/watch":
+                return parse_qs(parsed_url.query).get("v", [None])[0]
+            elif parsed_url.path.startswith("/embed/"):
+                return parsed_url.path.split("/embed/")[1].split("?")[0]
+            elif parsed_url.path.startswith("/v/"):
+                return parsed_url.path.split("/v/")[1].split("?")[0]
+        elif "youtu.be" in parsed_url.netloc:
+            return parsed_url.path[1:].split("?")[0]
+    except Exception:
+        return None
+    return None
+
+
+def fill_video_ids(apps, schema_editor):
+    """
+    Parses video_id out of existing URLs and drops the duplicates that
+    different URL forms of the same video produced, keeping each user's most
+    recent row for it.
+    """
+    VideoInput = apps.get_model('timestampQues', 'VideoInput')
+    latest = {}
+    duplicates = set()
+    rows = list(VideoInput.objects.order_by('pk'))
+    for row in rows:
+        video_id = _extract_video_id(row.video_url) or ''
+        row.video_id = video_id if len(video_id) <= 32 else ''
+        if row.video_id:
+            key = (row.owner_id, row.video_id)
+            if key in latest:
+                duplicates.add(latest[key].pk)
+            latest[key] = row
+    VideoInput.objects.filter(pk__in=duplicates).delete()
+    VideoInput.objects.bulk_update(
+        [row for row in rows if row.pk not in duplicates], ['video_id'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timestampQues', '0003_transcriptcache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videoinput',
+            name='video_id',
+            field=models.CharField(blank=True, help_text='YouTube video ID parsed from video_url', max_length=32),
+        ),
+        migrations.RunPython(fill_video_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='videoinput',
+            index=models.Index(fields=['owner', 'created_at'], name='videoinput_owner_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='videoinput',
+            constraint=models.UniqueConstraint(condition=models.Q(('video_id', ''), _negated=True), fields=('owner', 'video_id'), name='videoinput_owner_video_id_uniq'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timestampQues', '0004_videoinput_video_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32, unique=True)),
+                ('payload', models.BinaryField()),
+                ('covered_until', models.FloatField(default=0, help_text='In seconds')),
+                ('duration', models.FloatField(blank=True, help_text='Length of the video in seconds', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -4,13 +4,64 @@ from django.utils.text import slugify
 
 class VideoInput(models.Model):
     video_url = models.URLField()
+    video_id = models.CharField(max_length=32, blank=True, help_text="YouTube video ID parsed from video_url")
     watched_till = models.IntegerField(help_text="In seconds")
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     slug = models.SlugField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One row per user and video, whichever URL form it was submitted as.
+            # Also serves the owner=... lookups of the "my videos" list.
+            models.UniqueConstraint(
+                fields=['owner', 'video_id'],
+                condition=~models.Q(video_id=''),
+                name='videoinput_owner_video_id_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'created_at'], name='videoinput_owner_created_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            base = f"{self.owner.username}-{self.video_url}"
-            self.slug = slugify(base)
+            if self.video_id:
+                # Video IDs are case-sensitive, so they go in verbatim rather than through slugify().
+                self.slug = f"{slugify(self.owner.username)}-{self.owner_id}-{self.video_id}"
+            else:
+                base = f"{self.owner.username}-{self.video_url}"
+                self.slug = slugify(base)
         super().save(*args, **kwargs)
+
+
+class TranscriptCache(models.Model):
+    """Transcript fetched from YouTube, stored once per video.
+
+    A row with ``available=False`` records that the video has no usable
+    English transcript so we don't keep asking YouTube for it.
+    """
+    video_id = models.CharField(max_length=32, unique=True)
+    available = models.BooleanField(default=True)
+    payload = models.BinaryField(null=True, blank=True)
+    fetched_at = models.DateTimeField()
+    last_accessed = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.video_id} ({'ok' if self.available else 'unavailable'})"
+
+
+class AudioTranscript(models.Model):
+    """Whisper transcript of the start of a video that has no captions.
+
+    It covers the audio up to ``covered_until`` seconds, so a later
+    timestamp only has to transcribe what comes after.
+    """
+    video_id = models.CharField(max_length=32, unique=True)
+    payload = models.BinaryField()
+    covered_until = models.FloatField(default=0, help_text="In seconds")
+    duration = models.FloatField(null=True, blank=True, help_text="Length of the video in seconds")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.video_id} (up to {self.covered_until:.0f}s)"
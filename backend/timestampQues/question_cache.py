@@ -0,0 +1,203 @@
+"""
+Practice questions cached by keyword list, for near-identical lists too.
+
+Keyword lists for the same material rarely match exactly ("BST traversal"
+vs "binary search trees, traversals"), so a list is reduced to a set of
+normalized content words and compared by Jaccard similarity. MinHash
+signatures banded into an LSH index keep lookups to a handful of candidates
+however many lists are cached; the exact similarity decides.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from .keywords import STOPWORDS, _fold
+
+# Common abbreviations in lecture keywords, mapped to the phrase they stand for.
+ALIASES = {
+    "bst": "binary search tree",
+    "bt": "binary tree",
+    "dp": "dynamic programming",
+    "dfs": "depth first search",
+    "bfs": "breadth first search",
+    "ll": "linked list",
+    "dll": "doubly linked list",
+    "lis": "longest increasing subsequence",
+    "lcs": "longest common subsequence",
+    "mst": "minimum spanning tree",
+    "dsu": "union find",
+    "disjoint set": "union find",
+    "pq": "priority queue",
+    "gcd": "greatest common divisor",
+    "lca": "lowest common ancestor",
+    "dag": "directed acyclic graph",
+    "topo sort": "topological sort",
+    "oop": "object oriented programming",
+    "os": "operating system",
+    "dbms": "database management system",
+    "ml": "machine learning",
+    "nn": "neural network",
+    "dsa": "data structures algorithms",
+}
+WORD = re.compile(r"[a-z0-9+#]+")
+
+NUM_PERM = 64
+BANDS = 16  # of NUM_PERM // BANDS rows: pairs from Jaccard ~0.5 up are likely to share a band
+ROWS = NUM_PERM // BANDS
+# Thresholds reported in stats() as "would_hit": lookups whose best match reached each.
+TUNING_THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def normalize_keyword(keyword):
+    """Lowercased, punctuation and hyphens as spaces, abbreviations expanded, plurals folded."""
+    text = " ".join(WORD.findall(keyword.lower().replace("-", " ")))
+    text = ALIASES.get(text, text)
+    words = " ".join(ALIASES.get(word, word) for word in text.split()).split()
+    return " ".join(_fold(word) for word in words)
+
+
+def keyword_set(keywords):
+    """The set compared between keyword lists: content words of the normalized keywords."""
+    return frozenset(
+        word
+        for keyword in keywords
+        for word in normalize_keyword(keyword).split()
+        if word not in STOPWORDS
+    )
+
+
+def minhash(elements):
+    """NUM_PERM-value MinHash signature of a non-empty set of strings."""
+    # SHAKE-128 output of any length gives each element NUM_PERM independent 32-bit hashes.
+    hashes = np.frombuffer(
+        b"".join(hashlib.shake_128(element.encode()).digest(4 * NUM_PERM) for element in elements), dtype="<u4"
+    )
+    return hashes.reshape(len(elements), NUM_PERM).min(axis=0)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class QuestionCache:
+    """
+    In-process cache of practice questions by keyword list, tolerant of the
+    small differences in wording and order between keyword lists for the
+    same lecture segment. Keyword lists are normalized to word sets; an LSH
+    index over their MinHash signatures finds earlier sets likely to be
+    similar, and the most similar one is reused if its exact Jaccard
+    similarity is at least ``min_similarity``.
+    """
+
+    def __init__(self, max_entries: int, min_similarity: float, ttl: int):
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.ttl = ttl
+        self._entries = OrderedDict()  # word set -> (expires, signature, questions)
+        self._bands = {}  # (band, rows of signature) -> word sets
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.candidates = 0
+        self.similarity_sum = 0.0
+        self.best_similarities = np.zeros(len(TUNING_THRESHOLDS), dtype=np.int64)
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def _remove(self, words):
+        _, signature, _ = self._entries.pop(words)
+        for band_key in self._band_keys(signature):
+            bucket = self._bands.get(band_key)
+            if bucket is not None:
+                bucket.discard(words)
+                if not bucket:
+                    del self._bands[band_key]
+
+    def get(self, keywords: list[str]) -> list[dict] | None:
+        """The questions stored for ``keywords`` or a similar enough keyword list, or None."""
+        words = keyword_set(keywords)
+        if not words:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(words)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(words)
+                self.exact_hits += 1
+                self.best_similarities += 1
+                return entry[2]
+
+            signature = minhash(words)
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._bands.get(band_key, set())
+            best, best_similarity = None, 0.0
+            for candidate in candidates:
+                if self._entries[candidate][0] <= now:
+                    continue
+                similarity = jaccard(words, candidate)
+                if similarity > best_similarity:
+                    best, best_similarity = candidate, similarity
+            self.candidates += len(candidates)
+            if best is not None:
+                self.best_similarities += np.array(TUNING_THRESHOLDS) <= best_similarity
+            if best is None or best_similarity < self.min_similarity:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.near_hits += 1
+            self.similarity_sum += best_similarity
+            return self._entries[best][2]
+
+    def set(self, keywords: list[str], questions: list[dict]):
+        words = keyword_set(keywords)
+        if not words or not questions:
+            return
+        with self._lock:
+            if words in self._entries:
+                self._remove(words)
+            signature = minhash(words)
+            self._entries[words] = (time.monotonic() + self.ttl, signature, questions)
+            for band_key in self._band_keys(signature):
+                self._bands.setdefault(band_key, set()).add(words)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "min_similarity": self.min_similarity,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+                "mean_near_hit_similarity": self.similarity_sum / self.near_hits if self.near_hits else None,
+                "candidates_per_lookup": self.candidates / lookups if lookups else 0.0,
+                # Hit rate had min_similarity been each of these, to tune it from real traffic.
+                "would_hit": {
+                    str(threshold): int(count) / lookups if lookups else 0.0
+                    for threshold, count in zip(TUNING_THRESHOLDS, self.best_similarities)
+                },
+            }
+
+
+question_cache = QuestionCache(
+    max_entries=settings.QUESTION_CACHE_MAX_ENTRIES,
+    min_similarity=settings.QUESTION_CACHE_MIN_SIMILARITY,
+    ttl=settings.RESULT_CACHE_TTL,
+)
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class ResultCache:
+    """
+    In-process LRU cache of /api/process/ results keyed by (video id, timestamp bucket).
+
+    Timestamps are quantized to ``bucket_seconds`` wide buckets, so requests a few
+    seconds apart in the same lecture share one set of keywords and questions.
+    ``variant`` (the request's keyword engine and question source) keeps results
+    produced differently for the same bucket apart.
+    """
+
+    def __init__(self, max_entries: int, bucket_seconds: int, ttl: int):
+        self.max_entries = max_entries
+        self.bucket_seconds = max(1, bucket_seconds)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, video_id: str, timestamp: int, variant: tuple = ()) -> tuple:
+        return (video_id, int(timestamp) // self.bucket_seconds, *variant)
+
+    def get(self, video_id: str, timestamp: int, variant: tuple = ()) -> dict | None:
+        key = self.key(video_id, timestamp, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, video_id: str, timestamp: int, variant: tuple = ()) -> dict | None:
+        """get() without counting a hit or miss or refreshing the entry, for re-checks of a lookup already counted."""
+        with self._lock:
+            entry = self._entries.get(self.key(video_id, timestamp, variant))
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, video_id: str, timestamp: int, result: dict, variant: tuple = ()):
+        key = self.key(video_id, timestamp, variant)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bucket_seconds": self.bucket_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    bucket_seconds=settings.RESULT_CACHE_BUCKET_SECONDS,
+    ttl=settings.RESULT_CACHE_TTL,
+)
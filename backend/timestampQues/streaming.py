@@ -0,0 +1,102 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array arriving in arbitrary text chunks.
+
+    feed() returns each top-level element as soon as its closing character has
+    been seen. Anything before the opening '[' (e.g. a ```json fence) and after
+    the closing ']' is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0            # next character of _buffer to scan
+        self._started = False    # seen the opening '['
+        self._finished = False   # seen the closing ']'
+        self._depth = 0          # nesting depth inside the current element
+        self._in_string = False
+        self._escaped = False
+        self._element_start = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> list:
+        if self._finished or not chunk:
+            return []
+        self._buffer += chunk
+        elements = []
+
+        if not self._started:
+            opening = self._buffer.find("[")
+            if opening == -1:
+                self._buffer = ""
+                return elements
+            self._started = True
+            self._buffer = self._buffer[opening + 1:]
+            self._pos = 0
+
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+                if self._element_start is None:
+                    self._element_start = pos
+            elif char in "{[":
+                if self._element_start is None:
+                    self._element_start = pos
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # Closing bracket of the array itself.
+                    self._emit(buffer, pos, elements)
+                    self._finished = True
+                    break
+                self._depth -= 1
+            elif char == "," and self._depth == 0:
+                self._emit(buffer, pos, elements)
+            elif self._element_start is None and not char.isspace():
+                self._element_start = pos  # number, true/false/null
+            pos += 1
+
+        # Keep only the unfinished element so the buffer doesn't grow with the response.
+        keep_from = self._element_start if self._element_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        return elements
+
+    def _emit(self, buffer: str, end: int, elements: list):
+        if self._element_start is not None:
+            elements.append(json.loads(buffer[self._element_start:end]))
+        self._element_start = None
+
+
+def sse_event(event: str, data) -> str:
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept EventSource's Accept: text/event-stream."""
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event("error", data).encode(self.charset)
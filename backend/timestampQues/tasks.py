@@ -0,0 +1,18 @@
+from jobs.queue import job_handler, JobFailed
+from .utils import process_video, ProcessingError
+
+
+@job_handler('timestampQues.process_video')
+def process_video_job(job):
+    try:
+        return process_video(
+            job.payload['video_id'],
+            job.payload['timestamp'],
+            job.payload.get('keyword_engine'),
+            job.payload.get('question_source'),
+        )
+    except ProcessingError as e:
+        # Retrying won't make a missing transcript appear; only Gemini failures are worth another go.
+        if e.status != 500:
+            raise JobFailed(str(e))
+        raise
@@ -1,3 +1,555 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import math
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from backend.audio_store import AudioStore
+
+from . import audio, catalog, coalesce, utils, views
+from .catalog import ProblemCatalog, load_problems
+from .keywords import DocumentFrequencies
+from .coalesce import SingleFlight
+from .models import AudioTranscript, VideoInput
+from .question_cache import QuestionCache, keyword_set, normalize_keyword
+from .result_cache import ResultCache
+from .streaming import JsonArrayStream, sse_event
+
+# A "SCAN <table>" line without "USING ... INDEX" is a full table scan.
+FULL_SCAN = re.compile(r"\bSCAN (\S+)$", re.MULTILINE)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Checks SQLite's EXPLAIN QUERY PLAN output")
+class VideoInputIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("student", password="pw")
+        VideoInput.objects.create(
+            owner=cls.user, video_id="dQw4w9WgXcQ", watched_till=60,
+            video_url="https://youtu.be/dQw4w9WgXcQ",
+        )
+
+    def test_one_row_per_owner_and_video(self):
+        VideoInput.objects.update_or_create(
+            owner=self.user, video_id="dQw4w9WgXcQ",
+            defaults={"video_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "watched_till": 120},
+        )
+        self.assertEqual(VideoInput.objects.filter(owner=self.user).count(), 1)
+
+    def test_hot_queries_use_indexes(self):
+        for queryset in (
+            VideoInput.objects.filter(owner=self.user).order_by('created_at'),
+            VideoInput.objects.filter(owner=self.user, video_id="dQw4w9WgXcQ"),
+        ):
+            with self.subTest(query=str(queryset.query)):
+                plan = queryset.explain()
+                self.assertIsNone(FULL_SCAN.search(plan), f"Full table scan in:\n{plan}")
+
+
+class ResultCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = ResultCache(max_entries=2, bucket_seconds=30, ttl=60)
+
+    def test_timestamps_in_one_bucket_share_a_result(self):
+        self.cache.set("vid", 61, {"keywords": ["a"]})
+        self.assertEqual(self.cache.get("vid", 89), {"keywords": ["a"]})
+        self.assertIsNone(self.cache.get("vid", 90))
+        self.assertIsNone(self.cache.get("other", 61))
+
+    def test_variants_are_kept_apart(self):
+        self.cache.set("vid", 60, {"keyword_engine": "local"}, ("local", "auto"))
+        self.assertIsNone(self.cache.get("vid", 60, ("gemini", "auto")))
+        self.assertEqual(self.cache.get("vid", 60, ("local", "auto")), {"keyword_engine": "local"})
+
+    def test_entries_expire(self):
+        with mock.patch("timestampQues.result_cache.time.monotonic", return_value=1000.0):
+            self.cache.set("vid", 60, {"keywords": ["a"]})
+        with mock.patch("timestampQues.result_cache.time.monotonic", return_value=1059.0):
+            self.assertIsNotNone(self.cache.get("vid", 60))
+        with mock.patch("timestampQues.result_cache.time.monotonic", return_value=1060.0):
+            self.assertIsNone(self.cache.get("vid", 60))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("a", 0, {"n": 1})
+        self.cache.set("b", 0, {"n": 2})
+        self.cache.get("a", 0)
+        self.cache.set("c", 0, {"n": 3})
+        self.assertIsNone(self.cache.get("b", 0))
+        self.assertIsNotNone(self.cache.get("a", 0))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_stats_count_each_lookup_once(self):
+        self.cache.set("vid", 0, {"n": 1})
+        self.cache.get("vid", 0)
+        self.cache.get("vid", 30)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_peek_neither_counts_nor_refreshes(self):
+        self.cache.set("a", 0, {"n": 1})
+        self.cache.set("b", 0, {"n": 2})
+        self.assertEqual(self.cache.peek("a", 0), {"n": 1})
+        self.assertIsNone(self.cache.peek("c", 0))
+        self.cache.set("c", 0, {"n": 3})
+        self.assertIsNone(self.cache.peek("a", 0))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 0))
+
+
+class ProcessVideoTests(SimpleTestCase):
+    QUESTIONS = [{"title": "Two Sum", "link": "https://leetcode.com/problems/two-sum/"}, {"title": "3Sum", "link": "https://leetcode.com/problems/3sum/"}]
+
+    def setUp(self):
+        self.cache = ResultCache(max_entries=10, bucket_seconds=30, ttl=60)
+        self.flight = SingleFlight("", 30)
+        self.runs = []
+        transcript = mock.Mock(**{"text_until.return_value": "two pointers and sliding window"})
+        for name, value in (
+            ("result_cache", self.cache),
+            ("process_flight", self.flight),
+            ("transcript_until", lambda video_id, timestamp: self.runs.append(video_id) or transcript),
+            ("extract_keywords", lambda text, count, engine: (["two pointers"], engine or "local")),
+            ("get_practice_questions", lambda keywords, source: ([{"title": "Two Sum"}], source or "catalog")),
+            ("catalog_practice_questions", lambda keywords, source: None),
+            ("question_cache", QuestionCache(max_entries=10, min_similarity=0.6, ttl=60)),
+            ("stream_practice_questions_from_gemini", lambda keywords: iter(self.QUESTIONS)),
+        ):
+            patcher = mock.patch.object(utils, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_each_request_counts_one_lookup(self):
+        utils.process_video("vid", 60)
+        utils.process_video("vid", 75)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], self.runs), (1, 1, ["vid"]))
+
+    def test_options_get_their_own_result_and_computation(self):
+        self.assertNotEqual(
+            utils.process_key("vid", 60, utils.result_variant("local", None)),
+            utils.process_key("vid", 60, utils.result_variant("gemini", None)),
+        )
+        local = utils.process_video("vid", 60, "local")
+        gemini = utils.process_video("vid", 60, "gemini")
+        self.assertEqual((local["keyword_engine"], gemini["keyword_engine"], len(self.runs)), ("local", "gemini", 2))
+
+    def test_stream_yields_events_and_fills_the_result_cache(self):
+        events = list(utils.stream_process_video("vid", 60, "local", "gemini"))
+        self.assertEqual(events, [("keywords", ["two pointers"])] + [("question", q) for q in self.QUESTIONS])
+        result = utils.process_video("vid", 75, "local", "gemini")
+        self.assertEqual((result["questions"], result["question_source"], self.runs), (self.QUESTIONS, "gemini", ["vid"]))
+
+    def test_stream_replays_a_run_in_flight(self):
+        release = threading.Event()
+        transcript = utils.transcript_until
+
+        def slow_transcript(video_id, timestamp):
+            release.wait(5)
+            return transcript(video_id, timestamp)
+
+        with mock.patch.object(utils, "transcript_until", slow_transcript):
+            thread = threading.Thread(target=utils.process_video, args=("vid", 60, "local", "catalog"))
+            thread.start()
+            while not self.flight.stats()["in_flight"]:
+                time.sleep(0.01)
+            threading.Timer(0.05, release.set).start()
+            events = list(utils.stream_process_video("vid", 60, "local", "catalog"))
+            thread.join()
+        self.assertEqual(events, [("keywords", ["two pointers"]), ("question", {"title": "Two Sum"})])
+        self.assertEqual((self.runs, self.flight.stats()["thread_shared"]), (["vid"], 1))
+
+    def test_callers_waiting_on_an_abandoned_stream_compute_themselves(self):
+        stream = utils.stream_process_video("vid", 60, "local", "gemini")
+        self.assertEqual(next(stream), ("keywords", ["two pointers"]))
+        results = []
+        thread = threading.Thread(target=lambda: results.append(utils.process_video("vid", 60, "local", "gemini")))
+        thread.start()
+        while not self.flight.stats()["thread_shared"]:
+            time.sleep(0.01)
+        stream.close()
+        thread.join()
+        self.assertEqual(results[0]["keywords"], ["two pointers"])
+        self.assertEqual((len(self.runs), self.flight.stats()["in_flight"]), (2, 0))
+
+
+class ProcessStreamViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("student", password="pw")
+
+    def stream(self, events, **params):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(views, "stream_process_video", events):
+            response = client.get("/api/process/stream/", {"url": "https://youtu.be/dQw4w9WgXcQ", "timestamp": 90, **params})
+            return response, b"".join(response.streaming_content).decode() if response.streaming else None
+
+    def test_events_are_sent_and_the_video_recorded(self):
+        def events(video_id, timestamp, keyword_engine, question_source):
+            yield "keywords", ["two pointers"]
+            yield "question", {"title": "Two Sum"}
+
+        response, body = self.stream(events, keyword_engine="local")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            body,
+            sse_event("keywords", ["two pointers"]) + sse_event("question", {"title": "Two Sum"}) + sse_event("done", {"count": 1}),
+        )
+        self.assertEqual(VideoInput.objects.get(owner=self.user).watched_till, 90)
+
+    def test_failures_end_the_stream_with_an_error_event(self):
+        def events(video_id, timestamp, keyword_engine, question_source):
+            raise utils.ProcessingError("Transcript not found or disabled.", 404)
+            yield
+
+        _, body = self.stream(events)
+        self.assertEqual(body, sse_event("error", {"error": "Transcript not found or disabled."}))
+
+    def test_invalid_requests_are_rejected_before_streaming(self):
+        response, _ = self.stream(None, keyword_engine="psychic")
+        self.assertEqual(response.status_code, 400)
+
+
+class ParseProcessRequestTests(SimpleTestCase):
+    def test_valid_request(self):
+        self.assertEqual(
+            utils.parse_process_request({"url": "https://youtu.be/dQw4w9WgXcQ", "timestamp": "90", "keyword_engine": "local"}),
+            ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ", 90, "local", None),
+        )
+
+    def test_invalid_requests_are_400(self):
+        for data, message in (
+            ({"url": "https://youtu.be/dQw4w9WgXcQ"}, "Invalid URL or timestamp."),
+            ({"url": "https://youtu.be/dQw4w9WgXcQ", "timestamp": "soon"}, "Invalid URL or timestamp."),
+            ({"url": "https://example.com/", "timestamp": 90}, "Could not extract video ID."),
+            ({"url": "https://youtu.be/dQw4w9WgXcQ", "timestamp": 90, "question_source": "oracle"}, "question_source must be one of gemini, catalog, auto."),
+        ):
+            with self.assertRaisesMessage(utils.ProcessingError, message) as raised:
+                utils.parse_process_request(data)
+            self.assertEqual(raised.exception.status, 400)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight("", 30)
+
+    def test_concurrent_callers_share_one_computation(self):
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"n": len(calls)}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.flight.do("key", compute))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while self.flight.stats()["requests"] < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual((calls, results), ([1], [{"n": 1}] * 4))
+        stats = self.flight.stats()
+        self.assertEqual((stats["computations"], stats["thread_shared"], stats["in_flight"]), (1, 3, 0))
+
+    def test_exceptions_are_shared_and_not_remembered(self):
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                self.flight.do("key", fail)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while self.flight.stats()["requests"] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(self.flight.do("key", lambda: "ok"), "ok")
+
+    def test_concurrent_coroutines_share_one_computation(self):
+        calls = []
+
+        async def acompute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(*(self.flight.ado("key", acompute) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(main()), [1, 1, 1])
+        self.assertEqual(self.flight.stats()["thread_shared"], 2)
+
+    @skipUnless(coalesce.fcntl, "Needs flock()")
+    def test_other_processes_reuse_the_spooled_result(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = SingleFlight(directory, 30), SingleFlight(directory, 30)
+            self.assertEqual(first.do("key", lambda: {"n": 1}), {"n": 1})
+            self.assertEqual(second.do("key", lambda: {"n": 2}), {"n": 1})
+            self.assertEqual(second.stats()["process_shared"], 1)
+
+            with mock.patch("timestampQues.coalesce.time.time", return_value=time.time() + 31):
+                self.assertEqual(second.do("key", lambda: {"n": 3}), {"n": 3})
+
+
+class JsonArrayStreamTests(SimpleTestCase):
+    RESPONSE = (
+        '```json\n[\n  { "title": "Two Sum, [easy]", "link": "https://leetcode.com/problems/two-sum/" },\n'
+        '  { "title": "Say \\"hi\\" {x}", "link": "https://example.com/a,b" },\n'
+        '  [1, 2], 3.5, true, null, "text"\n]\n```\nTrailing notes [ignored]'
+    )
+
+    def feed_in_chunks(self, text, size):
+        parser = JsonArrayStream()
+        elements = []
+        for start in range(0, len(text), size):
+            elements.extend(parser.feed(text[start:start + size]))
+        return parser, elements
+
+    def test_matches_json_loads_for_any_chunking(self):
+        expected = json.loads(self.RESPONSE.split("```json")[1].split("```")[0])
+        for size in (1, 2, 7, len(self.RESPONSE)):
+            with self.subTest(chunk_size=size):
+                parser, elements = self.feed_in_chunks(self.RESPONSE, size)
+                self.assertEqual(elements, expected)
+                self.assertTrue(parser.finished)
+
+    def test_elements_are_returned_as_soon_as_complete(self):
+        parser = JsonArrayStream()
+        self.assertEqual(parser.feed('[{"title": "A"'), [])
+        self.assertEqual(parser.feed('}, {"ti'), [{"title": "A"}])
+        self.assertEqual(parser.feed('tle": "B"}]'), [{"title": "B"}])
+        self.assertEqual(parser.feed(', {"title": "C"}'), [])
+
+    def test_empty_and_unfinished_arrays(self):
+        parser, elements = self.feed_in_chunks("[ ]", 1)
+        self.assertEqual((elements, parser.finished), ([], True))
+        parser, elements = self.feed_in_chunks('no array here, then [{"a": 1}', 3)
+        self.assertEqual((elements, parser.finished), ([], False))
+
+    def test_sse_event_format(self):
+        self.assertEqual(sse_event("question", {"title": "A"}), 'event: question\ndata: {"title": "A"}\n\n')
+
+
+class DocumentFrequencyFileTests(TestCase):
+    def test_save_and_load_agree_on_the_npz_suffix(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "keywords_df"
+            written = DocumentFrequencies({"binary search": 3}, 10).save(path)
+            self.assertEqual(written, f"{path}.npz")
+            table = DocumentFrequencies.load(path)
+            self.assertEqual((table.counts, table.documents), ({"binary search": 3}, 10))
+
+    def test_command_reports_the_file_it_wrote(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = io.StringIO()
+            call_command("build_keyword_df", output=str(Path(tmp) / "df"), stdout=out)
+            written = Path(tmp) / "df.npz"
+            self.assertIn(str(written), out.getvalue())
+            self.assertTrue(written.exists())
+
+
+class AudioSpanTests(TestCase):
+    video_id = "dQw4w9WgXcQ"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.fetched = []
+        self.store = AudioStore(directory.name, 10 ** 6, self.fetch)
+        self.decoded = []
+        for name, value in (
+            ("audio_store", self.store),
+            ("audio_source", lambda url: ("https://stream.example/audio", {}, 600.0)),
+            ("decode_audio", lambda source, start, end, headers=None: self.decoded.append((source, start, end))),
+            ("transcribe_segments", lambda samples, offset, prompt: [
+                {"text": f"from {offset:.0f}", "start": offset, "duration": 5.0},
+            ]),
+        ):
+            patcher = mock.patch.object(audio, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fetch(self, video_id, till_seconds, directory):
+        self.fetched.append(till_seconds)
+        path = Path(directory) / "audio.mp3"
+        path.write_bytes(b"mp3")
+        return path
+
+    def test_first_span_is_downloaded_into_the_store_and_later_spans_streamed(self):
+        audio.transcript_until(self.video_id, 60)
+        end = 60 + audio.settings.AUDIO_TRANSCRIBE_MARGIN
+        self.assertEqual(self.fetched, [end])
+        self.assertEqual(self.decoded, [(str(self.store.lookup(self.video_id, end)), 0.0, end)])
+
+        covered = AudioTranscript.objects.get().covered_until
+        audio.transcript_until(self.video_id, end + 60)
+        self.assertEqual(self.fetched, [end])
+        self.assertEqual(self.decoded[-1][:2], ("https://stream.example/audio", covered))
+
+    def test_stored_audio_covering_a_later_span_is_decoded_locally(self):
+        self.store.get(self.video_id)
+        AudioTranscript.objects.create(
+            video_id=self.video_id, payload=audio.Transcript.from_segments([]).to_bytes(), covered_until=100, duration=600,
+        )
+        audio.transcript_until(self.video_id, 200)
+        self.assertEqual(self.fetched, [None])
+        self.assertEqual(self.decoded[-1][:2], (str(self.store.lookup(self.video_id)), 100))
+        self.assertEqual((self.store.hits, self.store.misses), (1, 1))
+
+
+PROBLEMS = [
+    {"title": "Two Sum", "url": "https://leetcode.com/problems/two-sum/", "platform": "LeetCode", "tags": ["array", "hash table"]},
+    {"title": "Binary Tree Inorder Traversal", "url": "https://leetcode.com/problems/binary-tree-inorder-traversal/", "platform": "LeetCode", "tags": ["tree", "stack"]},
+    {"title": "Longest Substring Without Repeating Characters", "url": "https://leetcode.com/problems/longest-substring-without-repeating-characters/", "platform": "LeetCode", "tags": ["hash table", "sliding window", "string"]},
+    {"title": "Sliding Window Maximum", "url": "https://leetcode.com/problems/sliding-window-maximum/", "platform": "LeetCode", "tags": ["queue", "sliding window", "heap"]},
+]
+
+
+class ProblemCatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = ProblemCatalog(PROBLEMS)
+
+    def titles(self, keywords, limit=7):
+        problems, _ = self.catalog.search(keywords, limit)
+        return [problem["title"] for problem in problems]
+
+    def test_scores_match_plain_bm25(self):
+        documents = [catalog.terms(p["title"]) + catalog.terms(" ; ".join(p["tags"])) * catalog.TAG_WEIGHT for p in PROBLEMS]
+        average = sum(map(len, documents)) / len(documents)
+        query = catalog.terms("sliding window hash tables")
+
+        def bm25(document):
+            score = 0.0
+            for term in set(query):
+                tf = document.count(term)
+                df = sum(term in other for other in documents)
+                if tf:
+                    idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+                    norm = 1 - catalog.B + catalog.B * len(document) / average
+                    score += idf * tf * (catalog.K1 + 1) / (tf + catalog.K1 * norm)
+            return score
+
+        for actual, document in zip(self.catalog.scores(query), documents):
+            self.assertAlmostEqual(actual, bm25(document))
+
+    def test_best_matches_come_first(self):
+        self.assertEqual(self.titles(["binary trees"]), ["Binary Tree Inorder Traversal"])
+        self.assertEqual(self.titles(["sliding window", "heap"])[0], "Sliding Window Maximum")
+        self.assertEqual(self.titles(["hash table"], limit=1), ["Two Sum"])
+
+    def test_recall_is_the_share_of_keywords_matched(self):
+        problems, recall = self.catalog.search(["sliding window", "quantum chromodynamics"])
+        self.assertEqual(len(problems), 2)
+        self.assertEqual(recall, 0.5)
+        self.assertEqual(self.catalog.search(["quantum chromodynamics"]), ([], 0.0))
+        self.assertEqual(ProblemCatalog([]).search(["two sum"]), ([], 0.0))
+
+    def test_loads_json_and_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "problems.json"
+            json_path.write_text(json.dumps([
+                {"title": "Two Sum", "link": "https://leetcode.com/problems/two-sum/", "tags": ["array"]},
+                {"title": "No link"},
+            ]))
+            csv_path = Path(directory) / "problems.csv"
+            with csv_path.open("w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["title", "url", "platform", "tags"])
+                writer.writerow(["Two Sum", "https://leetcode.com/problems/two-sum/", "LeetCode", "array; hash table"])
+            self.assertEqual(load_problems(json_path), [
+                {"title": "Two Sum", "url": "https://leetcode.com/problems/two-sum/", "platform": "", "tags": ["array"]},
+            ])
+            self.assertEqual(load_problems(csv_path)[0]["tags"], ["array", "hash table"])
+
+    def test_shipped_catalog_answers_common_topics(self):
+        shipped = ProblemCatalog(load_problems(settings.PRACTICE_CATALOG_PATH))
+        for keyword in ("dynamic programming", "binary search", "linked list"):
+            problems, recall = shipped.search([keyword])
+            self.assertTrue(problems, keyword)
+            self.assertEqual(recall, 1.0)
+
+
+class QuestionCacheTests(SimpleTestCase):
+    QUESTIONS = [{"title": "Validate Binary Search Tree", "link": "https://leetcode.com/problems/validate-binary-search-tree/"}]
+
+    def setUp(self):
+        self.cache = QuestionCache(max_entries=100, min_similarity=0.6, ttl=60)
+
+    def test_keywords_are_normalized(self):
+        self.assertEqual(normalize_keyword("BST"), "binary search tree")
+        self.assertEqual(normalize_keyword("Dynamic-Programming"), "dynamic programming")
+        self.assertEqual(normalize_keyword("DFS traversals"), "depth first search traversal")
+        self.assertEqual(keyword_set(["BST", "Traversals"]), keyword_set(["binary search trees", "traversal"]))
+
+    def test_same_keywords_in_other_words_hit(self):
+        self.cache.set(["binary search trees", "tree traversal"], self.QUESTIONS)
+        self.assertEqual(self.cache.get(["Traversals", "BST"]), self.QUESTIONS)
+        self.assertEqual(self.cache.stats()["exact_hits"], 1)
+
+    def test_similar_keywords_hit_and_different_ones_miss(self):
+        self.cache.set(["binary search tree", "inorder traversal", "recursion", "stack", "height"], self.QUESTIONS)
+        self.assertEqual(self.cache.get(["binary search tree", "inorder traversal", "recursion", "stack", "depth"]), self.QUESTIONS)
+        self.assertIsNone(self.cache.get(["sliding window", "two pointers"]))
+        stats = self.cache.stats()
+        self.assertEqual((stats["near_hits"], stats["misses"]), (1, 1))
+        self.assertAlmostEqual(stats["mean_near_hit_similarity"], 7 / 9)
+        self.assertEqual(stats["would_hit"]["0.7"], 0.5)
+        self.assertEqual(stats["would_hit"]["0.8"], 0.0)
+
+    def test_lsh_finds_similar_lists(self):
+        found = 0
+        for n in range(100):
+            words = [f"topic{n}x{i}" for i in range(10)]
+            # Jaccard similarity 9/11 with the stored list.
+            self.cache.set(words, self.QUESTIONS)
+            found += self.cache.get([*words[:9], f"other{n}"]) is not None
+        self.assertGreaterEqual(found, 95)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = QuestionCache(max_entries=2, min_similarity=0.6, ttl=60)
+        cache.set(["stack"], self.QUESTIONS)
+        cache.set(["queue"], self.QUESTIONS)
+        cache.get(["stack"])
+        cache.set(["heap"], self.QUESTIONS)
+        self.assertIsNone(cache.get(["queue"]))
+        self.assertIsNotNone(cache.get(["stack"]))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_entries_expire(self):
+        with mock.patch("timestampQues.question_cache.time.monotonic", return_value=1000.0):
+            self.cache.set(["binary search tree", "inorder traversal", "recursion", "stack"], self.QUESTIONS)
+        with mock.patch("timestampQues.question_cache.time.monotonic", return_value=1060.0):
+            self.assertIsNone(self.cache.get(["binary search tree", "inorder traversal", "recursion", "stack"]))
+            self.assertIsNone(self.cache.get(["binary search tree", "inorder traversal", "recursion", "queue"]))
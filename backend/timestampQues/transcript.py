@@ -0,0 +1,129 @@
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+from typing import Iterable, NamedTuple
+
+
+class Segment(NamedTuple):
+    text: str
+    start: float
+    duration: float
+
+
+# magic, segment count, token count
+_HEADER = struct.Struct("<4sII")
+_MAGIC = b"TRN1"
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class Transcript:
+    """
+    Columnar transcript: segment starts/durations as packed float arrays and all
+    segment texts joined by spaces into one string, with ``ends[i]`` the offset
+    where segment ``i`` ends in that string. Segments are ordered by start time,
+    so "everything said up to T" is a bisect plus a slice.
+    """
+    __slots__ = ("starts", "durations", "ends", "text", "token_count")
+
+    def __init__(self, starts: array, durations: array, ends: array, text: str, token_count: int):
+        self.starts = starts
+        self.durations = durations
+        self.ends = ends
+        self.text = text
+        self.token_count = token_count
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> "Transcript":
+        """Builds a transcript from dicts or objects with text/start/duration."""
+        rows = []
+        for segment in segments:
+            if isinstance(segment, dict):
+                rows.append((float(segment["start"]), float(segment["duration"]), segment["text"]))
+            else:
+                rows.append((float(segment.start), float(segment.duration), segment.text))
+        rows.sort(key=lambda row: row[0])
+
+        starts, durations, ends = array("d"), array("d"), array("q")
+        parts = []
+        position = 0
+        for start, duration, text in rows:
+            if parts:
+                position += 1  # joining space
+            position += len(text)
+            starts.append(start)
+            durations.append(duration)
+            ends.append(position)
+            parts.append(text)
+
+        text = " ".join(parts)
+        return cls(starts, durations, ends, text, len(text.split()))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> Segment:
+        if index < 0:
+            index += len(self)
+        begin = self.ends[index - 1] + 1 if index > 0 else 0
+        return Segment(self.text[begin:self.ends[index]], self.starts[index], self.durations[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def count_until(self, timestamp: float) -> int:
+        """Number of segments starting at or before ``timestamp``."""
+        return bisect_right(self.starts, timestamp)
+
+    def text_until(self, timestamp: float) -> str:
+        """Text of every segment starting at or before ``timestamp``."""
+        count = self.count_until(timestamp)
+        return self.text[:self.ends[count - 1]] if count else ""
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(b"".join([
+            _HEADER.pack(_MAGIC, len(self), self.token_count),
+            _le_bytes(self.starts),
+            _le_bytes(self.durations),
+            _le_bytes(self.ends),
+            self.text.encode("utf-8"),
+        ]))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Transcript":
+        """Inverse of to_bytes(); raises ValueError on anything else."""
+        try:
+            raw = zlib.decompress(bytes(data))
+        except zlib.error as e:
+            raise ValueError(f"Not a serialized transcript: {e}")
+        if len(raw) < _HEADER.size:
+            raise ValueError("Not a serialized transcript.")
+        magic, count, token_count = _HEADER.unpack_from(raw)
+        if magic != _MAGIC:
+            raise ValueError("Not a serialized transcript.")
+
+        offset = _HEADER.size
+        width = 8 * count
+        if len(raw) < offset + 3 * width:
+            raise ValueError("Truncated transcript.")
+        starts = _from_le_bytes("d", raw[offset:offset + width])
+        durations = _from_le_bytes("d", raw[offset + width:offset + 2 * width])
+        ends = _from_le_bytes("q", raw[offset + 2 * width:offset + 3 * width])
+        text = raw[offset + 3 * width:].decode("utf-8")
+        return cls(starts, durations, ends, text, token_count)
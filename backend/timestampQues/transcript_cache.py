@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TranscriptCache
+from .transcript import Transcript
+
+# Returned by lookup() when nothing usable is cached for the video.
+MISS = object()
+
+# Don't write last_accessed on every hit; this is precise enough for LRU eviction.
+TOUCH_INTERVAL = timedelta(minutes=1)
+
+
+def lookup(video_id: str):
+    """
+    Returns the cached Transcript for a video, None if the video is cached as
+    having no transcript, or MISS if it has to be fetched from YouTube.
+    """
+    entry = TranscriptCache.objects.filter(video_id=video_id).first()
+    if entry is None:
+        return MISS
+
+    now = timezone.now()
+    ttl = settings.TRANSCRIPT_CACHE_TTL if entry.available else settings.TRANSCRIPT_CACHE_NEGATIVE_TTL
+    if entry.fetched_at + timedelta(seconds=ttl) <= now:
+        return MISS
+
+    if entry.last_accessed + TOUCH_INTERVAL <= now:
+        TranscriptCache.objects.filter(pk=entry.pk).update(last_accessed=now)
+
+    if not entry.available:
+        return None
+    try:
+        return Transcript.from_bytes(entry.payload)
+    except (ValueError, TypeError):
+        return MISS
+
+
+def store(video_id: str, transcript: Transcript | None):
+    """Caches a fetched transcript, or None for a video without one."""
+    now = timezone.now()
+    TranscriptCache.objects.update_or_create(
+        video_id=video_id,
+        defaults={
+            "available": transcript is not None,
+            "payload": transcript.to_bytes() if transcript is not None else None,
+            "fetched_at": now,
+            "last_accessed": now,
+        }
+    )
+    evict()
+
+
+def evict():
+    """Drops the least recently used entries above TRANSCRIPT_CACHE_MAX_ENTRIES."""
+    max_entries = settings.TRANSCRIPT_CACHE_MAX_ENTRIES
+    if TranscriptCache.objects.count() <= max_entries:
+        return
+    stale = TranscriptCache.objects.order_by("-last_accessed").values_list("pk", flat=True)[max_entries:]
+    TranscriptCache.objects.filter(pk__in=list(stale)).delete()
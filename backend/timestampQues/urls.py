@@ -1,7 +1,16 @@
 from django.urls import path
-from .views import generate_practice_questions, user_video_inputs
+from .views import (
+    generate_practice_questions,
+    generate_practice_questions_async,
+    generate_practice_questions_stream,
+    user_video_inputs,
+    process_stats,
+)
 
 urlpatterns = [
     path('process/', generate_practice_questions, name='video-process'),
+    path('process/async/', generate_practice_questions_async, name='video-process-async'),
+    path('process/stream/', generate_practice_questions_stream, name='video-process-stream'),
     path('my-videos/', user_video_inputs, name='user-video-inputs'),
+    path('process/stats/', process_stats, name='video-process-stats'),
 ]
@@ -1,14 +1,26 @@
 import os
 import json
+import logging
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
-import google.generativeai as genai
 from django.conf import settings
 from urllib.parse import urlparse, parse_qs
 import re
+import asyncio
+from typing import NamedTuple
+from asgiref.sync import sync_to_async
 
+from . import audio, transcript_cache
+from .keywords import extract_keywords_local
+from .catalog import catalog_questions
+from .coalesce import process_flight
+from .question_cache import question_cache
+from .result_cache import result_cache
+from .streaming import JsonArrayStream
+from .transcript import Transcript
+from backend.model_registry import gemini
+
+logger = logging.getLogger(__name__)
 
-# Initialize Gemini AI
-genai.configure(api_key=settings.GOOGLE_GEMINI_API_KEY)
 
 def extract_video_id(url):
     """Extracts YouTube video ID from various URL formats."""
@@ -37,10 +49,10 @@ def approximate_tokens(text: str) -> int:
     return len(text.split())
 
 
-def get_transcript(video_id: str) -> dict | None:
+def fetch_transcript(video_id: str) -> Transcript | None:
     """
-    Fetches the English transcript (manual preferred, fallback to auto-generated) for a YouTube video.
-    Returns a dict with 'transcript' (list of segments), 'text' (full concatenated), and 'token_count'.
+    Fetches the English transcript (manual preferred, fallback to auto-generated) from YouTube.
+    Returns None if the video has no transcript.
     """
     try:
         transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
@@ -49,32 +61,102 @@ def get_transcript(video_id: str) -> dict | None:
         except NoTranscriptFound:
             transcript = transcript_list.find_generated_transcript(['en'])
 
-        segments = transcript.fetch()
-        full_text = " ".join(segment.text for segment in segments)
-
-        return {
-            'transcript': segments,
-            'text': full_text,
-            'token_count': approximate_tokens(full_text)
-        }
+        return Transcript.from_segments(transcript.fetch())
     except (TranscriptsDisabled, NoTranscriptFound):
         return None
 
 
-import json
-import re
-import google.generativeai as genai
-from django.conf import settings
+def get_transcript(video_id: str) -> dict | None:
+    """
+    Returns the English transcript for a YouTube video, served from the transcript cache when possible.
+    Returns a dict with 'transcript' (a columnar Transcript), 'text' (full concatenated), and 'token_count'.
+    """
+    transcript = transcript_cache.lookup(video_id)
+    if transcript is transcript_cache.MISS:
+        transcript = fetch_transcript(video_id)
+        transcript_cache.store(video_id, transcript)
+
+    if transcript is None:
+        return None
+
+    return {
+        'transcript': transcript,
+        'text': transcript.text,
+        'token_count': transcript.token_count
+    }
+
 
-def extract_keywords_gemini(transcript_chunk: str, num_keywords: int = 7) -> list[str]:
+async def aget_transcript(video_id: str) -> dict | None:
     """
-    Extracts keywords from a transcript snippet using the Gemini API.
-    Returns a list of keywords or an empty list on failure.
+    Async version of get_transcript(). The cache is read and written on the
+    thread Django reserves for the ORM; only the YouTube fetch (which has no
+    async client) runs on a pool thread.
     """
-    if not settings.GOOGLE_GEMINI_API_KEY or not transcript_chunk:
-        return []
+    transcript = await sync_to_async(transcript_cache.lookup)(video_id)
+    if transcript is transcript_cache.MISS:
+        transcript = await sync_to_async(fetch_transcript, thread_sensitive=False)(video_id)
+        await sync_to_async(transcript_cache.store)(video_id, transcript)
+
+    if transcript is None:
+        return None
+
+    return {
+        'transcript': transcript,
+        'text': transcript.text,
+        'token_count': transcript.token_count
+    }
+
+def transcript_until(video_id: str, timestamp: int) -> Transcript | None:
+    """
+    The video's transcript covering at least ``timestamp`` seconds: the
+    YouTube captions when it has them, otherwise (with WHISPER_FALLBACK) a
+    Whisper transcription of just the audio up to there. None if neither works.
+    """
+    transcript_data = get_transcript(video_id)
+    if transcript_data:
+        return transcript_data["transcript"]
+    if not settings.WHISPER_FALLBACK:
+        return None
+    try:
+        return audio.transcript_until(video_id, timestamp)
+    except Exception:
+        logger.warning("Could not transcribe the audio of %s", video_id, exc_info=True)
+        return None
+
+
+async def atranscript_until(video_id: str, timestamp: int) -> Transcript | None:
+    """Async version of transcript_until(); the transcription runs on a pool thread."""
+    transcript_data = await aget_transcript(video_id)
+    if transcript_data:
+        return transcript_data["transcript"]
+    if not settings.WHISPER_FALLBACK:
+        return None
+    try:
+        return await sync_to_async(audio.transcript_until, thread_sensitive=False)(video_id, timestamp)
+    except Exception:
+        logger.warning("Could not transcribe the audio of %s", video_id, exc_info=True)
+        return None
 
-    prompt = f"""
+
+import json
+import re
+from django.conf import settings
+
+def _keywords_model():
+    return gemini().model(
+        model_name="gemini-1.5-flash",  # or "gemini-1.0-pro"
+        generation_config={"temperature": 0.4},
+        safety_settings=[
+            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        ]
+    )
+
+
+def _keywords_prompt(transcript_chunk: str, num_keywords: int) -> str:
+    return f"""
 Analyze the following text and extract the {num_keywords} most important and relevant keywords or topics that represent the main subject.
 
 Text:
@@ -84,46 +166,108 @@ Respond ONLY with a valid JSON list of strings. Example:
 ["keyword1", "keyword2", "keyword3"]
 """
 
-    # Configure Gemini
-    genai.configure(api_key=settings.GOOGLE_GEMINI_API_KEY)
+
+def _parse_keywords(raw_text: str, num_keywords: int) -> list[str]:
+    # Extract JSON array from response using regex
+    match = re.search(r"\[[^\]]+\]", raw_text, re.DOTALL)
+    if match:
+        keywords = json.loads(match.group(0))
+        if isinstance(keywords, list) and all(isinstance(k, str) for k in keywords):
+            return keywords[:num_keywords]
+    return []
+
+
+def _parses(parse):
+    """A ``cache_if`` for Gemini calls (backend.gemini): only replies ``parse()`` gets something out of are cached."""
+    def check(text):
+        try:
+            return bool(parse(text))
+        except (ValueError, TypeError):
+            return False
+    return check
+
+
+def extract_keywords_gemini(transcript_chunk: str, num_keywords: int = 7, timeout: float | None = None) -> list[str]:
+    """
+    Extracts keywords from a transcript snippet using the Gemini API.
+    Returns a list of keywords or an empty list on failure (or after ``timeout`` seconds).
+    """
+    if not settings.GOOGLE_GEMINI_API_KEY or not transcript_chunk:
+        return []
 
     try:
-        model = genai.GenerativeModel(
-            model_name="gemini-1.5-flash",  # or "gemini-1.0-pro"
-            generation_config={"temperature": 0.4},
-            safety_settings=[
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            ]
+        response = _keywords_model().generate_content(
+            _keywords_prompt(transcript_chunk, num_keywords),
+            request_options={"timeout": timeout} if timeout else None,
+            cache_if=_parses(lambda text: _parse_keywords(text, num_keywords)),
         )
+        return _parse_keywords(response.text, num_keywords)
+    except Exception:
+        logger.warning("Gemini keyword extraction failed", exc_info=True)
 
-        response = model.generate_content(prompt)
+    return []
 
-        # Extract JSON array from response using regex
-        match = re.search(r"\[[^\]]+\]", response.text, re.DOTALL)
-        if match:
-            keywords = json.loads(match.group(0))
-            if isinstance(keywords, list) and all(isinstance(k, str) for k in keywords):
-                return keywords[:num_keywords]
-    except Exception as e:
-        print(f"Error extracting keywords: {e}")
+
+async def aextract_keywords_gemini(transcript_chunk: str, num_keywords: int = 7, timeout: float | None = None) -> list[str]:
+    """Async version of extract_keywords_gemini()."""
+    if not settings.GOOGLE_GEMINI_API_KEY or not transcript_chunk:
+        return []
+
+    try:
+        response = await asyncio.wait_for(
+            _keywords_model().generate_content_async(
+                _keywords_prompt(transcript_chunk, num_keywords),
+                cache_if=_parses(lambda text: _parse_keywords(text, num_keywords)),
+            ),
+            timeout,
+        )
+        return _parse_keywords(response.text, num_keywords)
+    except Exception:
+        logger.warning("Gemini keyword extraction failed", exc_info=True)
 
     return []
 
 
-import json
+KEYWORD_ENGINES = ("gemini", "local", "auto")
 
-def get_practice_questions_from_gemini(keywords: list[str]) -> list[dict]:
+
+def _keyword_engine(engine: str | None) -> str:
+    engine = engine or settings.KEYWORDS_ENGINE
+    if engine not in KEYWORD_ENGINES:
+        raise ValueError(f"Unknown keyword engine '{engine}'.")
+    return engine
+
+
+def extract_keywords(transcript_chunk: str, num_keywords: int = 7, engine: str | None = None) -> tuple[list[str], str]:
     """
-    Uses Gemini API to generate practice questions with platform links based on keywords.
-    Returns a list of dicts: [{ "title": "question", "link": "url" }]
+    Extracts keywords with ``engine`` (settings.KEYWORDS_ENGINE by default):
+    "gemini", "local" (timestampQues.keywords, no API call) or "auto", which
+    asks Gemini with a KEYWORDS_GEMINI_TIMEOUT deadline and falls back to the
+    local extractor when it is slow, fails or returns nothing.
+    Returns (keywords, engine that produced them).
     """
-    if not keywords:
-        return []
-
-    prompt = f"""
+    engine = _keyword_engine(engine)
+    if engine != "local":
+        timeout = settings.KEYWORDS_GEMINI_TIMEOUT if engine == "auto" else None
+        keywords = extract_keywords_gemini(transcript_chunk, num_keywords, timeout=timeout)
+        if keywords or engine == "gemini":
+            return keywords, "gemini"
+    return extract_keywords_local(transcript_chunk, num_keywords), "local"
+
+
+async def aextract_keywords(transcript_chunk: str, num_keywords: int = 7, engine: str | None = None) -> tuple[list[str], str]:
+    """Async version of extract_keywords()."""
+    engine = _keyword_engine(engine)
+    if engine != "local":
+        timeout = settings.KEYWORDS_GEMINI_TIMEOUT if engine == "auto" else None
+        keywords = await aextract_keywords_gemini(transcript_chunk, num_keywords, timeout=timeout)
+        if keywords or engine == "gemini":
+            return keywords, "gemini"
+    return extract_keywords_local(transcript_chunk, num_keywords), "local"
+
+
+def _questions_prompt(keywords: list[str]) -> str:
+    return f"""
 You are an API that returns ONLY JSON data. No explanations or extra text.
 
 Given these programming topics: {', '.join(keywords)}.
@@ -139,31 +283,374 @@ Return strictly this JSON structure:
 ]
 """
 
-    genai.configure(api_key=settings.GOOGLE_GEMINI_API_KEY)
-    model = genai.GenerativeModel("gemini-1.5-flash")
+
+def _parse_questions(raw_text: str) -> list[dict]:
+    raw_text = raw_text.strip()
+
+    logger.debug("Raw Gemini output:\n%s", raw_text)
+
+    # Clean any potential unwanted markdown (e.g., backticks, extra spaces, etc.)
+    if "```json" in raw_text:
+        raw_text = raw_text.split("```json")[1].strip("``` \n")
+
+    logger.debug("Cleaned response:\n%s", raw_text)
+
+    # Try parsing the JSON from the cleaned response
+    questions = json.loads(raw_text)
+
+    if isinstance(questions, list) and all("title" in q and "link" in q for q in questions):
+        return questions
+    return []
+
+
+def get_practice_questions_from_gemini(keywords: list[str]) -> list[dict]:
+    """
+    Uses Gemini API to generate practice questions with platform links based on keywords.
+    Returns a list of dicts: [{ "title": "question", "link": "url" }]
+    """
+    if not keywords:
+        return []
+
+    model = gemini().model("gemini-1.5-flash")
 
     try:
         # Get the response
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
+        response = model.generate_content(_questions_prompt(keywords), cache_if=_parses(_parse_questions))
+        return _parse_questions(response.text)
+    except json.JSONDecodeError:
+        logger.warning("Gemini practice questions were not valid JSON", exc_info=True)
+    except Exception:
+        logger.warning("Gemini practice question generation failed", exc_info=True)
 
-        print("Raw Gemini Output:\n", raw_text)  # Check the response structure
-        
-        # Clean any potential unwanted markdown (e.g., backticks, extra spaces, etc.)
-        if "```json" in raw_text:
-            raw_text = raw_text.split("```json")[1].strip("``` \n")
+    return []
 
-        print("Cleaned Response:\n", raw_text)
 
-        # Try parsing the JSON from the cleaned response
-        questions = json.loads(raw_text)
+def stream_practice_questions_from_gemini(keywords: list[str]):
+    """
+    Streaming version of get_practice_questions_from_gemini(): yields each
+    { "title", "link" } dict as soon as the model has finished writing it.
+    """
+    if not keywords:
+        return
 
-        if isinstance(questions, list) and all("title" in q and "link" in q for q in questions):
-            return questions
+    model = gemini().model("gemini-1.5-flash")
+    parser = JsonArrayStream()
 
-    except json.JSONDecodeError as e:
-        print("JSON Decoding Error:", e)
-    except Exception as e:
-        print("Error:", e)
+    try:
+        for chunk in model.generate_content(_questions_prompt(keywords), stream=True, cache_if=_parses(_parse_questions)):
+            for question in parser.feed(chunk.text):
+                if isinstance(question, dict) and "title" in question and "link" in question:
+                    yield question
+            if parser.finished:
+                break
+    except json.JSONDecodeError:
+        logger.warning("Gemini practice questions were not valid JSON", exc_info=True)
+    except Exception:
+        logger.warning("Gemini practice question generation failed", exc_info=True)
+
+
+async def aget_practice_questions_from_gemini(keywords: list[str]) -> list[dict]:
+    """Async version of get_practice_questions_from_gemini()."""
+    if not keywords:
+        return []
+
+    model = gemini().model("gemini-1.5-flash")
+
+    try:
+        response = await model.generate_content_async(_questions_prompt(keywords), cache_if=_parses(_parse_questions))
+        return _parse_questions(response.text)
+    except json.JSONDecodeError:
+        logger.warning("Gemini practice questions were not valid JSON", exc_info=True)
+    except Exception:
+        logger.warning("Gemini practice question generation failed", exc_info=True)
 
     return []
+
+
+QUESTION_SOURCES = ("gemini", "catalog", "auto")
+PRACTICE_QUESTION_COUNT = 7
+
+
+def _question_source(source: str | None) -> str:
+    source = source or settings.PRACTICE_QUESTION_SOURCE
+    if source not in QUESTION_SOURCES:
+        raise ValueError(f"Unknown question source '{source}'.")
+    return source
+
+
+def catalog_practice_questions(keywords: list[str], source: str | None = None) -> list[dict] | None:
+    """
+    Practice questions for ``keywords`` from the local catalog
+    (timestampQues.catalog), or None when ``source`` is "gemini" or, for
+    "auto", when the catalog covers fewer than PRACTICE_CATALOG_MIN_RECALL of
+    the keywords and Gemini should be asked instead.
+    """
+    source = _question_source(source)
+    if source == "gemini":
+        return None
+    questions, recall = catalog_questions(keywords, PRACTICE_QUESTION_COUNT)
+    if source == "catalog" or (questions and recall >= settings.PRACTICE_CATALOG_MIN_RECALL):
+        return questions
+    return None
+
+
+def gemini_practice_questions(keywords: list[str]) -> list[dict]:
+    """
+    get_practice_questions_from_gemini(), answered from the question cache
+    when an earlier keyword list was near-identical (see question_cache).
+    """
+    questions = question_cache.get(keywords)
+    if questions is None:
+        questions = get_practice_questions_from_gemini(keywords)
+        question_cache.set(keywords, questions)
+    return questions
+
+
+async def agemini_practice_questions(keywords: list[str]) -> list[dict]:
+    """Async version of gemini_practice_questions()."""
+    questions = question_cache.get(keywords)
+    if questions is None:
+        questions = await aget_practice_questions_from_gemini(keywords)
+        question_cache.set(keywords, questions)
+    return questions
+
+
+def get_practice_questions(keywords: list[str], source: str | None = None) -> tuple[list[dict], str]:
+    """
+    Practice questions from ``source`` (settings.PRACTICE_QUESTION_SOURCE by
+    default): "gemini", "catalog" or "auto" (the catalog, falling back to
+    Gemini when its recall is low). Returns (questions, source that produced them).
+    """
+    questions = catalog_practice_questions(keywords, source)
+    if questions is not None:
+        return questions, "catalog"
+    return gemini_practice_questions(keywords), "gemini"
+
+
+async def aget_practice_questions(keywords: list[str], source: str | None = None) -> tuple[list[dict], str]:
+    """Async version of get_practice_questions(); a catalog search takes milliseconds, so it runs inline."""
+    questions = catalog_practice_questions(keywords, source)
+    if questions is not None:
+        return questions, "catalog"
+    return await agemini_practice_questions(keywords), "gemini"
+
+
+class ProcessingError(Exception):
+    """A /api/process/ failure that maps to an HTTP status."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class ProcessRequest(NamedTuple):
+    video_url: str
+    video_id: str
+    timestamp: int
+    keyword_engine: str | None
+    question_source: str | None
+
+
+def parse_process_request(data) -> ProcessRequest:
+    """The options of a /api/process/ request (JSON body or query parameters); raises ProcessingError (400)."""
+    video_url = data.get("url")
+    try:
+        timestamp = int(data.get("timestamp", 0))  # Timestamp in seconds
+    except (TypeError, ValueError):
+        timestamp = 0
+
+    if not video_url or timestamp <= 0:
+        raise ProcessingError("Invalid URL or timestamp.", 400)
+
+    video_id = extract_video_id(video_url)
+    if not video_id:
+        raise ProcessingError("Could not extract video ID.", 400)
+
+    # "gemini", "local" or "auto" (Gemini, falling back to the local extractor)
+    keyword_engine = data.get("keyword_engine")
+    if keyword_engine is not None and keyword_engine not in KEYWORD_ENGINES:
+        raise ProcessingError(f"keyword_engine must be one of {', '.join(KEYWORD_ENGINES)}.", 400)
+
+    # "gemini", "catalog" or "auto" (the local catalog, falling back to Gemini)
+    question_source = data.get("question_source")
+    if question_source is not None and question_source not in QUESTION_SOURCES:
+        raise ProcessingError(f"question_source must be one of {', '.join(QUESTION_SOURCES)}.", 400)
+
+    return ProcessRequest(video_url, video_id, timestamp, keyword_engine, question_source)
+
+
+def result_variant(keyword_engine: str | None, question_source: str | None) -> tuple[str, str]:
+    """The options a /api/process/ result depends on, defaults filled in (see result_cache)."""
+    return _keyword_engine(keyword_engine), _question_source(question_source)
+
+
+def process_key(video_id: str, timestamp: int, variant: tuple = ()) -> str:
+    """Requests with the same key get the same result (see result_cache) and share one computation."""
+    return "process:" + ":".join(map(str, result_cache.key(video_id, timestamp, variant)))
+
+
+def process_video(video_id: str, timestamp: int, keyword_engine: str | None = None, question_source: str | None = None) -> dict:
+    """
+    Runs the /api/process/ pipeline: transcript up to ``timestamp``, keywords
+    (see extract_keywords() for ``keyword_engine``), then practice questions
+    (see get_practice_questions() for ``question_source``).
+    Results are shared through the result cache by requests with the same options,
+    and concurrent requests for the same video and timestamp bucket (also from
+    other processes) wait for one run instead of starting their own.
+    Raises ProcessingError when a step yields nothing usable.
+    """
+    variant = result_variant(keyword_engine, question_source)
+    cached = result_cache.get(video_id, timestamp, variant)
+    if cached is not None:
+        return cached
+
+    result = process_flight.do(
+        process_key(video_id, timestamp, variant), lambda: _process_video(video_id, timestamp, keyword_engine, question_source)
+    )
+    if result["questions"]:
+        result_cache.set(video_id, timestamp, result, variant)
+    return result
+
+
+def _video_keywords(video_id, timestamp, keyword_engine):
+    """(keywords, engine) of the video's transcript up to ``timestamp``; raises ProcessingError."""
+    transcript = transcript_until(video_id, timestamp)
+    if transcript is None:
+        raise ProcessingError("Transcript not found or disabled.", 404)
+
+    filtered_text = transcript.text_until(timestamp)
+
+    if not filtered_text.strip():
+        raise ProcessingError("Transcript up to given timestamp is empty.", 400)
+
+    keywords, keyword_engine = extract_keywords(filtered_text, 7, keyword_engine)
+    if not keywords:
+        raise ProcessingError("Could not extract keywords.", 500)
+    return keywords, keyword_engine
+
+
+def _process_video(video_id, timestamp, keyword_engine, question_source):
+    # A run that finished just before this one started may have the result already.
+    cached = result_cache.peek(video_id, timestamp, result_variant(keyword_engine, question_source))
+    if cached is not None:
+        return cached
+
+    keywords, keyword_engine = _video_keywords(video_id, timestamp, keyword_engine)
+    questions, question_source = get_practice_questions(keywords, question_source)
+
+    return {
+        "keywords": keywords,
+        "keyword_engine": keyword_engine,
+        "questions": questions,
+        "question_source": question_source,
+    }
+
+
+def result_events(result: dict):
+    """The events stream_process_video() yields for a finished ``result``."""
+    yield "keywords", result["keywords"]
+    for question in result["questions"]:
+        yield "question", question
+
+
+def stream_process_video(video_id: str, timestamp: int, keyword_engine: str | None = None, question_source: str | None = None):
+    """
+    Streaming process_video(), a generator: yields ("keywords", keywords), then
+    ("question", question) for each practice question as soon as it is known
+    (Gemini's are streamed), and returns the result. Shares the result cache
+    with process_video(), and concurrent runs in this process with it (see
+    SingleFlight.stream()). Raises ProcessingError like process_video().
+    """
+    variant = result_variant(keyword_engine, question_source)
+    result = result_cache.get(video_id, timestamp, variant)
+    if result is not None:
+        yield from result_events(result)
+        return result
+
+    result = yield from process_flight.stream(
+        process_key(video_id, timestamp, variant),
+        _stream_process_video(video_id, timestamp, keyword_engine, question_source),
+        result_events,
+    )
+    if result["questions"]:
+        result_cache.set(video_id, timestamp, result, variant)
+    return result
+
+
+def _stream_process_video(video_id, timestamp, keyword_engine, question_source):
+    cached = result_cache.peek(video_id, timestamp, result_variant(keyword_engine, question_source))
+    if cached is not None:
+        yield from result_events(cached)
+        return cached
+
+    keywords, keyword_engine = _video_keywords(video_id, timestamp, keyword_engine)
+    yield "keywords", keywords
+
+    questions = catalog_practice_questions(keywords, question_source)
+    question_source = "catalog" if questions is not None else "gemini"
+    if questions is None:
+        questions = question_cache.get(keywords)
+    if questions is None:
+        questions = []
+        for question in stream_practice_questions_from_gemini(keywords):
+            questions.append(question)
+            yield "question", question
+        question_cache.set(keywords, questions)
+    else:
+        for question in questions:
+            yield "question", question
+
+    return {
+        "keywords": keywords,
+        "keyword_engine": keyword_engine,
+        "questions": questions,
+        "question_source": question_source,
+    }
+
+
+async def aprocess_video(video_id: str, timestamp: int, keyword_engine: str | None = None, question_source: str | None = None) -> dict:
+    """Async version of process_video()."""
+    variant = result_variant(keyword_engine, question_source)
+    cached = result_cache.get(video_id, timestamp, variant)
+    if cached is not None:
+        return cached
+
+    result = await process_flight.ado(
+        process_key(video_id, timestamp, variant), lambda: _aprocess_video(video_id, timestamp, keyword_engine, question_source)
+    )
+    if result["questions"]:
+        result_cache.set(video_id, timestamp, result, variant)
+    return result
+
+
+async def _avideo_keywords(video_id, timestamp, keyword_engine):
+    """Async version of _video_keywords()."""
+    transcript = await atranscript_until(video_id, timestamp)
+    if transcript is None:
+        raise ProcessingError("Transcript not found or disabled.", 404)
+
+    filtered_text = transcript.text_until(timestamp)
+
+    if not filtered_text.strip():
+        raise ProcessingError("Transcript up to given timestamp is empty.", 400)
+
+    keywords, keyword_engine = await aextract_keywords(filtered_text, 7, keyword_engine)
+    if not keywords:
+        raise ProcessingError("Could not extract keywords.", 500)
+    return keywords, keyword_engine
+
+
+async def _aprocess_video(video_id, timestamp, keyword_engine, question_source):
+    cached = result_cache.peek(video_id, timestamp, result_variant(keyword_engine, question_source))
+    if cached is not None:
+        return cached
+
+    keywords, keyword_engine = await _avideo_keywords(video_id, timestamp, keyword_engine)
+    questions, question_source = await aget_practice_questions(keywords, question_source)
+
+    return {
+        "keywords": keywords,
+        "keyword_engine": keyword_engine,
+        "questions": questions,
+        "question_source": question_source,
+    }
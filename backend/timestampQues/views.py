@@ -1,69 +1,139 @@
-from django.http import JsonResponse
-from rest_framework.decorators import api_view, permission_classes
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import JSONRenderer
+from rest_framework.exceptions import AuthenticationFailed
 import json
 from .utils import (
-    extract_video_id,
-    get_transcript,
-    extract_keywords_gemini,
-    get_practice_questions_from_gemini
+    parse_process_request,
+    process_video,
+    aprocess_video,
+    stream_process_video,
+    result_variant,
+    ProcessingError
 )
-from django.utils.text import slugify
 from .models import VideoInput
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from .serializers import VideoInputSerializer  # you'll need this
+from .coalesce import process_flight
+from .question_cache import question_cache
+from .result_cache import result_cache
+from .streaming import EventStreamRenderer, sse_event
+from base.authentication import CookiesJWTAuthentication
+from jobs.queue import enqueue
+from backend.model_registry import gemini, registry
+from backend.utils import audio_store
+
+
+def _video_input_fields(user, process):
+    """update_or_create() arguments for ``user``'s entry for the video of ``process`` (a ProcessRequest)."""
+    return {
+        "owner": user,
+        "video_id": process.video_id,
+        "defaults": {
+            "video_url": process.video_url,
+            "watched_till": process.timestamp,
+        },
+    }
+
 
 @api_view(['POST'])
 def generate_practice_questions(request):
     try:
         data = json.loads(request.body)
-        video_url = data.get("url")
-        timestamp = int(data.get("timestamp", 0))  # Timestamp in seconds
+        process = parse_process_request(data)
+        VideoInput.objects.update_or_create(**_video_input_fields(request.user, process))
+        _, video_id, timestamp, keyword_engine, question_source = process
 
-        if not video_url or timestamp <= 0:
-            return JsonResponse({"error": "Invalid URL or timestamp."}, status=400)
+        # With "background": true, run the pipeline as a job and poll /api/jobs/<job_id>/.
+        if data.get("background") and result_cache.peek(video_id, timestamp, result_variant(keyword_engine, question_source)) is None:
+            job = enqueue(
+                "timestampQues.process_video",
+                {
+                    "video_id": video_id,
+                    "timestamp": timestamp,
+                    "keyword_engine": keyword_engine,
+                    "question_source": question_source,
+                },
+                owner=request.user,
+            )
+            return JsonResponse({"job_id": job.pk, "status": job.status}, status=202)
 
-        video_id = extract_video_id(video_url)
-        if not video_id:
-            return JsonResponse({"error": "Could not extract video ID."}, status=400)
+        return JsonResponse(process_video(video_id, timestamp, keyword_engine, question_source))
 
-        # Create slug using user + video_url
-        slug = slugify(f"{request.user.username}-{video_url}")
+    except ProcessingError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON."}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
 
-        # Create or update existing entry
-        video_input, created = VideoInput.objects.update_or_create(
-            slug=slug,
-            defaults={
-                "video_url": video_url,
-                "watched_till": timestamp,
-                "owner": request.user
-            }
-        )
 
-        transcript_data = get_transcript(video_id)
-        if not transcript_data:
-            return JsonResponse({"error": "Transcript not found or disabled."}, status=404)
+def _practice_question_events(video_id, timestamp, keyword_engine=None, question_source=None):
+    try:
+        count = 0
+        for event, data in stream_process_video(video_id, timestamp, keyword_engine, question_source):
+            count += event == "question"
+            yield sse_event(event, data)
+        yield sse_event("done", {"count": count})
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
 
-        filtered_text = " ".join(
-            segment.text
-            for segment in transcript_data["transcript"]
-            if segment.start <= timestamp
-        )
 
-        if not filtered_text.strip():
-            return JsonResponse({"error": "Transcript up to given timestamp is empty."}, status=400)
+# Streaming mode of /api/process/ as server-sent events: a "keywords" event,
+# then one "question" event per practice question as Gemini produces it, then
+# "done" (or "error"). GET with query parameters works with EventSource.
+@api_view(['GET', 'POST'])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def generate_practice_questions_stream(request):
+    try:
+        data = request.GET if request.method == 'GET' else json.loads(request.body)
+        process = parse_process_request(data)
+        VideoInput.objects.update_or_create(**_video_input_fields(request.user, process))
+        _, video_id, timestamp, keyword_engine, question_source = process
+    except ProcessingError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON."}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    response = StreamingHttpResponse(_practice_question_events(video_id, timestamp, keyword_engine, question_source), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
 
-        keywords = extract_keywords_gemini(filtered_text, 7)
-        if not keywords:
-            return JsonResponse({"error": "Could not extract keywords."}, status=500)
 
-        questions = get_practice_questions_from_gemini(keywords)
+async def _aauthenticate(request):
+    """Runs the DRF cookie authentication for a plain (non-DRF) async view."""
+    try:
+        result = await sync_to_async(CookiesJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
 
-        return JsonResponse({
-            "keywords": keywords,
-            "questions": questions
-        })
+# Async variant of generate_practice_questions for ASGI deployments. DRF views
+# are sync-only, so this is a plain Django view doing the same auth by hand.
+@csrf_exempt
+@require_POST
+async def generate_practice_questions_async(request):
+    user = await _aauthenticate(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
 
+    try:
+        process = parse_process_request(json.loads(request.body))
+        await VideoInput.objects.aupdate_or_create(**_video_input_fields(user, process))
+        _, video_id, timestamp, keyword_engine, question_source = process
+
+        return JsonResponse(await aprocess_video(video_id, timestamp, keyword_engine, question_source))
+
+    except ProcessingError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
     except json.JSONDecodeError:
         return JsonResponse({"error": "Invalid JSON."}, status=400)
     except Exception as e:
@@ -73,6 +143,19 @@ def generate_practice_questions(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_video_inputs(request):
-    videos = VideoInput.objects.filter(owner=request.user)
+    videos = VideoInput.objects.filter(owner=request.user).order_by('created_at')
     serializer = VideoInputSerializer(videos, many=True)
     return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def process_stats(request):
+    return Response({
+        "result_cache": result_cache.stats(),
+        "question_cache": question_cache.stats(),
+        "models": registry.stats(),
+        "gemini": gemini().stats() if registry.is_loaded("gemini") else None,
+        "audio_store": audio_store.stats(),
+        "coalescing": process_flight.stats(),
+    })
@@ -4,7 +4,7 @@ from urllib.parse import urlparse, parse_qs
 
 from transcript_handler import get_transcript, chunk_transcript, get_chunk_at_timestamp
 from keyword_extractor import extract_keywords_gemini
-from resource_finder import get_resources
+from resource_finder import iter_resources
 
 
 def extract_video_id(url):
@@ -88,21 +88,20 @@ if video_id and timestamp_input is not None and num_resources_input > 0:
 
                 if keywords:
                     # 6. Get Resources based on keywords from the last chunk (using Gemini keywords now)
-                    with st.spinner(f"Searching for {num_resources_input} resource(s)..."): 
-                        # Call the get_resources function
-                        resource_links = get_resources(keywords, target_num_resources=num_resources_input)
-
                     resource_area.empty() 
-
-                    if resource_links:
-                        st.divider()
-                        # Display each resource link
-                        for idx, res in enumerate(resource_links):
+                    found = 0
+                    with st.spinner(f"Searching for {num_resources_input} resource(s)..."): 
+                        # Show each resource as soon as its site's search finishes
+                        for res in iter_resources(keywords, target_num_resources=num_resources_input):
+                            if found == 0:
+                                st.divider()
+                            found += 1
                             # Display title and link from resource_finder output
-                            st.markdown(f"**{idx+1}. {res['title']}** (Source: {res['source']})")
+                            st.markdown(f"**{found}. {res['title']}** (Source: {res['source']})")
                             st.markdown(f"[{res['link']}]({res['link']})")
                             st.write("---")
-                    else:
+
+                    if not found:
                         # Use info for no results
                         resource_area.info("Could not find relevant resources for the keywords extracted from this timestamp.")
                         pass
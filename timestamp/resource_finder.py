@@ -4,21 +4,65 @@ import streamlit as st
 import requests
 import json
 import html
-from urllib.parse import quote, urlencode
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote, urlencode, urlparse
 import string
 import time
 from bs4 import BeautifulSoup
-import google.generativeai as genai
 import random
 
+# The Gemini client layer and its response cache are shared with the Django backend.
+# Appended, so the backend's modules never shadow this app's own (utils, app, ...).
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.append(str(BACKEND_DIR))
+from backend.gemini import GeminiPool
+from backend.llm_cache import LLMCache
+
 try:
     from config import GEMINI_API_KEYS
 except ImportError:
     st.error("Error: Could not find config.py or GEMINI_API_KEYS within it.")
     GEMINI_API_KEYS = []
 
+try:
+    from config import GEMINI_RPM_PER_KEY
+except ImportError:
+    GEMINI_RPM_PER_KEY = 15
+
+try:
+    from config import LLM_CACHE_PATH
+except ImportError:
+    # The backend's cache file, so both apps reuse each other's answers.
+    LLM_CACHE_PATH = str(BACKEND_DIR / "llm_cache.sqlite3")
+
+
+@st.cache_resource
+def gemini_pool():
+    """One pool over all keys for every session of the app, with the on-disk response cache."""
+    cache = LLMCache(LLM_CACHE_PATH, max_bytes=256 * 1024 ** 2, ttl=7 * 24 * 3600) if LLM_CACHE_PATH else None
+    return GeminiPool(GEMINI_API_KEYS, requests_per_minute=GEMINI_RPM_PER_KEY, cache=cache)
+
 # --- Gemini Site Guessing Function ---
 
+def _clean_site_response(text):
+    return text.strip().lstrip('```json').rstrip('```').strip()
+
+
+def _is_site_list(text):
+    """Whether a reply is the JSON list of strings asked for (only those are cached)."""
+    try:
+        parsed_list = json.loads(_clean_site_response(text))
+    except ValueError:
+        return False
+    return isinstance(parsed_list, list) and all(isinstance(s, str) for s in parsed_list)
+
+
 @st.cache_data(ttl=3600) # Cache for 1 hour
 def guess_sites_gemini(keywords, num_sites=3):
     """Uses Gemini API to guess relevant website domains based on keywords."""
@@ -48,152 +92,228 @@ Example format:
 ["leetcode.com", "geeksforgeeks.org", "hackerrank.com"]
 """
 
-    guessed_sites = []
-    for i, key in enumerate(GEMINI_API_KEYS):
-        try:
-            genai.configure(api_key=key)
-            model = genai.GenerativeModel(model_name="gemini-2.0-flash",
-                                          generation_config=generation_config,
-                                          safety_settings=safety_settings)
-            response = model.generate_content(prompt)
-            cleaned_response = response.text.strip().lstrip('```json').rstrip('```').strip()
-            
-            parsed_list = json.loads(cleaned_response)
-            if isinstance(parsed_list, list) and all(isinstance(s, str) for s in parsed_list):
-                 valid_domains = [site.lower().strip() for site in parsed_list if '.' in site and ' ' not in site]
-                 if valid_domains:
-                     st.success(f"Gemini suggested sites: {', '.join(valid_domains)}")
-                     return valid_domains
-                 else:
-                      st.warning("Gemini response was a list, but contained no valid-looking domains.")
-                      return [] # Return empty, don't retry for this type of error
-            else:
-                st.warning(f"Gemini site suggestion response was not a valid JSON list of strings: {cleaned_response}")
-                return [] # Return empty, don't retry
-
-        except json.JSONDecodeError as json_err:
-            st.warning(f"Gemini site suggestion response was not valid JSON: {json_err}. Response: '{response.text}'")
-            return [] # Don't retry
-        except Exception as e:
-            st.warning(f"Gemini API call failed for site guessing (key #{i+1}): {e}")
-            if i == len(GEMINI_API_KEYS) - 1:
-                st.error("All Gemini API keys failed for site guessing.")
-                return []
-            # Otherwise, loop continues
-
-    return []
+    try:
+        # Spread over all keys; a key at its quota or rejected is retried on another.
+        model = gemini_pool().model("gemini-2.0-flash",
+                                    generation_config=generation_config,
+                                    safety_settings=safety_settings)
+        response = model.generate_content(prompt, cache_if=_is_site_list)
+        cleaned_response = _clean_site_response(response.text)
 
-# --- DuckDuckGo Scraping Function ---
+        parsed_list = json.loads(cleaned_response)
+        if isinstance(parsed_list, list) and all(isinstance(s, str) for s in parsed_list):
+             valid_domains = [site.lower().strip() for site in parsed_list if '.' in site and ' ' not in site]
+             if valid_domains:
+                 st.success(f"Gemini suggested sites: {', '.join(valid_domains)}")
+                 return valid_domains
+             else:
+                  st.warning("Gemini response was a list, but contained no valid-looking domains.")
+                  return []
+        else:
+            st.warning(f"Gemini site suggestion response was not a valid JSON list of strings: {cleaned_response}")
+            return []
 
-@st.cache_data(ttl=3600) # Cache for 1 hour
-def scrape_duckduckgo_links(keywords, site_filter=None, num_results=5):
-    """Attempts to scrape DuckDuckGo search results, optionally filtering by site."""
-    if not keywords:
+    except json.JSONDecodeError as json_err:
+        st.warning(f"Gemini site suggestion response was not valid JSON: {json_err}. Response: '{response.text}'")
         return []
+    except Exception as e:
+        st.error(f"Gemini API call failed for site guessing: {e}")
+        return []
+
+# --- DuckDuckGo Scraping Function ---
+
+DDG_SEARCH_URL = "https://html.duckduckgo.com/html/"
+DDG_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+REQUEST_TIMEOUT_SECONDS = 10
+SEARCH_DEADLINE_SECONDS = 15  # for all site searches of one get_resources() call
+MAX_REQUESTS_PER_HOST = 3  # across every session of the app
+SEARCH_CACHE_TTL = 3600
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+_search_cache = {}  # (keywords, site_filter, num_results) -> (expires, links)
+_search_cache_lock = threading.Lock()
+
+
+@st.cache_resource
+def http_session():
+    """One keep-alive session for all searches, so repeat requests skip the TCP and TLS handshakes."""
+    session = requests.Session()
+    session.headers.update(DDG_HEADERS)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=MAX_REQUESTS_PER_HOST)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@st.cache_resource
+def search_executor():
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="ddg-search")
 
-    query_parts = keywords[:] # Copy keywords
+
+def _host_slot(url):
+    """Semaphore limiting concurrent requests to ``url``'s host."""
+    host = urlparse(url).hostname
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return _host_slots[host]
+
+
+def _search_duckduckgo(keywords, site_filter=None, num_results=5, deadline=None):
+    """
+    DuckDuckGo results for ``keywords``, optionally on one site; raises on
+    failure. Makes no Streamlit calls, so it can run in a worker thread.
+    """
+    query_parts = list(keywords) # Copy keywords
     if site_filter:
         query_parts.insert(0, f"site:{site_filter}") # Prepend site filter
 
-    query = " ".join(query_parts)
-    search_info = f"'{query}'" + (f" on site '{site_filter}'" if site_filter else "")
-    params = {'q': query}
-    search_url = f"https://html.duckduckgo.com/html/?{urlencode(params)}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    links_found = []
+    search_url = f"{DDG_SEARCH_URL}?{urlencode({'q': ' '.join(query_parts)})}"
+    timeout = REQUEST_TIMEOUT_SECONDS
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+    slot = _host_slot(search_url)
+    if timeout <= 0 or not slot.acquire(timeout=timeout):
+        raise TimeoutError("search deadline passed while waiting for a connection")
     try:
-        response = requests.get(search_url, headers=headers, timeout=10)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        response = http_session().get(search_url, timeout=max(timeout, 0.1))
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        results = soup.find_all('div', class_='result')
+    finally:
+        slot.release()
 
-        for result in results[:num_results]: # Limit results per site search
-            link_tag = result.find('a', class_='result__a')
-            title_tag = result.find('h2', class_='result__title')
+    soup = BeautifulSoup(response.text, 'lxml')
+    links_found = []
+    for result in soup.find_all('div', class_='result')[:num_results]: # Limit results per site search
+        link_tag = result.find('a', class_='result__a')
+        title_tag = result.find('h2', class_='result__title')
 
-            if link_tag and title_tag:
-                link = link_tag.get('href')
-                title = title_tag.get_text(strip=True)
+        if link_tag and title_tag:
+            link = link_tag.get('href')
+            title = title_tag.get_text(strip=True)
 
-                if link and title and link.startswith('http') and 'duckduckgo.com' not in link:
-                    links_found.append({
-                        "source": site_filter if site_filter else "DuckDuckGo",
-                        "title": title,
-                        "link": link
-                    })
+            if link and title and link.startswith('http') and 'duckduckgo.com' not in link:
+                links_found.append({
+                    "source": site_filter if site_filter else "DuckDuckGo",
+                    "title": title,
+                    "link": link
+                })
+    return links_found
 
 
-    except requests.exceptions.RequestException as e:
-        st.warning(f"Web search request failed for {search_info}: {e}")
-    except Exception as e:
-        st.warning(f"Error processing web search for {search_info}: {e}")
+def _cached_search(keywords, site_filter, num_results, deadline):
+    """_search_duckduckgo() with an in-process cache (failures aren't cached)."""
+    cache_key = (tuple(keywords), site_filter, num_results)
+    with _search_cache_lock:
+        entry = _search_cache.get(cache_key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+    links = _search_duckduckgo(keywords, site_filter, num_results, deadline)
+    with _search_cache_lock:
+        _search_cache[cache_key] = (time.monotonic() + SEARCH_CACHE_TTL, links)
+        for key in [key for key, (expires, _) in _search_cache.items() if expires <= time.monotonic()]:
+            del _search_cache[key]
+    return links
 
-    return links_found
 
-def get_resources(keywords, target_num_resources=5):
+def _search_sites(keywords, sites, num_results):
     """
-    Gets resource links: Guesses sites with Gemini, then scrapes DDG for each site.
+    Searches every site in ``sites`` (None for a general search) at once and
+    yields (index, site, links) as each finishes, links None if it failed,
+    until all are done or SEARCH_DEADLINE_SECONDS pass.
     """
-    if not keywords:
-        return []
+    deadline = time.monotonic() + SEARCH_DEADLINE_SECONDS
+    executor = search_executor()
+    futures = {
+        executor.submit(_cached_search, keywords, site, num_results, deadline): (index, site)
+        for index, site in enumerate(sites)
+    }
+    try:
+        for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+            index, site = futures[future]
+            try:
+                yield index, site, future.result()
+            except Exception as e:
+                st.warning(f"Error scraping site {site or 'DuckDuckGo'}: {e}")
+                yield index, site, None
+    except FuturesTimeout:
+        pending = [site or "DuckDuckGo" for future, (_, site) in futures.items() if not future.done()]
+        st.warning(f"Web search timed out after {SEARCH_DEADLINE_SECONDS}s for: {', '.join(pending)}")
+    finally:
+        # Also when the caller stops early; searches already running end at their timeout.
+        for future in futures:
+            future.cancel()
 
+
+def _clean_keywords(keywords):
     translator = str.maketrans('', '', string.punctuation)
     cleaned_keywords = [k.translate(translator).strip() for k in keywords if k]
-    cleaned_keywords = [k for k in cleaned_keywords if k]
+    return [k for k in cleaned_keywords if k]
 
-    if not cleaned_keywords:
-         return []
 
+def _plan_searches(cleaned_keywords, target_num_resources):
+    """The sites to search (a general search if Gemini suggests none) and how many results to take from each."""
     # 1. Guess relevant sites using Gemini
     guessed_sites = guess_sites_gemini(cleaned_keywords, num_sites=5)
+    if guessed_sites:
+        st.info(f"--- Searching suggested sites for resources ---")
+        # Limit results per site to distribute findings
+        return guessed_sites, max(1, target_num_resources // len(guessed_sites))
+    st.info("Gemini did not suggest specific sites. Performing general web search...")
+    return [None], target_num_resources
 
-    all_resources = []
+
+def iter_resources(keywords, target_num_resources=5):
+    """
+    Like get_resources(), but yields each new resource as soon as its site's
+    search finishes, for the UI to show while slower sites are still loading.
+    """
+    cleaned_keywords = _clean_keywords(keywords or [])
+    if not cleaned_keywords:
+        return
+
+    sites, max_results_per_site = _plan_searches(cleaned_keywords, target_num_resources)
     processed_links = set()
-    max_results_per_site = max(1, target_num_resources // len(guessed_sites)) if guessed_sites else target_num_resources
+    for _, _, site_resources in _search_sites(cleaned_keywords, sites, max_results_per_site):
+        for res in site_resources or []:
+            if res['link'] not in processed_links:
+                processed_links.add(res['link'])
+                yield res
+                # Stop if we hit the overall target early
+                if len(processed_links) >= target_num_resources:
+                    return
 
-    # 2. Scrape DDG for each guessed site
-    if guessed_sites:
-        st.info(f"--- Searching suggested sites for resources ---")
-        for site in guessed_sites:
-            try:
-                # Limit results per site to distribute findings
-                site_resources = scrape_duckduckgo_links(
-                    cleaned_keywords,
-                    site_filter=site,
-                    num_results=max_results_per_site
-                )
-                for res in site_resources:
-                     if res['link'] not in processed_links:
-                         all_resources.append(res)
-                         processed_links.add(res['link'])
-                         # Stop if we hit the overall target early
-                         if len(all_resources) >= target_num_resources:
-                             break
-            except Exception as e:
-                st.warning(f"Error scraping site {site}: {e}")
-            # Stop searching sites if we hit the overall target
-            if len(all_resources) >= target_num_resources:
-                break
-    else:
-        st.info("Gemini did not suggest specific sites. Performing general web search...")
-
-    # 3. If no sites guessed OR not enough results, do a general DDG scrape
-    resources_still_needed = target_num_resources - len(all_resources)
-    if resources_still_needed > 0 and not guessed_sites: # Only do general scrape if Gemini failed
-         try:
-             general_resources = scrape_duckduckgo_links(
-                 cleaned_keywords,
-                 site_filter=None, # No site filter
-                 num_results=resources_still_needed
-             )
-             for res in general_resources:
-                  if res['link'] not in processed_links:
-                      all_resources.append(res)
-                      processed_links.add(res['link'])
-         except Exception as e:
-             st.warning(f"Error during general web scrape: {e}")
+    if not processed_links:
+        st.warning(f"Could not find any resources for keywords: {cleaned_keywords}.")
+
+
+def get_resources(keywords, target_num_resources=5):
+    """
+    Gets resource links: Guesses sites with Gemini, then scrapes DDG for all
+    sites at once. Results keep the order of Gemini's suggestions.
+    """
+    cleaned_keywords = _clean_keywords(keywords or [])
+    if not cleaned_keywords:
+         return []
+
+    # 2. Scrape DDG for each guessed site (or generally, if Gemini had none), in parallel
+    sites, max_results_per_site = _plan_searches(cleaned_keywords, target_num_resources)
+    by_site = [[] for _ in sites]
+    for index, _, site_resources in _search_sites(cleaned_keywords, sites, max_results_per_site):
+        by_site[index] = site_resources or []
+
+    # 3. Merge in suggestion order, skipping links already found
+    all_resources = []
+    processed_links = set()
+    for site_resources in by_site:
+        for res in site_resources:
+            if res['link'] not in processed_links:
+                all_resources.append(res)
+                processed_links.add(res['link'])
 
     # 4. Final Check
     if not all_resources:
@@ -0,0 +1,81 @@
+"""Tests for the resource finder's parallel search; run with `python -m unittest tests` from this directory."""
+import importlib.util
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+HAS_DEPENDENCIES = all(importlib.util.find_spec(name) for name in ("streamlit", "bs4", "requests"))
+if HAS_DEPENDENCIES:
+    import resource_finder
+
+
+def link(site, n):
+    return {"source": site, "title": f"{site} {n}", "link": f"https://{site}/{n}"}
+
+
+@unittest.skipUnless(HAS_DEPENDENCIES, "Needs the app's requirements.txt")
+class ResourceFinderTests(unittest.TestCase):
+    SITES = ["leetcode.com", "geeksforgeeks.org", "hackerrank.com"]
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=8)
+        self.addCleanup(self.executor.shutdown, wait=False)
+        self.delays = {}
+        self.failing = set()
+        self.searched = []
+        self._lock = threading.Lock()
+        for target, value in (
+            ("st", mock.Mock()),
+            ("search_executor", lambda: self.executor),
+            ("guess_sites_gemini", lambda keywords, num_sites: list(self.SITES)),
+            ("_search_duckduckgo", self.search),
+        ):
+            patcher = mock.patch.object(resource_finder, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(resource_finder._search_cache, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search(self, keywords, site_filter=None, num_results=5, deadline=None):
+        with self._lock:
+            self.searched.append(site_filter)
+        time.sleep(self.delays.get(site_filter, 0.2))
+        if site_filter in self.failing:
+            raise OSError("connection reset")
+        return [link(site_filter, n) for n in range(num_results)]
+
+    def test_sites_are_searched_at_once_and_merged_in_suggestion_order(self):
+        self.delays = {"leetcode.com": 0.3, "geeksforgeeks.org": 0.1, "hackerrank.com": 0.2}
+        started = time.monotonic()
+        resources = resource_finder.get_resources(["two", "pointers"], target_num_resources=6)
+        self.assertLess(time.monotonic() - started, 0.55)
+        self.assertEqual([r["source"] for r in resources], [site for site in self.SITES for _ in range(2)])
+
+    def test_resources_stream_in_finishing_order(self):
+        self.delays = {"leetcode.com": 0.3, "geeksforgeeks.org": 0.1, "hackerrank.com": 0.2}
+        resources = list(resource_finder.iter_resources(["two", "pointers"], target_num_resources=6))
+        finished = ["geeksforgeeks.org", "hackerrank.com", "leetcode.com"]
+        self.assertEqual([r["source"] for r in resources], [site for site in finished for _ in range(2)])
+
+    def test_failed_and_slow_sites_are_skipped(self):
+        self.failing = {"geeksforgeeks.org"}
+        self.delays = {"hackerrank.com": 2.0}
+        with mock.patch.object(resource_finder, "SEARCH_DEADLINE_SECONDS", 0.5):
+            started = time.monotonic()
+            resources = resource_finder.get_resources(["two", "pointers"], target_num_resources=6)
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual({r["source"] for r in resources}, {"leetcode.com"})
+        self.assertEqual(resource_finder.st.warning.call_count, 2)
+
+    def test_successful_searches_are_cached(self):
+        self.failing = {"geeksforgeeks.org"}
+        resource_finder.get_resources(["two", "pointers"], target_num_resources=6)
+        resource_finder.get_resources(["two", "pointers"], target_num_resources=6)
+        self.assertEqual(sorted(self.searched), sorted([*self.SITES, "geeksforgeeks.org"]))
+
+
+if __name__ == "__main__":
+    unittest.main()